@@ -0,0 +1,33 @@
+"""
+Gunicorn config - Production multi-worker launch for the UniHybrid API
+
+Chạy:
+    gunicorn api.main:app -c api/gunicorn_conf.py
+
+- N uvicorn workers (WEB_CONCURRENCY, default: one per CPU core)
+- each worker pinned to its own core (Linux, sched_setaffinity)
+- workers share pool state through the shared-memory store; one leader
+  process refreshes chain state per block (see services/state)
+"""
+
+import os
+
+cpu_count = len(os.sched_getaffinity(0)) if hasattr(os, "sched_getaffinity") else os.cpu_count() or 1
+
+bind = f"{os.getenv('SERVER_HOST', '0.0.0.0')}:{os.getenv('SERVER_PORT', '8000')}"
+workers = int(os.getenv("WEB_CONCURRENCY", str(cpu_count)))
+worker_class = "uvicorn.workers.UvicornWorker"
+loglevel = os.getenv("LOG_LEVEL", "info").lower()
+
+# Workers read pool state from shared memory instead of calling RPC inline
+raw_env = ["SHARED_STATE=true"]
+
+
+def post_fork(server, worker):
+    if not hasattr(os, "sched_setaffinity"):
+        return
+    cores = sorted(os.sched_getaffinity(0))
+    # worker.age increases by one for every worker spawned (including restarts)
+    core = cores[worker.age % len(cores)]
+    os.sched_setaffinity(0, {core})
+    server.log.info(f"Worker {worker.pid} pinned to core {core}")
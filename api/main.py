@@ -1,26 +1,61 @@
-from fastapi import FastAPI, Query, HTTPException
+from fastapi import FastAPI, Query, HTTPException, Request
 from fastapi.middleware.cors import CORSMiddleware
-from typing import Optional
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import PlainTextResponse
+from contextlib import asynccontextmanager, suppress
+from typing import Any, Dict, Optional, Tuple
 from decimal import Decimal
+from functools import partial
+import asyncio
 import sys
 import os
+import time
 
 sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
 
 from services.amm_uniswap_v3.uniswap_v3 import (
     get_price_for_pool,
-    get_amm_output,
-    get_pool_tokens_and_decimals
+    get_pool_tokens_and_decimals,
+    get_pool_tick_spacing,
+    get_block_number
 )
-from services.orderbook import SyntheticOrderbookGenerator
-from services.matching import GreedyMatcher
+from services.amm_uniswap_v3.pool_handle import PoolHandle
+from services.amm_uniswap_v3.swap_router import SWAP_ROUTER02_ADDRESS
+from services.amm_uniswap_v3.swap_simulator import InsufficientLiquidityError
+from services.orderbook import SyntheticOrderbookGenerator, swap_tick_from_sqrt_price
+from services.matching import GreedyMatcher, GasCostModel
 from services.execution.core.execution_plan import ExecutionPlanBuilder
+from services.execution.core.types import ExecutionPlan
+from services.telemetry import span, request_timings, format_server_timing, registry, rpc_accounting
+from services.state import SharedStateStore, LeaderLock, StateSnapshot, get_snapshot
+from services.state.refresher import PoolStateRefresher
+from api.plan_cache import PlanCache
+from api.profiling import (
+    RequestProfiler,
+    PROFILE_HEADER,
+    PROFILE_ID_HEADER,
+    resolve_request_id,
+    is_valid_request_id
+)
+from api.schemas import ExecutionPlanResponse
+from api.serialization import PlanJSONResponse
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    refresher_task = pool_refresher.start() if pool_refresher is not None else None
+    yield
+    if refresher_task is not None:
+        refresher_task.cancel()
+        with suppress(asyncio.CancelledError):
+            await refresher_task
 
 
 app = FastAPI(
     title="UniHybrid API",
     description="Hybrid orderbook + AMM execution planning",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan
 )
 
 app.add_middleware(
@@ -31,6 +66,9 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Native token (gas) on Base, for pricing gas in the output token
+WETH_ADDRESS = "0x4200000000000000000000000000000000000006"
+
 # Hardcoded pools on Base - would normally fetch this from subgraph or registry
 POOL_REGISTRY = {
     ("0x4200000000000000000000000000000000000006", "0xfde4c96c8593536e31f229ea8f37b2ada2699bb2"): {
@@ -52,6 +90,53 @@ POOL_REGISTRY = {
 }
 
 
+plan_cache = PlanCache(max_entries=int(os.getenv("PLAN_CACHE_SIZE", "1024")))
+
+SERVER_TIMING_ENABLED = os.getenv("SERVER_TIMING", "false").lower() in ("1", "true", "yes")
+
+request_profiler = RequestProfiler(
+    enabled=os.getenv("PROFILING_ENABLED", "false").lower() in ("1", "true", "yes"),
+    output_dir=os.getenv("PROFILE_DIR", "profiles"),
+    min_interval_s=float(os.getenv("PROFILE_MIN_INTERVAL_S", "10"))
+)
+
+# Pool state is refreshed per block by a background task and read from an
+# immutable snapshot, so requests do not call RPC inline. Requests fall back to
+# inline reads only while no fresh snapshot exists (startup, RPC outage).
+POOL_REFRESHER_ENABLED = os.getenv("POOL_REFRESHER", "true").lower() in ("1", "true", "yes")
+POOL_STATE_MAX_AGE_S = float(os.getenv("POOL_STATE_MAX_AGE_S", "10"))
+
+# Multi-worker mode: one leader process reads the chain and publishes the
+# snapshot to shared memory; the other workers adopt it.
+SHARED_STATE_ENABLED = os.getenv("SHARED_STATE", "false").lower() in ("1", "true", "yes")
+
+# Gas-aware matching: orderbook fills are kept only while they beat the AMM
+# net of gas (needs the snapshot base fee and a WETH pair to price gas)
+GAS_AWARE_MATCHING = os.getenv("GAS_AWARE_MATCHING", "true").lower() in ("1", "true", "yes")
+GAS_PRIORITY_FEE_WEI = int(os.getenv("GAS_PRIORITY_FEE_WEI", "1000000"))
+
+# AMM leg transaction: SwapRouter02 multicall deadline when the request has none
+SWAP_DEADLINE_S = int(os.getenv("SWAP_DEADLINE_S", "300"))
+
+pool_refresher = None
+if POOL_REFRESHER_ENABLED:
+    shared_state = SharedStateStore(os.getenv("SHARED_STATE_DIR") or None) if SHARED_STATE_ENABLED else None
+    pool_refresher = PoolStateRefresher(
+        pool_addresses=[info["pool"] for info in POOL_REGISTRY.values()],
+        poll_interval_s=float(os.getenv("BLOCK_POLL_INTERVAL_S", "2")),
+        store=shared_state,
+        leader_lock=LeaderLock(shared_state.directory) if shared_state is not None else None,
+        load_ticks=os.getenv("POOL_TICK_DATA", "true").lower() in ("1", "true", "yes")
+    )
+
+
+def _fresh_snapshot() -> Optional[StateSnapshot]:
+    snapshot = get_snapshot()
+    if snapshot is None or snapshot.age_s() > POOL_STATE_MAX_AGE_S:
+        return None
+    return snapshot
+
+
 def get_pool_for_pair(token_in: str, token_out: str) -> dict:
     key = (token_in.lower(), token_out.lower())
     if key in POOL_REGISTRY:
@@ -63,12 +148,188 @@ def get_pool_for_pair(token_in: str, token_out: str) -> dict:
     )
 
 
+def _build_execution_plan(
+    chain_id: int,
+    token_in: str,
+    token_out: str,
+    swap_amount: int,
+    max_slippage_bps: int,
+    performance_fee_bps: int,
+    max_matches: int,
+    ob_min_improve_bps: int,
+    me_slippage_limit: int,
+    scenario: str,
+    tick_aligned: bool = False,
+    snapshot: Optional[StateSnapshot] = None
+) -> ExecutionPlan:
+    with span("pool_lookup"):
+        pool_info = get_pool_for_pair(token_in, token_out)
+    pool_address = pool_info["pool"]
+    fee = pool_info["fee"]
+    
+    pool_state = snapshot.pool(pool_address) if snapshot is not None else None
+    if pool_state is not None:
+        # Snapshot has both price and token fields
+        pool_data = token_info = pool_state.as_pool_data()
+    else:
+        with span("get_price_for_pool"):
+            pool_data = get_price_for_pool(pool_address)
+        with span("get_pool_tokens_and_decimals"):
+            token_info = get_pool_tokens_and_decimals(pool_address)
+    
+    token_in_lower = token_in.lower()
+    token_out_lower = token_out.lower()
+    token0_lower = token_info["token0"].lower()
+    token1_lower = token_info["token1"].lower()
+    
+    if token_in_lower == token0_lower and token_out_lower == token1_lower:
+        decimals_in = token_info["decimals0"]
+        decimals_out = token_info["decimals1"]
+        price_amm = pool_data["price_eth_per_usdt"]
+    elif token_in_lower == token1_lower and token_out_lower == token0_lower:
+        decimals_in = token_info["decimals1"]
+        decimals_out = token_info["decimals0"]
+        price_amm = Decimal('1') / pool_data["price_eth_per_usdt"]
+    else:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Token pair mismatch. Pool has {token_info['token0']}/{token_info['token1']}, requested {token_in}/{token_out}"
+        )
+    
+    # AMM amounts along the pool's liquidity curve (price impact + fee) when the
+    # snapshot has tick data; spot price otherwise
+    amm_quote = None
+    amm_swap = None
+    if pool_state is not None and pool_state.ticks is not None:
+        pool_handle = PoolHandle.from_pool_state(pool_state)
+        zero_for_one = pool_handle.zero_for_one(token_in)
+        amm_quote = partial(pool_handle.quote, zero_for_one, state=pool_state)
+        amm_swap = partial(pool_handle.quote_with_ticks, zero_for_one, state=pool_state)
+    
+    gas_model = None
+    if GAS_AWARE_MATCHING and snapshot is not None and snapshot.base_fee is not None:
+        if token_out_lower == WETH_ADDRESS:
+            out_per_native = Decimal('1')
+        elif token_in_lower == WETH_ADDRESS:
+            out_per_native = price_amm
+        else:
+            out_per_native = None
+        if out_per_native is not None:
+            gas_model = GasCostModel(
+                gas_price_wei=snapshot.base_fee + GAS_PRIORITY_FEE_WEI,
+                out_per_native=out_per_native,
+                decimals_out=decimals_out
+            )
+    
+    # Tick-aligned mode: orderbook levels and the AMM price as swap-direction ticks
+    amm_tick = None
+    tick_spacing = 1
+    if tick_aligned:
+        amm_tick = swap_tick_from_sqrt_price(int(pool_data["sqrtPriceX96"]), token_in_lower == token0_lower)
+        tick_spacing = pool_data.get("tickSpacing")
+        if tick_spacing is None:
+            with span("get_pool_tick_spacing"):
+                tick_spacing = get_pool_tick_spacing(pool_address)
+    
+    # Generate orderbook
+    generator = SyntheticOrderbookGenerator(
+        mid_price=price_amm,
+        decimals_in=decimals_in,
+        decimals_out=decimals_out,
+        mid_tick=amm_tick,
+        tick_spacing=tick_spacing
+    )
+    
+    is_bid = (token_in_lower == token1_lower)
+    
+    with span("orderbook_generate"):
+        levels = generator.generate(
+            scenario=scenario,
+            swap_amount=swap_amount,
+            is_bid=is_bid
+        )
+    
+    # Match against orderbook
+    matcher = GreedyMatcher(
+        price_amm=price_amm,
+        decimals_in=decimals_in,
+        decimals_out=decimals_out,
+        ob_min_improve_bps=ob_min_improve_bps,
+        amm_tick=amm_tick,
+        gas_model=gas_model,
+        amm_swap=amm_swap,
+        max_matches=max_matches
+    )
+    
+    with span("match"):
+        match_result = matcher.match(
+            levels=levels,
+            swap_amount=swap_amount,
+            is_bid=is_bid
+        )
+    
+    # Build execution plan
+    builder = ExecutionPlanBuilder(
+        price_amm=price_amm,
+        decimals_in=decimals_in,
+        decimals_out=decimals_out,
+        performance_fee_bps=performance_fee_bps,
+        max_slippage_bps=max_slippage_bps,
+        amm_quote=amm_quote
+    )
+    
+    with span("build_plan"):
+        execution_plan = builder.build_plan(
+            match_result=match_result,
+            token_in_address=token_in,
+            token_out_address=token_out,
+            max_matches=max_matches,
+            me_slippage_limit=me_slippage_limit
+        )
+    
+    execution_plan.metadata = {
+        "chain_id": chain_id,
+        "pool_address": pool_address,
+        "fee": fee,
+        "scenario": scenario,
+        "tick_aligned": tick_aligned,
+        "amm_model": "v3_simulation" if amm_quote is not None else "spot",
+        "decimals_in": decimals_in,
+        "decimals_out": decimals_out,
+        "token_in_symbol": token_info["symbol0"] if token_in_lower == token0_lower else token_info["symbol1"],
+        "token_out_symbol": token_info["symbol1"] if token_in_lower == token0_lower else token_info["symbol0"],
+    }
+    
+    return execution_plan
+
+
+def _compute_execution_plan(*plan_args) -> ExecutionPlan:
+    # RPC cost of building this plan (calls by method / contract function), for
+    # scripts/rpc_report.py; responses replace it with the per-request tally
+    with rpc_accounting() as rpc_tally:
+        execution_plan = _build_execution_plan(*plan_args)
+    execution_plan.metadata["rpc"] = rpc_tally.to_dict()
+    return execution_plan
+
+
+def _compute_cached_plan(*plan_args) -> Tuple[ExecutionPlan, Dict[str, Any]]:
+    # Serialized once, when the plan enters the cache: a cache hit only
+    # replaces metadata and the AMM leg transaction (per-request fields)
+    execution_plan = _compute_execution_plan(*plan_args)
+    return execution_plan, execution_plan.to_dict()
+
+
 # ============================================================================
 # Main API Endpoint
 # ============================================================================
 
-@app.get("/api/unihybrid/execution-plan")
+@app.get(
+    "/api/unihybrid/execution-plan",
+    response_class=PlanJSONResponse,
+    responses={200: {"model": ExecutionPlanResponse}}
+)
 async def get_execution_plan(
+    request: Request,
     chain_id: int = Query(8453, description="Chain ID (Base mainnet = 8453)"),
     token_in: str = Query(..., description="Token input address (checksummed)"),
     token_out: str = Query(..., description="Token output address (checksummed)"),
@@ -79,7 +340,10 @@ async def get_execution_plan(
     max_matches: int = Query(8, description="Max matches in MatchingEngine. Default: 8"),
     ob_min_improve_bps: int = Query(5, description="Min orderbook improvement over AMM (bps). Default: 5"),
     me_slippage_limit: int = Query(200, description="MatchingEngine slippage limit (bps). Default: 200"),
-    scenario: Optional[str] = Query("medium", description="Orderbook scenario: small, medium, large. Default: medium")
+    scenario: Optional[str] = Query("medium", description="Orderbook scenario: small, medium, large. Default: medium"),
+    tick_aligned: bool = Query(False, description="Place orderbook levels on the pool tick grid and match in ticks"),
+    deadline: Optional[int] = Query(None, description="AMM leg deadline (unix seconds). Default: now + SWAP_DEADLINE_S"),
+    profile: bool = Query(False, description="Profile this request (requires PROFILING_ENABLED, rate-limited)")
 ):
     try:
         if chain_id != 8453:
@@ -98,109 +362,127 @@ async def get_execution_plan(
                 detail=f"Invalid amount_in: {e}"
             )
         
+        if deadline is None:
+            deadline = int(time.time()) + SWAP_DEADLINE_S
+        elif deadline <= 0:
+            raise HTTPException(status_code=400, detail=f"Invalid deadline: {deadline}")
+        
         if scenario not in ["small", "medium", "large"]:
             raise HTTPException(
                 status_code=400,
                 detail=f"Invalid scenario: {scenario}. Must be 'small', 'medium', or 'large'"
             )
         
-        pool_info = get_pool_for_pair(token_in, token_out)
-        pool_address = pool_info["pool"]
-        fee = pool_info["fee"]
+        get_pool_for_pair(token_in, token_out)
         
-        pool_data = get_price_for_pool(pool_address)
-        token_info = get_pool_tokens_and_decimals(pool_address)
-        
-        token_in_lower = token_in.lower()
-        token_out_lower = token_out.lower()
-        token0_lower = token_info["token0"].lower()
-        token1_lower = token_info["token1"].lower()
-        
-        if token_in_lower == token0_lower and token_out_lower == token1_lower:
-            decimals_in = token_info["decimals0"]
-            decimals_out = token_info["decimals1"]
-            price_amm = pool_data["price_eth_per_usdt"]
-        elif token_in_lower == token1_lower and token_out_lower == token0_lower:
-            decimals_in = token_info["decimals1"]
-            decimals_out = token_info["decimals0"]
-            price_amm = Decimal('1') / pool_data["price_eth_per_usdt"]
-        else:
-            raise HTTPException(
-                status_code=400,
-                detail=f"Token pair mismatch. Pool has {token_info['token0']}/{token_info['token1']}, requested {token_in}/{token_out}"
+        # RPC calls made by this request only: a cache hit reports the block
+        # lookup (if any), not the calls of the request that built the plan
+        with request_timings() as timings, rpc_accounting() as rpc_tally:
+            # One snapshot per request: block number and pool state stay consistent
+            snapshot = _fresh_snapshot()
+            if snapshot is not None:
+                block_number = snapshot.block_number
+            else:
+                with span("get_block_number"):
+                    block_number = await run_in_threadpool(get_block_number)
+            
+            # Same normalized params within the same block -> same plan.
+            # receiver and deadline only go into metadata and the AMM leg
+            # transaction, added per request, so they are not part of the key.
+            cache_key = (
+                chain_id,
+                token_in.lower(),
+                token_out.lower(),
+                swap_amount,
+                scenario,
+                tick_aligned,
+                max_slippage_bps,
+                performance_fee_bps,
+                max_matches,
+                ob_min_improve_bps,
+                me_slippage_limit,
+                block_number,
             )
+            
+            plan_args = (
+                chain_id,
+                token_in,
+                token_out,
+                swap_amount,
+                max_slippage_bps,
+                performance_fee_bps,
+                max_matches,
+                ob_min_improve_bps,
+                me_slippage_limit,
+                scenario,
+                tick_aligned,
+                snapshot
+            )
+            
+            profile_id = None
+            if (
+                request_profiler.enabled
+                and (profile or request.headers.get(PROFILE_HEADER) == "1")
+                and request_profiler.try_acquire()
+            ):
+                # Profiled requests bypass the cache so the pipeline actually runs
+                profile_id = resolve_request_id(request.headers.get("x-request-id"))
+                cached_plan, cached_body = await run_in_threadpool(
+                    request_profiler.run, profile_id, _compute_cached_plan, *plan_args
+                )
+            else:
+                cached_plan, cached_body = await plan_cache.get_or_compute(
+                    cache_key,
+                    lambda: run_in_threadpool(_compute_cached_plan, *plan_args)
+                )
+            
+            # Cached plans and bodies are shared between requests - never mutate them
+            with span("amm_call"):
+                try:
+                    plan = ExecutionPlanBuilder.with_amm_call(
+                        cached_plan,
+                        router_address=SWAP_ROUTER02_ADDRESS,
+                        pool_address=cached_plan.metadata["pool_address"],
+                        fee=cached_plan.metadata["fee"],
+                        receiver=receiver,
+                        deadline=deadline
+                    )
+                except ValueError as e:
+                    raise HTTPException(status_code=400, detail=f"Invalid receiver or deadline: {e}")
+            
+            with span("serialize"):
+                # Only legs that got a transaction are re-serialized (the AMM
+                # leg, no levels); everything else is the cached body
+                execution_plan = {
+                    **cached_body,
+                    "legs": [
+                        leg.to_dict() if leg.calldata is not None else cached_leg
+                        for leg, cached_leg in zip(plan.legs, cached_body["legs"])
+                    ],
+                    "metadata": {
+                        **cached_plan.metadata,
+                        "receiver": receiver,
+                        "block_number": block_number,
+                        "rpc": rpc_tally.to_dict(),
+                    },
+                }
+                # Return a Response directly so FastAPI skips the jsonable_encoder walk
+                response = PlanJSONResponse(execution_plan)
         
-        # Get quote from Quoter V2
-        amm_quote = get_amm_output(
-            token_in=token_in,
-            token_out=token_out,
-            amount_in=swap_amount,
-            fee=fee
-        )
-        amm_reference_out = amm_quote['amountOut']
-        
-        # Generate orderbook
-        generator = SyntheticOrderbookGenerator(
-            mid_price=price_amm,
-            decimals_in=decimals_in,
-            decimals_out=decimals_out
-        )
-        
-        is_bid = (token_in_lower == token1_lower)
-        
-        levels = generator.generate(
-            scenario=scenario,
-            swap_amount=swap_amount,
-            is_bid=is_bid
-        )
-        
-        # Match against orderbook
-        matcher = GreedyMatcher(
-            price_amm=price_amm,
-            decimals_in=decimals_in,
-            decimals_out=decimals_out,
-            ob_min_improve_bps=ob_min_improve_bps
-        )
-        
-        match_result = matcher.match(
-            levels=levels,
-            swap_amount=swap_amount,
-            is_bid=is_bid
-        )
-        
-        # Build execution plan
-        builder = ExecutionPlanBuilder(
-            price_amm=price_amm,
-            decimals_in=decimals_in,
-            decimals_out=decimals_out,
-            performance_fee_bps=performance_fee_bps,
-            max_slippage_bps=max_slippage_bps
-        )
-        
-        execution_plan = builder.build_plan(
-            match_result=match_result,
-            token_in_address=token_in,
-            token_out_address=token_out,
-            max_matches=max_matches,
-            me_slippage_limit=me_slippage_limit
-        )
-        
-        execution_plan["metadata"] = {
-            "chain_id": chain_id,
-            "pool_address": pool_address,
-            "fee": fee,
-            "receiver": receiver,
-            "scenario": scenario,
-            "decimals_in": decimals_in,
-            "decimals_out": decimals_out,
-            "token_in_symbol": token_info["symbol0"] if token_in_lower == token0_lower else token_info["symbol1"],
-            "token_out_symbol": token_info["symbol1"] if token_in_lower == token0_lower else token_info["symbol0"],
-        }
+        if SERVER_TIMING_ENABLED and timings:
+            response.headers["Server-Timing"] = format_server_timing(timings)
+        if profile_id is not None:
+            response.headers[PROFILE_ID_HEADER] = profile_id
         
-        return execution_plan
+        return response
         
     except HTTPException:
         raise
+    except InsufficientLiquidityError as e:
+        raise HTTPException(
+            status_code=400,
+            detail=f"amount_in exceeds AMM liquidity: {e}"
+        )
     except Exception as e:
         raise HTTPException(
             status_code=500,
@@ -210,13 +492,47 @@ async def get_execution_plan(
 
 @app.get("/health")
 async def health_check():
+    snapshot = get_snapshot()
     return {
         "status": "healthy",
         "service": "UniHybrid API",
-        "version": "1.0.0"
+        "version": "1.0.0",
+        "plan_cache": plan_cache.stats(),
+        "pool_state": {
+            "block_number": snapshot.block_number,
+            "age_s": round(snapshot.age_s(), 3)
+        } if snapshot is not None else None
     }
 
 
+@app.get("/metrics")
+async def metrics():
+    cache_stats = plan_cache.stats()
+    lines = [registry.render_prometheus()]
+    for name in ("hits", "misses", "coalesced"):
+        lines.append(f"# TYPE unihybrid_plan_cache_{name}_total counter\n")
+        lines.append(f"unihybrid_plan_cache_{name}_total {cache_stats[name]}\n")
+    lines.append("# TYPE unihybrid_plan_cache_entries gauge\n")
+    lines.append(f"unihybrid_plan_cache_entries {cache_stats['entries']}\n")
+    return PlainTextResponse(
+        "".join(lines),
+        media_type="text/plain; version=0.0.4"
+    )
+
+
+@app.get("/debug/profiles/{request_id}")
+async def get_profile(request_id: str):
+    if not request_profiler.enabled or not is_valid_request_id(request_id):
+        raise HTTPException(status_code=404, detail="Profile not found")
+    
+    path = request_profiler.path_for(request_id)
+    if not os.path.exists(path):
+        raise HTTPException(status_code=404, detail="Profile not found")
+    
+    with open(path, "r") as f:
+        return PlainTextResponse(f.read())
+
+
 @app.get("/")
 async def root():
     return {
@@ -225,6 +541,7 @@ async def root():
         "endpoints": {
             "execution_plan": "/api/unihybrid/execution-plan",
             "health": "/health",
+            "metrics": "/metrics",
             "docs": "/docs"
         }
     }
@@ -232,9 +549,23 @@ async def root():
 
 if __name__ == "__main__":
     import uvicorn
-    uvicorn.run(
-        app,
-        host="0.0.0.0",
-        port=8000,
-        log_level="info"
-    )
+    
+    workers = int(os.getenv("WEB_CONCURRENCY", "1"))
+    if workers > 1:
+        # Workers share pool state through the shared store (see api/gunicorn_conf.py
+        # for a production launch with workers pinned to cores)
+        os.environ["SHARED_STATE"] = "true"
+        uvicorn.run(
+            "api.main:app",
+            host="0.0.0.0",
+            port=8000,
+            workers=workers,
+            log_level="info"
+        )
+    else:
+        uvicorn.run(
+            app,
+            host="0.0.0.0",
+            port=8000,
+            log_level="info"
+        )
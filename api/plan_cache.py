@@ -0,0 +1,89 @@
+"""
+Plan Cache - Response cache for execution plans
+
+Identical execution-plan requests (same pair, amount, scenario, bps params)
+within the same block produce identical plans, so the result is cached by
+the normalized query parameters plus the block number.
+
+- Size-bounded LRU eviction
+- Single-flight: concurrent identical requests share one computation
+- Errors are never cached (the next request recomputes)
+"""
+
+import asyncio
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Hashable
+
+
+class PlanCache:
+
+    def __init__(self, max_entries: int = 1024):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[Hashable, Any]" = OrderedDict()
+        self._inflight: Dict[Hashable, asyncio.Future] = {}
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+
+    async def get_or_compute(
+        self,
+        key: Hashable,
+        compute: Callable[[], Awaitable[Any]]
+    ) -> Any:
+        """
+        Return the cached value for key, computing it at most once.
+
+        If an identical request is already being computed, wait for its
+        result instead of starting a second computation.
+        """
+        if self.max_entries <= 0:
+            self.misses += 1
+            return await compute()
+
+        if key in self._entries:
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return self._entries[key]
+
+        inflight = self._inflight.get(key)
+        if inflight is not None:
+            self.coalesced += 1
+            # shield: a cancelled waiter must not cancel the shared computation
+            return await asyncio.shield(inflight)
+
+        self.misses += 1
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        try:
+            value = await compute()
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            future.exception()  # mark retrieved when nobody else is waiting
+            raise
+        else:
+            self._store(key, value)
+            future.set_result(value)
+            return value
+        finally:
+            del self._inflight[key]
+
+    def _store(self, key: Hashable, value: Any) -> None:
+        self._entries[key] = value
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "hits": self.hits,
+            "misses": self.misses,
+            "coalesced": self.coalesced,
+        }
@@ -0,0 +1,137 @@
+"""
+Profiling - Opt-in sampling profiler for single API requests
+
+A request asks to be profiled with `?profile=true` or the `X-UniHybrid-Profile: 1`
+header. If profiling is enabled (PROFILING_ENABLED=true) and the rate limit
+allows it, the plan computation runs under a sampling profiler and the
+collapsed stacks are written to PROFILE_DIR/<request_id>.folded.
+
+The output is the "folded" format (`frame;frame;frame count` per line), which
+flamegraph.pl, speedscope and inferno read directly.
+
+When a request does not ask for profiling, the only cost is one flag check.
+"""
+
+import os
+import re
+import sys
+import threading
+import time
+import uuid
+from collections import Counter
+from typing import Any, Callable, Optional
+
+
+PROFILE_HEADER = "x-unihybrid-profile"
+PROFILE_ID_HEADER = "X-Profile-Id"
+
+_REQUEST_ID_PATTERN = re.compile(r"^[A-Za-z0-9_-]{1,64}$")
+
+
+class SamplingProfiler:
+    """
+    Samples the stack of one thread at a fixed interval from a helper thread.
+
+    Frames are recorded root → leaf as `file:function`.
+    """
+
+    def __init__(self, thread_id: int, interval_s: float = 0.001):
+        self.thread_id = thread_id
+        self.interval_s = interval_s
+        self.samples: Counter = Counter()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        self._thread = threading.Thread(target=self._run, name="unihybrid-profiler", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> Counter:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+        return self.samples
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval_s):
+            frame = sys._current_frames().get(self.thread_id)
+            if frame is None:
+                continue
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append(f"{os.path.basename(code.co_filename)}:{code.co_name}")
+                frame = frame.f_back
+            stack.reverse()
+            self.samples[";".join(stack)] += 1
+
+    def to_folded(self) -> str:
+        return "".join(f"{stack} {count}\n" for stack, count in self.samples.most_common())
+
+
+class RequestProfiler:
+    """
+    Decides whether a request gets profiled and stores the output.
+
+    - disabled unless PROFILING_ENABLED=true
+    - at most one profiled request per `min_interval_s` (process-wide)
+    """
+
+    def __init__(
+        self,
+        enabled: bool,
+        output_dir: str,
+        min_interval_s: float = 10.0,
+        sample_interval_s: float = 0.001
+    ):
+        self.enabled = enabled
+        self.output_dir = output_dir
+        self.min_interval_s = min_interval_s
+        self.sample_interval_s = sample_interval_s
+        self._last_profile_at = float("-inf")
+        self._lock = threading.Lock()
+
+    def try_acquire(self) -> bool:
+        if not self.enabled:
+            return False
+        with self._lock:
+            now = time.monotonic()
+            if now - self._last_profile_at < self.min_interval_s:
+                return False
+            self._last_profile_at = now
+            return True
+
+    def run(self, request_id: str, fn: Callable[..., Any], *args) -> Any:
+        """Call fn(*args) in the current thread under the sampling profiler."""
+        profiler = SamplingProfiler(threading.get_ident(), self.sample_interval_s)
+        profiler.start()
+        try:
+            return fn(*args)
+        finally:
+            profiler.stop()
+            self._write(request_id, profiler.to_folded())
+
+    def path_for(self, request_id: str) -> str:
+        return os.path.join(self.output_dir, f"{request_id}.folded")
+
+    def _write(self, request_id: str, folded: str) -> None:
+        os.makedirs(self.output_dir, exist_ok=True)
+        with open(self.path_for(request_id), "w") as f:
+            f.write(folded)
+
+
+def resolve_request_id(header_value: Optional[str]) -> str:
+    """
+    New server-side profile id: a UUID, prefixed with the caller's X-Request-ID
+    (if it is a safe file name) for correlation. Never the caller's value alone,
+    so a repeated or guessed id cannot overwrite or read another profile.
+    """
+    profile_id = uuid.uuid4().hex
+    if header_value and _REQUEST_ID_PATTERN.match(header_value):
+        # Prefix capped so the id still matches _REQUEST_ID_PATTERN (64 chars)
+        return f"{header_value[:31]}-{profile_id}"
+    return profile_id
+
+
+def is_valid_request_id(request_id: str) -> bool:
+    return bool(_REQUEST_ID_PATTERN.match(request_id))
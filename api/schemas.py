@@ -0,0 +1,105 @@
+"""
+Schemas - Typed response models for the UniHybrid API
+
+These models document the execution plan response in OpenAPI (/docs).
+They are not used for response validation: plans are serialized directly
+by `PlanJSONResponse` (see api/serialization.py).
+
+All raw token amounts are strings (uint256 values do not fit in JSON numbers).
+"""
+
+from typing import Dict, List, Optional
+
+from pydantic import BaseModel
+
+
+class SplitModel(BaseModel):
+    amount_in_total: str
+    amount_in_on_orderbook: str
+    amount_in_on_amm: str
+
+
+class LevelUsedModel(BaseModel):
+    price: str
+    amount_in_from_level: str
+    amount_out_from_level: str
+
+
+class LegMetaModel(BaseModel):
+    levels_used: List[LevelUsedModel] = []
+
+
+class LegModel(BaseModel):
+    source: str
+    amount_in: str
+    expected_amount_out: str
+    effective_price: str
+    min_amount_out: Optional[str] = None  # AMM leg
+    to: Optional[str] = None  # AMM leg: SwapRouter02
+    calldata: Optional[str] = None  # AMM leg: multicall(deadline, [exactInputSingle])
+    deadline: Optional[int] = None  # AMM leg
+    meta: Optional[LegMetaModel] = None
+
+
+class HookDataArgsModel(BaseModel):
+    tokenIn: str
+    tokenOut: str
+    amountInOnOrderbook: str
+    maxMatches: int
+    slippageLimit: int
+
+
+class RpcCallStatsModel(BaseModel):
+    count: int
+    latency_ms: float
+    max_latency_ms: float
+    request_bytes: int
+    response_bytes: int
+
+
+class RpcTallyModel(BaseModel):
+    total_calls: int
+    total_latency_ms: float
+    request_bytes: int
+    response_bytes: int
+    calls: Dict[str, RpcCallStatsModel]
+
+
+class GasModel(BaseModel):
+    gas_price_wei: str
+    gas_units: int
+    gas_cost_out: str  # raw token_out
+    amm_only_gas_cost_out: str  # raw token_out, same swap 100% via AMM
+    amm_ticks_crossed: int
+    orderbook_matches: int
+
+
+class PlanMetadataModel(BaseModel):
+    chain_id: int
+    pool_address: str
+    fee: int
+    receiver: str
+    scenario: str
+    tick_aligned: bool
+    decimals_in: int
+    decimals_out: int
+    token_in_symbol: Optional[str] = None
+    token_out_symbol: Optional[str] = None
+    block_number: int
+    amm_model: str  # "v3_simulation" (tick-exact) or "spot" (no price impact)
+    rpc: Optional[RpcTallyModel] = None
+
+
+class ExecutionPlanResponse(BaseModel):
+    split: SplitModel
+    legs: List[LegModel]
+    hook_data_args: HookDataArgsModel
+    hook_data: str
+    amm_reference_out: str
+    expected_total_out: str
+    savings_before_fee: str
+    performance_fee_amount: str
+    savings_after_fee: str
+    min_total_out: str
+    gas: Optional[GasModel] = None  # present when gas-aware matching is on
+    metadata: PlanMetadataModel
@@ -0,0 +1,48 @@
+"""
+Serialization - Fast JSON path for execution plan responses
+
+Returning a dict from a FastAPI handler sends it through `jsonable_encoder`,
+which walks every nested value (slow for plans with many `levels_used`).
+Handlers return `PlanJSONResponse(plan)` instead: the plan is rendered in one
+pass by orjson, with Decimal values encoded as strings. Raw token amounts
+must already be strings: orjson rejects ints above 64 bits before `default`
+is consulted (ExecutionPlan.to_dict() stringifies them).
+
+Falls back to the stdlib json module if orjson is not installed.
+"""
+
+import json
+from decimal import Decimal
+from typing import Any
+
+from fastapi.responses import JSONResponse
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional speedup
+    orjson = None
+
+
+def _default(obj: Any) -> Any:
+    if isinstance(obj, Decimal):
+        return str(obj)
+    raise TypeError(f"Type is not JSON serializable: {type(obj).__name__}")
+
+
+def dumps_plan(content: Any) -> bytes:
+    """
+    Serialize an execution plan (or any API payload) to JSON bytes.
+
+    Raw token amounts are expected as strings (uint256 does not fit in a
+    JSON number); Decimal values are encoded as strings too.
+    """
+    if orjson is not None:
+        return orjson.dumps(content, default=_default)
+    return json.dumps(content, default=_default, separators=(",", ":")).encode("utf-8")
+
+
+class PlanJSONResponse(JSONResponse):
+    media_type = "application/json"
+
+    def render(self, content: Any) -> bytes:
+        return dumps_plan(content)
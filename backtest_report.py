@@ -166,10 +166,11 @@ def run_backtest_scenario(scenario_name: str, swap_amount_eth: float, scenario_t
     # Calculate results
     # Override AMM reference với actual output từ quoter
     amm_reference = amm_reference_output  # Đã tính ở trên từ get_amm_output()
-    expected_total = float(execution_plan['expected_total_out']) / 10**6  # USDC
-    savings_before = float(execution_plan['savings_before_fee']) / 10**6
-    savings_after = float(execution_plan['savings_after_fee']) / 10**6
-    perf_fee = float(execution_plan['performance_fee_amount']) / 10**6
+    savings = execution_plan.savings
+    expected_total = savings.expected_total_out / 10**6  # USDC
+    savings_before = savings.savings_before_fee / 10**6
+    savings_after = savings.savings_after_fee / 10**6
+    perf_fee = savings.performance_fee_amount / 10**6
     
     # Calculate slippage so với giá spot (sqrtPriceX96)
     # ideal_output = giá spot × amount (không có slippage)
@@ -3,10 +3,12 @@ Backtest Report Generator - Auto-generate Notion-ready reports
 """
 
 from decimal import Decimal
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Optional
 import json
 from datetime import datetime
 
+from services.execution.core.types import ExecutionPlan
+
 
 class BacktestReportGenerator:
     """Generate formatted backtest reports for Notion"""
@@ -14,24 +16,25 @@ class BacktestReportGenerator:
     def __init__(self, scenario_name: str, config: Dict[str, Any]):
         self.scenario_name = scenario_name
         self.config = config
-        self.results = {}
+        self.results: Optional[ExecutionPlan] = None
         
-    def add_result(self, result: Dict[str, Any]):
+    def add_result(self, result: ExecutionPlan):
         """Add backtest result"""
         self.results = result
         
     def generate_markdown_section(self) -> str:
         """Generate Markdown section for one scenario - Ready for Notion"""
         
-        split = self.results.get('split', {})
-        total_in = int(split.get('amount_in_total', 0))
-        ob_in = int(split.get('amount_in_on_orderbook', 0))
-        amm_in = int(split.get('amount_in_on_amm', 0))
+        split = self.results.split
+        total_in = split.amount_in_total
+        ob_in = split.amount_in_on_orderbook
+        amm_in = split.amount_in_on_amm
         
-        amm_ref = int(self.results.get('amm_reference_out', 0))
-        total_out = int(self.results.get('expected_total_out', 0))
-        sav_before = int(self.results.get('savings_before_fee', 0))
-        sav_after = int(self.results.get('savings_after_fee', 0))
+        savings = self.results.savings
+        amm_ref = savings.amm_reference_out
+        total_out = savings.expected_total_out
+        sav_before = savings.savings_before_fee
+        sav_after = savings.savings_after_fee
         
         decimals_in = self.config.get('decimals_in', 18)
         decimals_out = self.config.get('decimals_out', 6)
@@ -71,13 +74,14 @@ class BacktestReportGenerator:
     
     def to_csv_row(self) -> Dict[str, Any]:
         """Generate dict for CSV export"""
-        split = self.results.get('split', {})
-        total_in = int(split.get('amount_in_total', 0))
-        ob_in = int(split.get('amount_in_on_orderbook', 0))
+        split = self.results.split
+        total_in = split.amount_in_total
+        ob_in = split.amount_in_on_orderbook
         
-        amm_ref = int(self.results.get('amm_reference_out', 0))
-        total_out = int(self.results.get('expected_total_out', 0))
-        sav_after = int(self.results.get('savings_after_fee', 0))
+        savings = self.results.savings
+        amm_ref = savings.amm_reference_out
+        total_out = savings.expected_total_out
+        sav_after = savings.savings_after_fee
         
         decimals_out = self.config.get('decimals_out', 6)
         
@@ -105,6 +109,7 @@ def run_backtest_and_generate_report():
     from services.orderbook import SyntheticOrderbookGenerator
     from services.matching import GreedyMatcher
     from services.execution.core.execution_plan import ExecutionPlanBuilder
+    from services.backtest import BacktestResultsSink, summarize
     
     # Setup
     pool_address = '0x6c561B446416E1A00E8E93E221854d6eA4171372'
@@ -118,6 +123,8 @@ def run_backtest_and_generate_report():
     
     scenarios = ['small', 'medium', 'large']
     all_results = []
+    # Columnar results (Parquet with pyarrow, npz otherwise) for large sweeps
+    sink = BacktestResultsSink('backtest_output')
     
     print("Running backtests...\n")
     
@@ -151,6 +158,7 @@ def run_backtest_and_generate_report():
         
         report_gen = BacktestReportGenerator(scenario.capitalize(), config)
         report_gen.add_result(plan)
+        sink.add_plan(scenario, plan, decimals_in, decimals_out, price_amm=price_amm)
         
         all_results.append({
             'name': scenario.capitalize(),
@@ -158,6 +166,8 @@ def run_backtest_and_generate_report():
             'csv_row': report_gen.to_csv_row()
         })
     
+    sink.close()
+    
     # Print Markdown (copy to Notion)
     print("\n" + "=" * 80)
     print("📄 MARKDOWN OUTPUT (Copy to Notion)")
@@ -176,6 +186,16 @@ def run_backtest_and_generate_report():
         row = result['csv_row']
         print(f"{row['Scenario']},{row['OB Split (%)']},{row['Total Output ($)']},{row['Savings ($)']},{row['Improvement (%)']}")
     
+    print("\n" + "=" * 80)
+    print(f"📦 COLUMNAR RESULTS ({sink.format}): {sink.out_dir}/")
+    print("=" * 80 + "\n")
+    
+    summary = summarize(sink.out_dir)
+    print("Scenario,Amount In,Count,p5 (bps),p50 (bps),p95 (bps)")
+    for i in range(len(summary['count'])):
+        print(f"{summary['scenario'][i]},{summary['amount_in'][i]:g},{summary['count'][i]},"
+              f"{summary['p5'][i]:.2f},{summary['p50'][i]:.2f},{summary['p95'][i]:.2f}")
+    
     print("\n" + "=" * 80)
     print("✅ Report generation complete!")
     print("=" * 80 + "\n")
@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""
+RPC Report - Count the RPC round trips one execution plan costs
+
+Runs the execution-plan pipeline (same code path as the API) and prints the
+RPC calls it made, by method and contract function, with latency and payload
+sizes. Use --max-calls in CI to catch changes that silently add round trips.
+
+Chạy:
+    python scripts/rpc_report.py
+    python scripts/rpc_report.py --amount-in 5000000000 --token-in <USDC> --token-out <WETH>
+    python scripts/rpc_report.py --json --max-calls 12
+"""
+
+import argparse
+import json
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from api.main import _compute_execution_plan
+
+
+WETH = "0x4200000000000000000000000000000000000006"
+USDC = "0x833589fcd6edb6e08f4c7c32d4f71b54bda02913"
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="RPC call report for one execution plan")
+    parser.add_argument("--token-in", default=WETH)
+    parser.add_argument("--token-out", default=USDC)
+    parser.add_argument("--amount-in", type=int, default=10**18)
+    parser.add_argument("--scenario", default="medium", choices=["small", "medium", "large"])
+    parser.add_argument("--json", action="store_true", help="Print the raw tally as JSON")
+    parser.add_argument("--max-calls", type=int, default=None,
+                        help="Exit with status 1 if the plan makes more RPC calls than this")
+    return parser.parse_args()
+
+
+def print_report(tally: dict):
+    print("=" * 96)
+    print("RPC CALLS PER EXECUTION PLAN")
+    print("=" * 96)
+    print(f"{'Call':<52} {'Count':>6} {'Total ms':>10} {'Max ms':>9} {'Req B':>7} {'Resp B':>7}")
+    print("-" * 96)
+    for label, stats in tally["calls"].items():
+        print(f"{label:<52} {stats['count']:>6} {stats['latency_ms']:>10.1f} "
+              f"{stats['max_latency_ms']:>9.1f} {stats['request_bytes']:>7} {stats['response_bytes']:>7}")
+    print("-" * 96)
+    print(f"{'TOTAL':<52} {tally['total_calls']:>6} {tally['total_latency_ms']:>10.1f} "
+          f"{'':>9} {tally['request_bytes']:>7} {tally['response_bytes']:>7}")
+    print("=" * 96)
+
+
+def main() -> int:
+    args = parse_args()
+
+    plan = _compute_execution_plan(
+        8453,
+        args.token_in,
+        args.token_out,
+        args.amount_in,
+        100,
+        3000,
+        8,
+        5,
+        200,
+        args.scenario
+    )
+    tally = plan.metadata["rpc"]
+
+    if args.json:
+        print(json.dumps(tally, indent=2))
+    else:
+        print_report(tally)
+
+    if args.max_calls is not None and tally["total_calls"] > args.max_calls:
+        print(f"❌ {tally['total_calls']} RPC calls > budget of {args.max_calls}", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,99 @@
+"""
+multicall.py - Batched contract reads through Multicall3
+
+Packs many view calls into one `aggregate3` eth_call, so reading N pools costs
+one RPC round trip instead of N * k. All reads in a batch execute against the
+same block, so the returned state is consistent.
+
+Calls are described by their function signature and output types; encoding
+and decoding go through eth_abi directly, independent of the web3 version.
+
+Usage:
+    calls = [
+        Call(pool, "slot0()", ("uint160", "int24", "uint16", "uint16", "uint16", "uint8", "bool")),
+        Call(pool, "liquidity()", ("uint128",)),
+    ]
+    slot0, liquidity = aggregate3(web3, calls, block_identifier=block_number)
+"""
+
+from dataclasses import dataclass
+from typing import Any, List, Optional, Sequence, Tuple
+
+from eth_abi import decode, encode
+from web3 import Web3
+
+from services.telemetry.rpc import register_selector
+
+
+# Same address on every chain that has Multicall3 deployed (incl. Base)
+MULTICALL3_ADDRESS = "0xcA11bde05977b3631167028862bE2a173976CA11"
+
+AGGREGATE3_SIGNATURE = "aggregate3((address,bool,bytes)[])"
+GET_BASEFEE_SIGNATURE = "getBasefee()"
+
+register_selector(AGGREGATE3_SIGNATURE)
+
+
+def function_selector(signature: str) -> bytes:
+    return bytes(Web3.keccak(text=signature)[:4])
+
+
+def _input_types(signature: str) -> Tuple[str, ...]:
+    # Flat argument lists only ("ticks(int24)", "tickBitmap(int16)")
+    args = signature[signature.index("(") + 1:signature.rindex(")")]
+    return tuple(args.split(",")) if args else ()
+
+
+@dataclass(frozen=True)
+class Call:
+    target: str
+    signature: str
+    output_types: Tuple[str, ...]
+    args: Tuple[Any, ...] = ()
+
+    def calldata(self) -> bytes:
+        return function_selector(self.signature) + encode(_input_types(self.signature), self.args)
+
+    def decode_output(self, data: bytes) -> Tuple[Any, ...]:
+        return decode(self.output_types, data)
+
+
+_AGGREGATE3_SELECTOR = function_selector(AGGREGATE3_SIGNATURE)
+
+
+def encode_aggregate3(calls: Sequence[Call]) -> bytes:
+    # allowFailure=True: one reverting call must not fail the whole batch
+    packed = [
+        (Web3.to_checksum_address(call.target), True, call.calldata())
+        for call in calls
+    ]
+    return _AGGREGATE3_SELECTOR + encode(["(address,bool,bytes)[]"], [packed])
+
+
+def decode_aggregate3(calls: Sequence[Call], raw: bytes) -> List[Optional[Tuple[Any, ...]]]:
+    """Decoded outputs in call order; None for calls that reverted or returned garbage."""
+    (results,) = decode(["(bool,bytes)[]"], raw)
+    outputs: List[Optional[Tuple[Any, ...]]] = []
+    for call, (success, data) in zip(calls, results):
+        if not success:
+            outputs.append(None)
+            continue
+        try:
+            outputs.append(call.decode_output(data))
+        except Exception:
+            outputs.append(None)
+    return outputs
+
+
+def aggregate3(
+    w3: Web3,
+    calls: Sequence[Call],
+    block_identifier: Any = "latest"
+) -> List[Optional[Tuple[Any, ...]]]:
+    if not calls:
+        return []
+    raw = w3.eth.call(
+        {"to": MULTICALL3_ADDRESS, "data": "0x" + encode_aggregate3(calls).hex()},
+        block_identifier
+    )
+    return decode_aggregate3(calls, bytes(raw))
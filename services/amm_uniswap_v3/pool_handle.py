@@ -0,0 +1,126 @@
+"""
+pool_handle.py - Resolved pool metadata for repeated AMM quotes
+
+A `PoolHandle` carries what never changes for a pool (token0/token1, decimals,
+fee, tick spacing) plus precomputed decimal scale factors. It is built once
+(from chain or from a snapshot PoolState) and reused for any number of quotes;
+quoting never re-reads metadata.
+
+Swap direction is explicit (`zero_for_one`), resolved from token addresses,
+never guessed from decimals (ambiguous for equal-decimal pairs).
+
+Usage:
+    handle = PoolHandle.from_chain(pool_address)
+    zero_for_one = handle.zero_for_one(token_in)
+    amount_out = handle.quote(zero_for_one, amount_in)
+"""
+
+from dataclasses import dataclass
+from decimal import Decimal
+from typing import Optional, Tuple
+
+from web3 import Web3
+
+from services.amm_uniswap_v3.swap_simulator import InsufficientLiquidityError
+from services.amm_uniswap_v3.uniswap_v3 import get_pools_metadata_batch, get_slot0, price_from_sqrtprice
+from services.state import PoolState, get_snapshot
+
+
+@dataclass(frozen=True, slots=True)
+class PoolHandle:
+    pool: str
+    token0: str
+    token1: str
+    decimals0: int
+    decimals1: int
+    fee: Optional[int]
+    tick_spacing: Optional[int]
+    scale0: Decimal  # 10 ** decimals0
+    scale1: Decimal  # 10 ** decimals1
+
+    @classmethod
+    def create(
+        cls,
+        pool: str,
+        token0: str,
+        token1: str,
+        decimals0: int,
+        decimals1: int,
+        fee: Optional[int] = None,
+        tick_spacing: Optional[int] = None
+    ) -> "PoolHandle":
+        return cls(
+            pool=Web3.to_checksum_address(pool),
+            token0=Web3.to_checksum_address(token0),
+            token1=Web3.to_checksum_address(token1),
+            decimals0=decimals0,
+            decimals1=decimals1,
+            fee=fee,
+            tick_spacing=tick_spacing,
+            scale0=Decimal(10) ** decimals0,
+            scale1=Decimal(10) ** decimals1,
+        )
+
+    @classmethod
+    def from_pool_state(cls, state: PoolState) -> "PoolHandle":
+        return cls.create(
+            state.pool, state.token0, state.token1, state.decimals0, state.decimals1,
+            state.fee, state.tick_spacing
+        )
+
+    @classmethod
+    def from_chain(cls, pool_address: str) -> "PoolHandle":
+        meta = get_pools_metadata_batch([pool_address])[pool_address.lower()]
+        return cls.create(
+            meta["pool"], meta["token0"], meta["token1"], meta["decimals0"], meta["decimals1"],
+            meta["fee"], meta["tickSpacing"]
+        )
+
+    def zero_for_one(self, token_in: str) -> bool:
+        token_in = token_in.lower()
+        if token_in == self.token0.lower():
+            return True
+        if token_in == self.token1.lower():
+            return False
+        raise ValueError(f"Token {token_in} is not in pool {self.pool} ({self.token0}/{self.token1})")
+
+    def decimals_out(self, zero_for_one: bool) -> int:
+        return self.decimals1 if zero_for_one else self.decimals0
+
+    def current_state(self) -> Optional[PoolState]:
+        snapshot = get_snapshot()
+        return snapshot.pool(self.pool) if snapshot is not None else None
+
+    def quote(self, zero_for_one: bool, amount_in: int, state: Optional[PoolState] = None) -> int:
+        """
+        Raw amount out for an exact-input swap.
+
+        Uses `state` (default: the current snapshot): tick-exact simulation when
+        it has tick data, else the spot price. Without any snapshot, reads slot0.
+        Raises InsufficientLiquidityError if the simulated swap cannot consume
+        all of amount_in (the error carries the partial result).
+        """
+        return self.quote_with_ticks(zero_for_one, amount_in, state)[0]
+
+    def quote_with_ticks(
+        self, zero_for_one: bool, amount_in: int, state: Optional[PoolState] = None
+    ) -> Tuple[int, int]:
+        """(amount_out, initialized ticks crossed) - same sources as quote(); 0 ticks on spot quotes."""
+        state = state or self.current_state()
+        if state is not None:
+            result = state.simulate_exact_input(zero_for_one, amount_in)
+            if result is not None:
+                if result.amount_in < amount_in:
+                    raise InsufficientLiquidityError(amount_in, result)
+                return result.amount_out, result.ticks_crossed
+            return self.spot_quote(zero_for_one, amount_in, state.price), 0
+
+        slot0 = get_slot0(self.pool)
+        price = price_from_sqrtprice(slot0["sqrtPriceX96"], self.decimals0, self.decimals1)
+        return self.spot_quote(zero_for_one, amount_in, price), 0
+
+    def spot_quote(self, zero_for_one: bool, amount_in: int, price: Decimal) -> int:
+        """Amount out at a constant price (token1 per token0, human units): no price impact."""
+        if zero_for_one:
+            return int(Decimal(amount_in) / self.scale0 * price * self.scale1)
+        return int(Decimal(amount_in) / self.scale1 / price * self.scale0)
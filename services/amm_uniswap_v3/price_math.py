@@ -0,0 +1,108 @@
+"""
+price_math.py - Conversions between sqrtPriceX96, tick and human price
+
+Human price = token1 per token0 in display units (e.g. USDC per ETH), the
+orientation used by `price_from_sqrtprice` / `price_eth_per_usdt`.
+
+Three flavours:
+- scalar Decimal (`price_from_sqrtprice`, `tick_to_price`): what the API and
+  plan builder use; constants per decimals pair are computed once (lru_cache)
+- scalar exact (`sqrtprice_to_price_fraction`, `price_to_sqrtprice`,
+  `price_to_tick`): integer / Fraction arithmetic only, no rounding drift
+- vectorized float64 (`prices_from_sqrtprices`, `ticks_to_prices`,
+  `prices_to_ticks`, `sqrtprices_to_ticks`): NumPy arrays for backtest and
+  charting workloads over many pools / blocks
+"""
+
+from decimal import Decimal
+from fractions import Fraction
+from functools import lru_cache
+from math import isqrt
+from typing import Union
+
+import numpy as np
+
+from services.amm_uniswap_v3.v3_math import (
+    get_sqrt_ratio_at_tick,
+    get_tick_at_sqrt_ratio,
+)
+
+
+Q96 = 1 << 96
+Q192 = 1 << 192
+_Q192_DECIMAL = Decimal(2) ** Decimal(192)
+_LOG_1_0001 = np.log(1.0001)
+
+PriceLike = Union[Decimal, Fraction, int, str]
+
+
+@lru_cache(maxsize=None)
+def decimals_scale(decimals0: int, decimals1: int) -> Decimal:
+    """10 ** (decimals0 - decimals1): raw price -> human price."""
+    return Decimal(10) ** Decimal(decimals0 - decimals1)
+
+
+@lru_cache(maxsize=None)
+def _decimals_scale_float(decimals0: int, decimals1: int) -> float:
+    return float(10.0 ** (decimals0 - decimals1))
+
+
+# ============================================
+# Scalar (Decimal)
+# ============================================
+
+def price_from_sqrtprice(sqrtPriceX96: int, decimals0: int, decimals1: int) -> Decimal:
+    """
+    Convert sqrtPriceX96 to human-readable price.
+    Returns token1 per token0 (e.g., USDC per ETH for ETH/USDC pool).
+    """
+    sqrt_dec = Decimal(sqrtPriceX96)
+    return sqrt_dec * sqrt_dec / _Q192_DECIMAL * decimals_scale(decimals0, decimals1)
+
+
+def tick_to_price(tick: int, decimals0: int, decimals1: int) -> Decimal:
+    return price_from_sqrtprice(get_sqrt_ratio_at_tick(tick), decimals0, decimals1)
+
+
+# ============================================
+# Scalar (exact, integer / Fraction only)
+# ============================================
+
+def sqrtprice_to_price_fraction(sqrt_price_x96: int, decimals0: int, decimals1: int) -> Fraction:
+    return Fraction(sqrt_price_x96 * sqrt_price_x96 * 10 ** decimals0, Q192 * 10 ** decimals1)
+
+
+def price_to_sqrtprice(price: PriceLike, decimals0: int, decimals1: int) -> int:
+    """sqrtPriceX96 (floor) for a human price."""
+    raw = Fraction(price) * 10 ** decimals1 / 10 ** decimals0
+    return isqrt(raw.numerator * Q192 // raw.denominator)
+
+
+def price_to_tick(price: PriceLike, decimals0: int, decimals1: int) -> int:
+    """Greatest tick whose price is <= the given human price."""
+    return get_tick_at_sqrt_ratio(price_to_sqrtprice(price, decimals0, decimals1))
+
+
+# ============================================
+# Vectorized (NumPy, float64)
+# ============================================
+
+def prices_from_sqrtprices(sqrt_prices_x96, decimals0: int, decimals1: int) -> np.ndarray:
+    """Human prices for an array of sqrtPriceX96 values (Python ints or floats)."""
+    ratio = np.asarray(sqrt_prices_x96, dtype=np.float64) / float(Q96)
+    return ratio * ratio * _decimals_scale_float(decimals0, decimals1)
+
+
+def ticks_to_prices(ticks, decimals0: int, decimals1: int) -> np.ndarray:
+    return np.exp(np.asarray(ticks, dtype=np.float64) * _LOG_1_0001) * _decimals_scale_float(decimals0, decimals1)
+
+
+def prices_to_ticks(prices, decimals0: int, decimals1: int) -> np.ndarray:
+    """Floor tick per human price (float precision; use price_to_tick for exact)."""
+    raw = np.asarray(prices, dtype=np.float64) / _decimals_scale_float(decimals0, decimals1)
+    return np.floor(np.log(raw) / _LOG_1_0001).astype(np.int64)
+
+
+def sqrtprices_to_ticks(sqrt_prices_x96) -> np.ndarray:
+    ratio = np.asarray(sqrt_prices_x96, dtype=np.float64) / float(Q96)
+    return np.floor(2.0 * np.log(ratio) / _LOG_1_0001).astype(np.int64)
@@ -0,0 +1,129 @@
+"""
+swap_router.py - SwapRouter02 calldata for exact-input swaps
+
+Encodes the three router calls an AMM leg needs, packing ABI words directly
+(selectors hashed once at import, no eth_abi type parsing per call):
+
+    exactInputSingle((address,address,uint24,address,uint256,uint256,uint160))
+    exactInput((bytes,address,uint256,uint256))          multi-hop, packed path
+    multicall(uint256,bytes[])                           deadline + batched calls
+
+SwapRouter02 swap structs carry no deadline; it is enforced by wrapping the
+swaps in multicall(deadline, ...), which also lets several AMM legs (different
+pools) execute in one transaction.
+
+Usage:
+    swap = encode_exact_input_single(token_in, token_out, 500, recipient, amount_in, min_out)
+    calldata = encode_multicall(deadline, [swap])
+"""
+
+from typing import Sequence
+
+from services.amm_uniswap_v3.multicall import function_selector
+
+
+# SwapRouter02 on Base
+SWAP_ROUTER02_ADDRESS = "0x2626664c2603336E57B271c5C0b26F421741e481"
+
+EXACT_INPUT_SINGLE_SIGNATURE = "exactInputSingle((address,address,uint24,address,uint256,uint256,uint160))"
+EXACT_INPUT_SIGNATURE = "exactInput((bytes,address,uint256,uint256))"
+MULTICALL_SIGNATURE = "multicall(uint256,bytes[])"
+
+EXACT_INPUT_SINGLE_SELECTOR = function_selector(EXACT_INPUT_SINGLE_SIGNATURE)
+EXACT_INPUT_SELECTOR = function_selector(EXACT_INPUT_SIGNATURE)
+MULTICALL_SELECTOR = function_selector(MULTICALL_SIGNATURE)
+
+_ADDRESS_PADDING = bytes(12)
+_UINT24_MAX = (1 << 24) - 1
+_UINT160_MAX = (1 << 160) - 1
+_UINT256_MAX = (1 << 256) - 1
+
+
+def _address_bytes(address: str) -> bytes:
+    raw = bytes.fromhex(address[2:] if address[:2] in ("0x", "0X") else address)
+    if len(raw) != 20:
+        raise ValueError(f"Invalid address: {address}")
+    return raw
+
+
+def _uint_word(value: int, max_value: int = _UINT256_MAX) -> bytes:
+    if not 0 <= value <= max_value:
+        raise ValueError(f"{value} out of range (max {max_value})")
+    return value.to_bytes(32, "big")
+
+
+def _dynamic_bytes(data: bytes) -> bytes:
+    """Length word + data right-padded to a multiple of 32 bytes."""
+    return len(data).to_bytes(32, "big") + data + bytes(-len(data) % 32)
+
+
+def encode_path(tokens: Sequence[str], fees: Sequence[int]) -> bytes:
+    """Packed V3 path: token0 | fee0 (uint24) | token1 | fee1 | ... | tokenN."""
+    if len(tokens) != len(fees) + 1 or not fees:
+        raise ValueError("path needs len(tokens) == len(fees) + 1 >= 2")
+    parts = [_address_bytes(tokens[0])]
+    for fee, token in zip(fees, tokens[1:]):
+        if not 0 <= fee <= _UINT24_MAX:
+            raise ValueError(f"Invalid fee tier: {fee}")
+        parts.append(fee.to_bytes(3, "big"))
+        parts.append(_address_bytes(token))
+    return b"".join(parts)
+
+
+def encode_exact_input_single(
+    token_in: str,
+    token_out: str,
+    fee: int,
+    recipient: str,
+    amount_in: int,
+    amount_out_minimum: int,
+    sqrt_price_limit_x96: int = 0
+) -> bytes:
+    # Static tuple: encoded inline, 7 words
+    return b"".join((
+        EXACT_INPUT_SINGLE_SELECTOR,
+        _ADDRESS_PADDING, _address_bytes(token_in),
+        _ADDRESS_PADDING, _address_bytes(token_out),
+        _uint_word(fee, _UINT24_MAX),
+        _ADDRESS_PADDING, _address_bytes(recipient),
+        _uint_word(amount_in),
+        _uint_word(amount_out_minimum),
+        _uint_word(sqrt_price_limit_x96, _UINT160_MAX),
+    ))
+
+
+def encode_exact_input(
+    path: bytes,
+    recipient: str,
+    amount_in: int,
+    amount_out_minimum: int
+) -> bytes:
+    # Dynamic tuple: offset to tuple, then head (path offset = 4 words) + tail
+    return b"".join((
+        EXACT_INPUT_SELECTOR,
+        _uint_word(0x20),
+        _uint_word(0x80),
+        _ADDRESS_PADDING, _address_bytes(recipient),
+        _uint_word(amount_in),
+        _uint_word(amount_out_minimum),
+        _dynamic_bytes(path),
+    ))
+
+
+def encode_multicall(deadline: int, calls: Sequence[bytes]) -> bytes:
+    """multicall(deadline, calls): every call reverts the whole batch if it fails."""
+    head = [_uint_word(len(calls))]
+    tails = []
+    offset = 32 * len(calls)
+    for call in calls:
+        head.append(_uint_word(offset))
+        tail = _dynamic_bytes(call)
+        tails.append(tail)
+        offset += len(tail)
+    return b"".join((
+        MULTICALL_SELECTOR,
+        _uint_word(deadline),
+        _uint_word(0x40),
+        *head,
+        *tails,
+    ))
@@ -0,0 +1,135 @@
+"""
+swap_simulator.py - Offline exact-input swap against a V3 pool's tick data
+
+Replays UniswapV3Pool.swap() for an exact-input swap using a TickTable snapshot:
+walk initialized ticks (one bitmap word at a time, like the contract), run
+computeSwapStep per range, cross ticks by applying liquidityNet. With the same
+state as the chain, amount_out equals QuoterV2.quoteExactInputSingle.
+
+Usage:
+    result = simulate_exact_input(
+        sqrt_price_x96, tick, liquidity, tick_table, fee=3000,
+        zero_for_one=True, amount_in=10**18
+    )
+    result.amount_out, result.sqrt_price_x96_after, result.ticks_crossed
+"""
+
+from dataclasses import dataclass
+from typing import Optional, Tuple
+
+from services.amm_uniswap_v3.tick_data import TickTable
+from services.amm_uniswap_v3.v3_math import (
+    MIN_TICK,
+    MAX_TICK,
+    MIN_SQRT_RATIO,
+    MAX_SQRT_RATIO,
+    compute_swap_step,
+    get_sqrt_ratio_at_tick,
+    get_tick_at_sqrt_ratio,
+)
+
+
+@dataclass(frozen=True)
+class SwapResult:
+    amount_in: int  # input actually consumed (incl. fee); < requested if the price limit was hit
+    amount_out: int
+    fee_amount: int
+    sqrt_price_x96_after: int
+    tick_after: int
+    liquidity_after: int
+    ticks_crossed: int  # initialized ticks crossed (drives swap gas)
+
+
+class InsufficientLiquidityError(ValueError):
+    """The pool runs out of liquidity before the whole amount_in is swapped."""
+
+    def __init__(self, amount_in: int, result: SwapResult):
+        super().__init__(
+            f"Pool liquidity absorbs only {result.amount_in} of amount_in {amount_in} "
+            f"(amount_out {result.amount_out})"
+        )
+        self.amount_in = amount_in
+        self.result = result  # the partial swap: amount_in consumed, amount_out
+
+
+def next_initialized_tick_within_one_word(
+    table: TickTable, tick: int, lte: bool
+) -> Tuple[int, bool]:
+    """
+    Same result as TickBitmap.nextInitializedTickWithinOneWord, from the sorted table.
+    Returns (next_tick, initialized); next_tick is a word boundary if not initialized.
+    """
+    spacing = table.tick_spacing
+    compressed = tick // spacing
+
+    if lte:
+        word_low = (compressed - (compressed & 0xff)) * spacing
+        found = table.next_initialized_tick(compressed * spacing, lte=True)
+        if found is not None and found >= word_low:
+            return found, True
+        return word_low, False
+
+    compressed += 1
+    word_high = (compressed + (0xff - (compressed & 0xff))) * spacing
+    found = table.next_initialized_tick((compressed - 1) * spacing, lte=False)
+    if found is not None and found <= word_high:
+        return found, True
+    return word_high, False
+
+
+def simulate_exact_input(
+    sqrt_price_x96: int,
+    tick: int,
+    liquidity: int,
+    ticks: TickTable,
+    fee: int,
+    zero_for_one: bool,
+    amount_in: int,
+    sqrt_price_limit_x96: Optional[int] = None
+) -> SwapResult:
+    if amount_in <= 0:
+        raise ValueError("amount_in must be positive")
+    if sqrt_price_limit_x96 is None:
+        sqrt_price_limit_x96 = MIN_SQRT_RATIO + 1 if zero_for_one else MAX_SQRT_RATIO - 1
+
+    remaining = amount_in
+    amount_out = 0
+    fee_total = 0
+    ticks_crossed = 0
+
+    while remaining != 0 and sqrt_price_x96 != sqrt_price_limit_x96:
+        sqrt_price_start = sqrt_price_x96
+        tick_next, initialized = next_initialized_tick_within_one_word(ticks, tick, zero_for_one)
+        tick_next = max(MIN_TICK, min(MAX_TICK, tick_next))
+        sqrt_price_next = get_sqrt_ratio_at_tick(tick_next)
+
+        if zero_for_one:
+            target = sqrt_price_limit_x96 if sqrt_price_next < sqrt_price_limit_x96 else sqrt_price_next
+        else:
+            target = sqrt_price_limit_x96 if sqrt_price_next > sqrt_price_limit_x96 else sqrt_price_next
+
+        sqrt_price_x96, step_in, step_out, step_fee = compute_swap_step(
+            sqrt_price_x96, target, liquidity, remaining, fee
+        )
+        remaining -= step_in + step_fee
+        amount_out += step_out
+        fee_total += step_fee
+
+        if sqrt_price_x96 == sqrt_price_next:
+            if initialized:
+                liquidity_net = ticks.liquidity_net_at(tick_next)
+                liquidity += -liquidity_net if zero_for_one else liquidity_net
+                ticks_crossed += 1
+            tick = tick_next - 1 if zero_for_one else tick_next
+        elif sqrt_price_x96 != sqrt_price_start:
+            tick = get_tick_at_sqrt_ratio(sqrt_price_x96)
+
+    return SwapResult(
+        amount_in=amount_in - remaining,
+        amount_out=amount_out,
+        fee_amount=fee_total,
+        sqrt_price_x96_after=sqrt_price_x96,
+        tick_after=tick,
+        liquidity_after=liquidity,
+        ticks_crossed=ticks_crossed,
+    )
@@ -0,0 +1,254 @@
+"""
+tick_data.py - Initialized-tick snapshot for Uniswap V3 pools
+
+`TickTable` holds every initialized tick of a pool as parallel sorted arrays:
+    ticks            array('i')  - sorted tick indexes
+    liquidity_gross  list[int]   - uint128, per tick
+    liquidity_net    list[int]   - int128, per tick (added when crossing up)
+
+Lookups are binary searches. A table is never mutated once built: updates
+(`apply_liquidity_delta`) return a new table, so a table referenced by a
+published snapshot stays consistent for readers.
+
+`TickDataLoader` builds the tables from chain state and keeps them current:
+- full load: scan every tickBitmap word of the pool's tick range, then read
+  ticks() for each set bit; both steps batched through Multicall3
+- incremental: apply Mint/Burn logs emitted since the last synced block
+  (one eth_getLogs for all pools per block)
+"""
+
+from array import array
+from bisect import bisect_left, bisect_right
+from typing import Any, Dict, Iterable, Iterator, List, Mapping, Optional, Sequence, Tuple
+
+from eth_abi import decode
+from web3 import Web3
+
+from services.amm_uniswap_v3.multicall import Call, aggregate3
+from services.amm_uniswap_v3.v3_math import MIN_TICK, MAX_TICK
+
+
+MINT_EVENT_SIGNATURE = "Mint(address,address,int24,int24,uint128,uint256,uint256)"
+BURN_EVENT_SIGNATURE = "Burn(address,int24,int24,uint128,uint256,uint256)"
+MINT_TOPIC = bytes(Web3.keccak(text=MINT_EVENT_SIGNATURE))
+BURN_TOPIC = bytes(Web3.keccak(text=BURN_EVENT_SIGNATURE))
+
+TICKS_OUTPUTS = ("uint128", "int128", "uint256", "uint256", "int56", "uint160", "uint32", "bool")
+
+# Calls per aggregate3 batch (keeps eth_call payloads and gas well under node limits)
+MULTICALL_BATCH_SIZE = 500
+
+
+class TickTable:
+
+    __slots__ = ("tick_spacing", "ticks", "liquidity_gross", "liquidity_net")
+
+    def __init__(
+        self,
+        tick_spacing: int,
+        ticks: Optional[array] = None,
+        liquidity_gross: Optional[List[int]] = None,
+        liquidity_net: Optional[List[int]] = None
+    ):
+        self.tick_spacing = tick_spacing
+        self.ticks = ticks if ticks is not None else array("i")
+        self.liquidity_gross = liquidity_gross if liquidity_gross is not None else []
+        self.liquidity_net = liquidity_net if liquidity_net is not None else []
+
+    @classmethod
+    def from_ticks(cls, tick_spacing: int, entries: Iterable[Tuple[int, int, int]]) -> "TickTable":
+        """Build from (tick, liquidity_gross, liquidity_net) in any order; zero-gross ticks are dropped."""
+        rows = sorted(e for e in entries if e[1] != 0)
+        return cls(
+            tick_spacing,
+            array("i", (r[0] for r in rows)),
+            [r[1] for r in rows],
+            [r[2] for r in rows],
+        )
+
+    def __len__(self) -> int:
+        return len(self.ticks)
+
+    def __iter__(self) -> Iterator[Tuple[int, int, int]]:
+        return zip(self.ticks, self.liquidity_gross, self.liquidity_net)
+
+    def __eq__(self, other: Any) -> bool:
+        if not isinstance(other, TickTable):
+            return NotImplemented
+        return (
+            self.tick_spacing == other.tick_spacing
+            and self.ticks == other.ticks
+            and self.liquidity_gross == other.liquidity_gross
+            and self.liquidity_net == other.liquidity_net
+        )
+
+    def __getstate__(self):
+        return (self.tick_spacing, self.ticks, self.liquidity_gross, self.liquidity_net)
+
+    def __setstate__(self, state):
+        self.tick_spacing, self.ticks, self.liquidity_gross, self.liquidity_net = state
+
+    def liquidity_net_at(self, tick: int) -> int:
+        i = bisect_left(self.ticks, tick)
+        if i < len(self.ticks) and self.ticks[i] == tick:
+            return self.liquidity_net[i]
+        return 0
+
+    def next_initialized_tick(self, tick: int, lte: bool) -> Optional[int]:
+        """
+        lte=True:  largest initialized tick <= tick (price moving down)
+        lte=False: smallest initialized tick > tick (price moving up)
+        None if there is no initialized tick in that direction.
+        """
+        if lte:
+            i = bisect_right(self.ticks, tick)
+            return self.ticks[i - 1] if i > 0 else None
+        i = bisect_right(self.ticks, tick)
+        return self.ticks[i] if i < len(self.ticks) else None
+
+    def apply_liquidity_delta(self, tick_lower: int, tick_upper: int, liquidity_delta: int) -> "TickTable":
+        """New table with a position's liquidity added (Mint, delta > 0) or removed (Burn, delta < 0)."""
+        if liquidity_delta == 0:
+            return self
+        table = TickTable(
+            self.tick_spacing,
+            array("i", self.ticks),
+            list(self.liquidity_gross),
+            list(self.liquidity_net),
+        )
+        table._update(tick_lower, liquidity_delta, liquidity_delta)
+        table._update(tick_upper, liquidity_delta, -liquidity_delta)
+        return table
+
+    def _update(self, tick: int, gross_delta: int, net_delta: int) -> None:
+        # Only called on a fresh copy inside apply_liquidity_delta
+        i = bisect_left(self.ticks, tick)
+        if i < len(self.ticks) and self.ticks[i] == tick:
+            gross = self.liquidity_gross[i] + gross_delta
+            if gross == 0:
+                del self.ticks[i]
+                del self.liquidity_gross[i]
+                del self.liquidity_net[i]
+            else:
+                self.liquidity_gross[i] = gross
+                self.liquidity_net[i] += net_delta
+        elif gross_delta > 0:
+            self.ticks.insert(i, tick)
+            self.liquidity_gross.insert(i, gross_delta)
+            self.liquidity_net.insert(i, net_delta)
+
+
+def bitmap_word_range(tick_spacing: int) -> range:
+    """tickBitmap word positions covering [MIN_TICK, MAX_TICK] for a tick spacing."""
+    return range((MIN_TICK // tick_spacing) >> 8, ((MAX_TICK // tick_spacing) >> 8) + 1)
+
+
+def ticks_from_bitmap_word(word_pos: int, bitmap: int, tick_spacing: int) -> List[int]:
+    ticks = []
+    while bitmap:
+        low_bit = bitmap & -bitmap
+        bit_pos = low_bit.bit_length() - 1
+        ticks.append(((word_pos << 8) + bit_pos) * tick_spacing)
+        bitmap ^= low_bit
+    return ticks
+
+
+def _topic_bytes(topic: Any) -> bytes:
+    return bytes.fromhex(topic.removeprefix("0x")) if isinstance(topic, str) else bytes(topic)
+
+
+def decode_liquidity_log(log: Mapping[str, Any]) -> Optional[Tuple[int, int, int]]:
+    """(tick_lower, tick_upper, liquidity_delta) for a Mint/Burn log, None for other events."""
+    topics = [_topic_bytes(t) for t in log["topics"]]
+    data = _topic_bytes(log["data"])
+    # tickLower / tickUpper are indexed: topics[2], topics[3] (sign-extended int24)
+    tick_lower = decode(["int24"], topics[2])[0] if len(topics) > 3 else None
+    tick_upper = decode(["int24"], topics[3])[0] if len(topics) > 3 else None
+
+    if topics[0] == MINT_TOPIC:
+        _, amount, _, _ = decode(["address", "uint128", "uint256", "uint256"], data)
+        return tick_lower, tick_upper, amount
+    if topics[0] == BURN_TOPIC:
+        amount, _, _ = decode(["uint128", "uint256", "uint256"], data)
+        return tick_lower, tick_upper, -amount
+    return None
+
+
+def apply_liquidity_logs(table: TickTable, logs: Iterable[Mapping[str, Any]]) -> TickTable:
+    for log in logs:
+        if log.get("removed"):
+            continue
+        decoded = decode_liquidity_log(log)
+        if decoded is not None:
+            table = table.apply_liquidity_delta(*decoded)
+    return table
+
+
+class TickDataLoader:
+    """Keeps a TickTable per pool in sync with the chain, block by block."""
+
+    def __init__(self, w3: Web3, batch_size: int = MULTICALL_BATCH_SIZE):
+        self.w3 = w3
+        self.batch_size = batch_size
+        self.tables: Dict[str, TickTable] = {}
+        self.synced_block: Optional[int] = None
+
+    def _aggregate(self, calls: Sequence[Call], block_identifier: Any) -> List[Optional[Tuple[Any, ...]]]:
+        outputs: List[Optional[Tuple[Any, ...]]] = []
+        for start in range(0, len(calls), self.batch_size):
+            outputs += aggregate3(self.w3, calls[start:start + self.batch_size], block_identifier)
+        return outputs
+
+    def load_table(self, pool_address: str, tick_spacing: int, block_identifier: Any) -> TickTable:
+        """Full load: bitmap word scan, then ticks() for every initialized tick."""
+        words = list(bitmap_word_range(tick_spacing))
+        bitmap_out = self._aggregate(
+            [Call(pool_address, "tickBitmap(int16)", ("uint256",), (w,)) for w in words],
+            block_identifier
+        )
+        ticks: List[int] = []
+        for word_pos, out in zip(words, bitmap_out):
+            if out is None:
+                raise RuntimeError(f"Failed reading tickBitmap({word_pos}) from pool {pool_address}")
+            ticks += ticks_from_bitmap_word(word_pos, out[0], tick_spacing)
+
+        ticks_out = self._aggregate(
+            [Call(pool_address, "ticks(int24)", TICKS_OUTPUTS, (t,)) for t in ticks],
+            block_identifier
+        )
+        entries = []
+        for tick, out in zip(ticks, ticks_out):
+            if out is None:
+                raise RuntimeError(f"Failed reading ticks({tick}) from pool {pool_address}")
+            entries.append((tick, out[0], out[1]))
+        return TickTable.from_ticks(tick_spacing, entries)
+
+    def sync(self, tick_spacings: Mapping[str, int], block_number: int) -> Dict[str, TickTable]:
+        """
+        Tables for every pool at block_number.
+
+        First call (or after a reorg below the synced block): full load.
+        Afterwards: apply Mint/Burn logs from synced_block + 1 .. block_number.
+        """
+        pools = {addr.lower(): spacing for addr, spacing in tick_spacings.items()}
+        if self.synced_block is None or block_number < self.synced_block or set(pools) != set(self.tables):
+            self.tables = {
+                addr: self.load_table(addr, spacing, block_number)
+                for addr, spacing in pools.items()
+            }
+        elif block_number > self.synced_block:
+            logs = self.w3.eth.get_logs({
+                "address": [Web3.to_checksum_address(addr) for addr in pools],
+                "fromBlock": self.synced_block + 1,
+                "toBlock": block_number,
+                "topics": [["0x" + MINT_TOPIC.hex(), "0x" + BURN_TOPIC.hex()]],
+            })
+            by_pool: Dict[str, List[Any]] = {}
+            for log in logs:
+                by_pool.setdefault(log["address"].lower(), []).append(log)
+            self.tables = {
+                addr: apply_liquidity_logs(table, by_pool.get(addr, ()))
+                for addr, table in self.tables.items()
+            }
+        self.synced_block = block_number
+        return self.tables
@@ -3,17 +3,22 @@ import json
 import math
 import time
 from decimal import Decimal, getcontext
+from typing import Any, Dict, Iterable
 
 from web3 import Web3
 from web3.exceptions import BadFunctionCallOutput
 from dotenv import load_dotenv
 
+from services.telemetry.rpc import InstrumentedHTTPProvider, register_abi
+from services.amm_uniswap_v3.price_math import price_from_sqrtprice
+from services.amm_uniswap_v3.multicall import Call, aggregate3, MULTICALL3_ADDRESS, GET_BASEFEE_SIGNATURE
+
 load_dotenv()
 RPC_URL = os.getenv("RPC_URL")
 if not RPC_URL:
     raise RuntimeError("Missing RPC_URL in .env file")
 
-web3 = Web3(Web3.HTTPProvider(RPC_URL, request_kwargs={"timeout": 20}))
+web3 = Web3(InstrumentedHTTPProvider(RPC_URL, request_kwargs={"timeout": 20}))
 print(f"RPC connected: {web3.is_connected()}")
 
 BASE_DIR = os.path.dirname(os.path.dirname(os.path.dirname(__file__)))
@@ -28,6 +33,9 @@ with open(ERC20_ABI_PATH, "r") as f:
 with open(QUOTER_V2_ABI_PATH, "r") as f:
     QUOTER_V2_ABI = json.load(f)
 
+for _abi in (POOL_ABI, ERC20_ABI, QUOTER_V2_ABI):
+    register_abi(_abi)
+
 QUOTER_V2_ADDRESS = "0x3d4e44Eb1374240CE5F1B871ab261CD16335B76a"
 
 
@@ -45,6 +53,10 @@ def load_quoter_v2_contract():
     )
 
 
+def get_block_number() -> int:
+    return int(web3.eth.block_number)
+
+
 def get_slot0(pool_address: str):
     pool = load_pool_contract(pool_address)
     try:
@@ -54,6 +66,14 @@ def get_slot0(pool_address: str):
     return {"sqrtPriceX96": int(slot0[0]), "tick": int(slot0[1])}
 
 
+def get_pool_tick_spacing(pool_address: str) -> int:
+    pool = load_pool_contract(pool_address)
+    try:
+        return int(pool.functions.tickSpacing().call())
+    except BadFunctionCallOutput as e:
+        raise RuntimeError(f"Failed reading tickSpacing from pool {pool_address}: {e}")
+
+
 def get_pool_tokens_and_decimals(pool_address: str):
     pool = load_pool_contract(pool_address)
     token0 = pool.functions.token0().call()
@@ -94,20 +114,6 @@ def get_pool_tokens_and_decimals(pool_address: str):
     }
 
 
-def price_from_sqrtprice(sqrtPriceX96: int, decimals0: int, decimals1: int) -> Decimal:
-    """
-    Convert sqrtPriceX96 to human-readable price.
-    Returns token1 per token0 (e.g., USDC per ETH for ETH/USDC pool).
-    """
-    sqrt_dec = Decimal(sqrtPriceX96)
-    numerator = sqrt_dec * sqrt_dec
-    denom = Decimal(2) ** Decimal(192)
-    raw = numerator / denom
-    scale = Decimal(10) ** Decimal(decimals0 - decimals1)
-    price = raw * scale
-    return price
-
-
 def quote_exact_input_single_v2(
     token_in: str,
     token_out: str,
@@ -183,6 +189,99 @@ def get_price_for_pool(pool_address: str):
     }
 
 
+# ============================================
+# Batched reads (Multicall3) for the pool state refresher
+# ============================================
+
+SLOT0_OUTPUTS = ("uint160", "int24", "uint16", "uint16", "uint16", "uint8", "bool")
+
+
+def get_pools_metadata_batch(pool_addresses: Iterable[str]) -> Dict[str, Dict[str, Any]]:
+    """
+    Immutable pool fields (tokens, decimals, symbols, fee, tickSpacing) for many
+    pools in two multicalls. Keyed by lowercase pool address.
+    """
+    pool_addresses = list(pool_addresses)
+    pool_calls = []
+    for addr in pool_addresses:
+        pool_calls += [
+            Call(addr, "token0()", ("address",)),
+            Call(addr, "token1()", ("address",)),
+            Call(addr, "fee()", ("uint24",)),
+            Call(addr, "tickSpacing()", ("int24",)),
+        ]
+    pool_out = aggregate3(web3, pool_calls)
+
+    pool_fields = {}
+    for i, addr in enumerate(pool_addresses):
+        token0, token1, fee, tick_spacing = pool_out[4 * i:4 * i + 4]
+        if token0 is None or token1 is None:
+            raise RuntimeError(f"Failed reading tokens from pool {addr}")
+        pool_fields[addr] = (token0[0], token1[0], fee, tick_spacing)
+
+    tokens = sorted({t for t0, t1, _, _ in pool_fields.values() for t in (t0, t1)})
+    token_calls = []
+    for token in tokens:
+        token_calls += [
+            Call(token, "decimals()", ("uint8",)),
+            Call(token, "symbol()", ("string",)),
+        ]
+    token_out = aggregate3(web3, token_calls)
+    token_fields = {
+        token: (
+            int(token_out[2 * i][0]) if token_out[2 * i] else 18,
+            token_out[2 * i + 1][0] if token_out[2 * i + 1] else None,
+        )
+        for i, token in enumerate(tokens)
+    }
+
+    metadata = {}
+    for addr, (token0, token1, fee, tick_spacing) in pool_fields.items():
+        dec0, sym0 = token_fields[token0]
+        dec1, sym1 = token_fields[token1]
+        metadata[addr.lower()] = {
+            "pool": Web3.to_checksum_address(addr),
+            "token0": Web3.to_checksum_address(token0),
+            "token1": Web3.to_checksum_address(token1),
+            "decimals0": dec0,
+            "decimals1": dec1,
+            "symbol0": "ETH" if sym0 in ["WETH", "weth"] else sym0,
+            "symbol1": sym1,
+            "fee": int(fee[0]) if fee else None,
+            "tickSpacing": int(tick_spacing[0]) if tick_spacing else None,
+        }
+    return metadata
+
+
+def get_pool_states_batch(pool_addresses: Iterable[str], block_identifier: Any = "latest") -> Dict[str, Any]:
+    """
+    Per-block pool state (slot0, liquidity) for many pools plus the block base fee,
+    all in one multicall against the same block.
+    """
+    pool_addresses = list(pool_addresses)
+    calls = [Call(MULTICALL3_ADDRESS, GET_BASEFEE_SIGNATURE, ("uint256",))]
+    for addr in pool_addresses:
+        calls += [
+            Call(addr, "slot0()", SLOT0_OUTPUTS),
+            Call(addr, "liquidity()", ("uint128",)),
+        ]
+    out = aggregate3(web3, calls, block_identifier)
+
+    pools = {}
+    for i, addr in enumerate(pool_addresses):
+        slot0, liquidity = out[1 + 2 * i], out[2 + 2 * i]
+        if slot0 is None or liquidity is None:
+            raise RuntimeError(f"Failed reading slot0/liquidity from pool {addr}")
+        pools[addr.lower()] = {
+            "sqrtPriceX96": int(slot0[0]),
+            "tick": int(slot0[1]),
+            "liquidity": int(liquidity[0]),
+        }
+    return {
+        "base_fee": int(out[0][0]) if out[0] else None,
+        "pools": pools,
+    }
+
 # ============================================
 # Simple test when run as script
 # ============================================
@@ -0,0 +1,248 @@
+"""
+v3_math.py - Integer-exact Uniswap V3 math (TickMath, SqrtPriceMath, SwapMath)
+
+Ports of the core library functions with the same rounding as the contracts,
+so an offline swap over the same state returns the same amounts as the pool
+(and QuoterV2). Python ints are unbounded; where the Solidity code branches on
+overflow, the same branch is taken by checking against 2**256.
+
+Reference: v3-core/contracts/libraries/{TickMath,SqrtPriceMath,SwapMath,FullMath}.sol
+"""
+
+import math
+from typing import Tuple
+
+
+MIN_TICK = -887272
+MAX_TICK = 887272
+MIN_SQRT_RATIO = 4295128739
+MAX_SQRT_RATIO = 1461446703485210103287273052203988822378723970342
+
+Q96 = 1 << 96
+MAX_UINT256 = (1 << 256) - 1
+MAX_UINT160 = (1 << 160) - 1
+FEE_DENOMINATOR = 1_000_000  # fee is in hundredths of a bip (3000 = 0.3%)
+
+
+# ============================================
+# FullMath / UnsafeMath
+# ============================================
+
+def mul_div(a: int, b: int, denominator: int) -> int:
+    return a * b // denominator
+
+
+def mul_div_rounding_up(a: int, b: int, denominator: int) -> int:
+    return -(-a * b // denominator)
+
+
+def div_rounding_up(a: int, b: int) -> int:
+    return -(-a // b)
+
+
+# ============================================
+# TickMath
+# ============================================
+
+_TICK_RATIO_FACTORS = (
+    (0x2, 0xfff97272373d413259a46990580e213a),
+    (0x4, 0xfff2e50f5f656932ef12357cf3c7fdcc),
+    (0x8, 0xffe5caca7e10e4e61c3624eaa0941cd0),
+    (0x10, 0xffcb9843d60f6159c9db58835c926644),
+    (0x20, 0xff973b41fa98c081472e6896dfb254c0),
+    (0x40, 0xff2ea16466c96a3843ec78b326b52861),
+    (0x80, 0xfe5dee046a99a2a811c461f1969c3053),
+    (0x100, 0xfcbe86c7900a88aedcffc83b479aa3a4),
+    (0x200, 0xf987a7253ac413176f2b074cf7815e54),
+    (0x400, 0xf3392b0822b70005940c7a398e4b70f3),
+    (0x800, 0xe7159475a2c29b7443b29c7fa6e889d9),
+    (0x1000, 0xd097f3bdfd2022b8845ad8f792aa5825),
+    (0x2000, 0xa9f746462d870fdf8a65dc1f90e061e5),
+    (0x4000, 0x70d869a156d2a1b890bb3df62baf32f7),
+    (0x8000, 0x31be135f97d08fd981231505542fcfa6),
+    (0x10000, 0x9aa508b5b7a84e1c677de54f3e99bc9),
+    (0x20000, 0x5d6af8dedb81196699c329225ee604),
+    (0x40000, 0x2216e584f5fa1ea926041bedfe98),
+    (0x80000, 0x48a170391f7dc42444e8fa2),
+)
+
+
+def get_sqrt_ratio_at_tick(tick: int) -> int:
+    """sqrt(1.0001^tick) * 2^96, rounded up (TickMath.getSqrtRatioAtTick)."""
+    abs_tick = abs(tick)
+    if abs_tick > MAX_TICK:
+        raise ValueError(f"Tick {tick} out of range")
+
+    ratio = 0xfffcb933bd6fad37aa2d162d1a594001 if abs_tick & 0x1 else 1 << 128
+    for bit, factor in _TICK_RATIO_FACTORS:
+        if abs_tick & bit:
+            ratio = (ratio * factor) >> 128
+
+    if tick > 0:
+        ratio = MAX_UINT256 // ratio
+
+    # Q128.128 -> Q64.96, rounding up
+    return (ratio >> 32) + (0 if ratio % (1 << 32) == 0 else 1)
+
+
+_LOG_SQRT_1_0001 = math.log(1.0001) / 2
+
+
+def get_tick_at_sqrt_ratio(sqrt_price_x96: int) -> int:
+    """Greatest tick whose sqrt ratio is <= sqrt_price_x96 (TickMath.getTickAtSqrtRatio)."""
+    if not MIN_SQRT_RATIO <= sqrt_price_x96 < MAX_SQRT_RATIO:
+        raise ValueError(f"sqrtPriceX96 {sqrt_price_x96} out of range")
+
+    # Float estimate, then exact correction against getSqrtRatioAtTick
+    log_ratio = math.log(sqrt_price_x96) - math.log(Q96)
+    tick = max(MIN_TICK, min(MAX_TICK, math.floor(log_ratio / _LOG_SQRT_1_0001)))
+    while tick > MIN_TICK and get_sqrt_ratio_at_tick(tick) > sqrt_price_x96:
+        tick -= 1
+    while tick < MAX_TICK and get_sqrt_ratio_at_tick(tick + 1) <= sqrt_price_x96:
+        tick += 1
+    return tick
+
+
+# ============================================
+# SqrtPriceMath
+# ============================================
+
+def get_next_sqrt_price_from_amount0_rounding_up(
+    sqrt_price_x96: int, liquidity: int, amount: int, add: bool
+) -> int:
+    if amount == 0:
+        return sqrt_price_x96
+    numerator1 = liquidity << 96
+    product = amount * sqrt_price_x96
+
+    if add:
+        if product <= MAX_UINT256:
+            denominator = numerator1 + product
+            if denominator <= MAX_UINT256:
+                return mul_div_rounding_up(numerator1, sqrt_price_x96, denominator)
+        return div_rounding_up(numerator1, numerator1 // sqrt_price_x96 + amount)
+
+    if product > MAX_UINT256 or numerator1 <= product:
+        raise ValueError("Insufficient liquidity for amount0 output")
+    return mul_div_rounding_up(numerator1, sqrt_price_x96, numerator1 - product)
+
+
+def get_next_sqrt_price_from_amount1_rounding_down(
+    sqrt_price_x96: int, liquidity: int, amount: int, add: bool
+) -> int:
+    if add:
+        return sqrt_price_x96 + mul_div(amount, Q96, liquidity)
+
+    quotient = mul_div_rounding_up(amount, Q96, liquidity)
+    if sqrt_price_x96 <= quotient:
+        raise ValueError("Insufficient liquidity for amount1 output")
+    return sqrt_price_x96 - quotient
+
+
+def get_next_sqrt_price_from_input(
+    sqrt_price_x96: int, liquidity: int, amount_in: int, zero_for_one: bool
+) -> int:
+    if zero_for_one:
+        return get_next_sqrt_price_from_amount0_rounding_up(sqrt_price_x96, liquidity, amount_in, True)
+    return get_next_sqrt_price_from_amount1_rounding_down(sqrt_price_x96, liquidity, amount_in, True)
+
+
+def get_next_sqrt_price_from_output(
+    sqrt_price_x96: int, liquidity: int, amount_out: int, zero_for_one: bool
+) -> int:
+    if zero_for_one:
+        return get_next_sqrt_price_from_amount1_rounding_down(sqrt_price_x96, liquidity, amount_out, False)
+    return get_next_sqrt_price_from_amount0_rounding_up(sqrt_price_x96, liquidity, amount_out, False)
+
+
+def get_amount0_delta(sqrt_ratio_a_x96: int, sqrt_ratio_b_x96: int, liquidity: int, round_up: bool) -> int:
+    if sqrt_ratio_a_x96 > sqrt_ratio_b_x96:
+        sqrt_ratio_a_x96, sqrt_ratio_b_x96 = sqrt_ratio_b_x96, sqrt_ratio_a_x96
+    numerator1 = liquidity << 96
+    numerator2 = sqrt_ratio_b_x96 - sqrt_ratio_a_x96
+    if round_up:
+        return div_rounding_up(
+            mul_div_rounding_up(numerator1, numerator2, sqrt_ratio_b_x96),
+            sqrt_ratio_a_x96
+        )
+    return mul_div(numerator1, numerator2, sqrt_ratio_b_x96) // sqrt_ratio_a_x96
+
+
+def get_amount1_delta(sqrt_ratio_a_x96: int, sqrt_ratio_b_x96: int, liquidity: int, round_up: bool) -> int:
+    if sqrt_ratio_a_x96 > sqrt_ratio_b_x96:
+        sqrt_ratio_a_x96, sqrt_ratio_b_x96 = sqrt_ratio_b_x96, sqrt_ratio_a_x96
+    if round_up:
+        return mul_div_rounding_up(liquidity, sqrt_ratio_b_x96 - sqrt_ratio_a_x96, Q96)
+    return mul_div(liquidity, sqrt_ratio_b_x96 - sqrt_ratio_a_x96, Q96)
+
+
+# ============================================
+# SwapMath
+# ============================================
+
+def compute_swap_step(
+    sqrt_ratio_current_x96: int,
+    sqrt_ratio_target_x96: int,
+    liquidity: int,
+    amount_remaining: int,
+    fee_pips: int
+) -> Tuple[int, int, int, int]:
+    """
+    One swap step within a single liquidity range (SwapMath.computeSwapStep).
+
+    amount_remaining > 0: exact input, < 0: exact output.
+    Returns (sqrt_ratio_next_x96, amount_in, amount_out, fee_amount).
+    """
+    zero_for_one = sqrt_ratio_current_x96 >= sqrt_ratio_target_x96
+    exact_in = amount_remaining >= 0
+
+    if exact_in:
+        amount_remaining_less_fee = mul_div(amount_remaining, FEE_DENOMINATOR - fee_pips, FEE_DENOMINATOR)
+        amount_in = (
+            get_amount0_delta(sqrt_ratio_target_x96, sqrt_ratio_current_x96, liquidity, True)
+            if zero_for_one else
+            get_amount1_delta(sqrt_ratio_current_x96, sqrt_ratio_target_x96, liquidity, True)
+        )
+        if amount_remaining_less_fee >= amount_in:
+            sqrt_ratio_next_x96 = sqrt_ratio_target_x96
+        else:
+            sqrt_ratio_next_x96 = get_next_sqrt_price_from_input(
+                sqrt_ratio_current_x96, liquidity, amount_remaining_less_fee, zero_for_one
+            )
+    else:
+        amount_out = (
+            get_amount1_delta(sqrt_ratio_target_x96, sqrt_ratio_current_x96, liquidity, False)
+            if zero_for_one else
+            get_amount0_delta(sqrt_ratio_current_x96, sqrt_ratio_target_x96, liquidity, False)
+        )
+        if -amount_remaining >= amount_out:
+            sqrt_ratio_next_x96 = sqrt_ratio_target_x96
+        else:
+            sqrt_ratio_next_x96 = get_next_sqrt_price_from_output(
+                sqrt_ratio_current_x96, liquidity, -amount_remaining, zero_for_one
+            )
+
+    reached_target = sqrt_ratio_target_x96 == sqrt_ratio_next_x96
+
+    if zero_for_one:
+        if not (reached_target and exact_in):
+            amount_in = get_amount0_delta(sqrt_ratio_next_x96, sqrt_ratio_current_x96, liquidity, True)
+        if not (reached_target and not exact_in):
+            amount_out = get_amount1_delta(sqrt_ratio_next_x96, sqrt_ratio_current_x96, liquidity, False)
+    else:
+        if not (reached_target and exact_in):
+            amount_in = get_amount1_delta(sqrt_ratio_current_x96, sqrt_ratio_next_x96, liquidity, True)
+        if not (reached_target and not exact_in):
+            amount_out = get_amount0_delta(sqrt_ratio_current_x96, sqrt_ratio_next_x96, liquidity, False)
+
+    # Cap the output amount to not exceed the remaining output amount
+    if not exact_in and amount_out > -amount_remaining:
+        amount_out = -amount_remaining
+
+    if exact_in and sqrt_ratio_next_x96 != sqrt_ratio_target_x96:
+        # Didn't reach the target, so take the remainder of the maximum input as fee
+        fee_amount = amount_remaining - amount_in
+    else:
+        fee_amount = mul_div_rounding_up(amount_in, fee_pips, FEE_DENOMINATOR - fee_pips)
+
+    return sqrt_ratio_next_x96, amount_in, amount_out, fee_amount
@@ -0,0 +1,23 @@
+"""
+Backtest Package
+
+Columnar results for large backtest sweeps: a batched Parquet / npz sink
+(one row per plan, one row per orderbook level used) and grouped percentile
+summaries read back column by column.
+"""
+
+from .results_sink import (
+    BacktestResultsSink,
+    SCENARIO_SCHEMA,
+    LEVEL_SCHEMA,
+    iter_table,
+    summarize,
+)
+
+__all__ = [
+    'BacktestResultsSink',
+    'SCENARIO_SCHEMA',
+    'LEVEL_SCHEMA',
+    'iter_table',
+    'summarize',
+]
@@ -0,0 +1,345 @@
+"""
+results_sink.py - Columnar backtest results, written in batches
+
+Two tables per output directory:
+
+    scenarios   one row per plan: split, outputs, savings (human units), bps
+    levels      one row per orderbook level used by a plan (plan_id joins them)
+
+Rows are buffered per column (plain lists / array chunks, no per-row dicts)
+and flushed every `batch_rows` rows, so sweeps of millions of plans run in
+bounded memory:
+
+- Parquet (pyarrow, optional): `<out_dir>/<table>.parquet`, one row group per batch
+- fallback without pyarrow: `<out_dir>/<table>/part-00000.npz`, one file per batch
+
+`summarize()` streams back only the columns it needs and computes grouped
+percentiles (by scenario / size by default) with NumPy.
+
+Usage:
+    with BacktestResultsSink("backtest_output") as sink:
+        for plan in plans:
+            sink.add_plan("medium", plan, decimals_in=18, decimals_out=6, price_amm=price)
+    summary = summarize("backtest_output")   # {'scenario', 'amount_in', 'count', 'mean', 'p5', ...}
+"""
+
+from decimal import Decimal
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Mapping, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+from services.execution.core.types import ExecutionPlan
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # pragma: no cover - optional dependency
+    pa = None
+    pq = None
+
+
+DEFAULT_BATCH_ROWS = 100_000
+
+SCENARIO_SCHEMA: Tuple[Tuple[str, str], ...] = (
+    ("plan_id", "int64"),
+    ("scenario", "str"),
+    ("amount_in", "float64"),
+    ("amount_in_on_orderbook", "float64"),
+    ("ob_split_pct", "float64"),
+    ("expected_total_out", "float64"),
+    ("amm_reference_out", "float64"),
+    ("savings_before_fee", "float64"),
+    ("performance_fee_amount", "float64"),
+    ("savings_after_fee", "float64"),
+    ("savings_after_fee_bps", "float64"),
+    ("levels_used", "int32"),
+)
+
+LEVEL_SCHEMA: Tuple[Tuple[str, str], ...] = (
+    ("plan_id", "int64"),
+    ("scenario", "str"),
+    ("level", "int32"),
+    ("price", "float64"),
+    ("price_vs_amm_bps", "float64"),
+    ("amount_in", "float64"),
+    ("amount_out", "float64"),
+)
+
+SUMMARY_PERCENTILES = (5, 25, 50, 75, 95)
+
+
+def _column_array(values: Union[List[Any], np.ndarray], dtype: str) -> np.ndarray:
+    if dtype == "str":
+        return np.asarray(values, dtype=np.str_)
+    return np.asarray(values, dtype=dtype)
+
+
+class _ParquetTableWriter:
+
+    def __init__(self, path: Path):
+        self.path = path
+        self._writer = None
+
+    def write(self, columns: Dict[str, np.ndarray]) -> None:
+        table = pa.table(columns)
+        if self._writer is None:
+            self._writer = pq.ParquetWriter(str(self.path), table.schema)
+        self._writer.write_table(table)
+
+    def close(self) -> None:
+        if self._writer is not None:
+            self._writer.close()
+            self._writer = None
+
+
+class _NpzTableWriter:
+
+    def __init__(self, directory: Path):
+        self.directory = directory
+        self.directory.mkdir(parents=True, exist_ok=True)
+        # Replace a previous run, as the Parquet writer does
+        for stale in self.directory.glob("part-*.npz"):
+            stale.unlink()
+        self._parts = 0
+
+    def write(self, columns: Dict[str, np.ndarray]) -> None:
+        np.savez(self.directory / f"part-{self._parts:05d}.npz", **columns)
+        self._parts += 1
+
+    def close(self) -> None:
+        pass
+
+
+class _TableBuffer:
+    """Column lists for one table; rows appended in schema order."""
+
+    def __init__(self, schema: Sequence[Tuple[str, str]], writer, batch_rows: int):
+        self.schema = tuple(schema)
+        self.writer = writer
+        self.batch_rows = batch_rows
+        self.rows_written = 0
+        self._reset()
+
+    def _reset(self) -> None:
+        self._columns: List[List[Any]] = [[] for _ in self.schema]
+        self._chunks: List[Dict[str, np.ndarray]] = []
+        self._rows = 0
+
+    def append(self, row: Sequence[Any]) -> None:
+        for column, value in zip(self._columns, row):
+            column.append(value)
+        self._rows += 1
+        if self._rows >= self.batch_rows:
+            self.flush()
+
+    def extend(self, columns: Mapping[str, Any], rows: int) -> None:
+        """Append `rows` rows given as arrays (scalars are broadcast)."""
+        self._flush_rows()
+        self._chunks.append({
+            name: np.broadcast_to(_column_array(columns[name], dtype), (rows,))
+            for name, dtype in self.schema
+        })
+        self._rows += rows
+        if self._rows >= self.batch_rows:
+            self.flush()
+
+    def _flush_rows(self) -> None:
+        # Pending scalar rows become a chunk, keeping row order with extend()
+        if self._columns[0]:
+            self._chunks.append({
+                name: _column_array(values, dtype)
+                for (name, dtype), values in zip(self.schema, self._columns)
+            })
+            self._columns = [[] for _ in self.schema]
+
+    def flush(self) -> None:
+        self._flush_rows()
+        if not self._chunks:
+            return
+        batch = {
+            name: np.concatenate([chunk[name] for chunk in self._chunks])
+            for name, _ in self.schema
+        }
+        self.writer.write(batch)
+        self.rows_written += self._rows
+        self._reset()
+
+    def close(self) -> None:
+        self.flush()
+        self.writer.close()
+
+
+class BacktestResultsSink:
+
+    def __init__(
+        self,
+        out_dir: Union[str, Path],
+        batch_rows: int = DEFAULT_BATCH_ROWS,
+        format: str = "auto"
+    ):
+        """format: 'parquet' (needs pyarrow), 'npz', or 'auto' (parquet if available)."""
+        if format == "auto":
+            format = "parquet" if pa is not None else "npz"
+        if format == "parquet" and pa is None:
+            raise ImportError("Parquet output requires pyarrow (pip install pyarrow)")
+        if format not in ("parquet", "npz"):
+            raise ValueError(f"Unknown results format: {format}")
+
+        self.out_dir = Path(out_dir)
+        self.out_dir.mkdir(parents=True, exist_ok=True)
+        self.format = format
+        self.scenarios = _TableBuffer(SCENARIO_SCHEMA, self._writer("scenarios"), batch_rows)
+        self.levels = _TableBuffer(LEVEL_SCHEMA, self._writer("levels"), batch_rows)
+        self._next_plan_id = 0
+
+    def _writer(self, table: str):
+        # A previous run's Parquet file would shadow npz parts in iter_table()
+        (self.out_dir / f"{table}.parquet").unlink(missing_ok=True)
+        if self.format == "parquet":
+            return _ParquetTableWriter(self.out_dir / f"{table}.parquet")
+        return _NpzTableWriter(self.out_dir / table)
+
+    def add_plan(
+        self,
+        scenario: str,
+        plan: ExecutionPlan,
+        decimals_in: int,
+        decimals_out: int,
+        price_amm: Optional[Decimal] = None
+    ) -> int:
+        """Record one plan (and its orderbook levels); returns its plan_id."""
+        plan_id = self._next_plan_id
+        self._next_plan_id += 1
+
+        scale_in = 10.0 ** decimals_in
+        scale_out = 10.0 ** decimals_out
+        split = plan.split
+        savings = plan.savings
+        levels_used = [level for leg in plan.legs if leg.levels_used for level in leg.levels_used]
+
+        self.scenarios.append((
+            plan_id,
+            scenario,
+            split.amount_in_total / scale_in,
+            split.amount_in_on_orderbook / scale_in,
+            split.amount_in_on_orderbook * 100 / split.amount_in_total if split.amount_in_total else 0.0,
+            savings.expected_total_out / scale_out,
+            savings.amm_reference_out / scale_out,
+            savings.savings_before_fee / scale_out,
+            savings.performance_fee_amount / scale_out,
+            savings.savings_after_fee / scale_out,
+            savings.savings_after_fee * 10000 / savings.amm_reference_out if savings.amm_reference_out else 0.0,
+            len(levels_used),
+        ))
+
+        amm_price = float(price_amm) if price_amm else 0.0
+        for index, level in enumerate(levels_used, 1):
+            price = float(level.price)
+            self.levels.append((
+                plan_id,
+                scenario,
+                index,
+                price,
+                (price / amm_price - 1) * 10000 if amm_price else 0.0,
+                level.amount_in_from_level / scale_in,
+                level.amount_out_from_level / scale_out,
+            ))
+        return plan_id
+
+    def add_scenario_rows(self, columns: Mapping[str, Any]) -> np.ndarray:
+        """
+        Bulk-append scenario rows from arrays (e.g. a savings surface or batch
+        matcher output), all columns of SCENARIO_SCHEMA except plan_id.
+        Returns the assigned plan_ids.
+        """
+        rows = max(np.size(columns[name]) for name, _ in SCENARIO_SCHEMA[1:])
+        plan_ids = np.arange(self._next_plan_id, self._next_plan_id + rows, dtype=np.int64)
+        self._next_plan_id += rows
+        self.scenarios.extend({**columns, "plan_id": plan_ids}, rows)
+        return plan_ids
+
+    def flush(self) -> None:
+        self.scenarios.flush()
+        self.levels.flush()
+
+    def close(self) -> None:
+        self.scenarios.close()
+        self.levels.close()
+
+    def __enter__(self) -> "BacktestResultsSink":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+def iter_table(
+    out_dir: Union[str, Path],
+    table: str = "scenarios",
+    columns: Optional[Sequence[str]] = None,
+    batch_rows: int = DEFAULT_BATCH_ROWS
+) -> Iterator[Dict[str, np.ndarray]]:
+    """Stream a table back as column batches (only `columns` are read)."""
+    out_dir = Path(out_dir)
+    parquet_path = out_dir / f"{table}.parquet"
+    if parquet_path.exists():
+        if pq is None:
+            raise ImportError("Reading Parquet results requires pyarrow")
+        for batch in pq.ParquetFile(str(parquet_path)).iter_batches(batch_size=batch_rows, columns=columns):
+            yield {
+                name: batch.column(i).to_numpy(zero_copy_only=False)
+                for i, name in enumerate(batch.schema.names)
+            }
+        return
+
+    for part in sorted((out_dir / table).glob("part-*.npz")):
+        with np.load(part) as data:
+            names = columns if columns is not None else data.files
+            yield {name: data[name] for name in names}
+
+
+def summarize(
+    out_dir: Union[str, Path],
+    metric: str = "savings_after_fee_bps",
+    group_by: Sequence[str] = ("scenario", "amount_in"),
+    percentiles: Sequence[float] = SUMMARY_PERCENTILES,
+    table: str = "scenarios"
+) -> Dict[str, np.ndarray]:
+    """
+    Per-group count, mean and percentiles (linear interpolation, as
+    np.percentile) of `metric`. One entry per group, groups sorted by key.
+    """
+    batches = list(iter_table(out_dir, table, columns=[*group_by, metric]))
+    if not batches:
+        return {name: np.array([]) for name in (*group_by, "count", "mean", *(f"p{q:g}" for q in percentiles))}
+    keys = [np.concatenate([batch[name] for batch in batches]) for name in group_by]
+    values = np.concatenate([batch[metric] for batch in batches]).astype(np.float64)
+
+    # Group id from the key columns
+    codes = []
+    uniques = []
+    for key in keys:
+        unique, code = np.unique(key, return_inverse=True)
+        uniques.append(unique)
+        codes.append(code.ravel())
+    combined = np.ravel_multi_index(codes, [len(unique) for unique in uniques])
+    group_codes, group_ids, counts = np.unique(combined, return_inverse=True, return_counts=True)
+
+    # Values sorted within each group; group g occupies [starts[g], starts[g] + counts[g])
+    order = np.lexsort((values, group_ids.ravel()))
+    sorted_values = values[order]
+    starts = np.concatenate(([0], np.cumsum(counts)[:-1]))
+
+    summary: Dict[str, np.ndarray] = {}
+    key_codes = np.unravel_index(group_codes, [len(unique) for unique in uniques])
+    for name, unique, code in zip(group_by, uniques, key_codes):
+        summary[name] = unique[code]
+    summary["count"] = counts
+    summary["mean"] = np.add.reduceat(sorted_values, starts) / counts
+    for q in percentiles:
+        position = starts + (counts - 1) * (q / 100)
+        low = np.floor(position).astype(np.int64)
+        high = np.ceil(position).astype(np.int64)
+        summary[f"p{q:g}"] = sorted_values[low] + (sorted_values[high] - sorted_values[low]) * (position - low)
+    return summary
@@ -5,27 +5,62 @@ Modules:
     - execution_plan: Build execution plan from greedy matching result
     - amm_leg: Build and simulate AMM leg
     - savings_calculator: Calculate savings from optimal routing
+    - savings_surface: Savings over a grid of swap sizes × fees (NumPy)
+    - hook_data: Encode / decode the hook payload
+    - types: Typed plan model (ExecutionPlan and its parts)
 """
 
 from .execution_plan import ExecutionPlanBuilder, LevelUsed
+from .types import (
+    ExecutionPlan,
+    PlanSplit,
+    PlanLeg,
+    SavingsData,
+    GasEstimate,
+    ExecutionLeg,
+    MatchingResult,
+)
 from .amm_leg import (
     simulate_amm_swap,
     build_amm_leg,
+    bundle_amm_legs,
     get_amm_reference_price,
 )
+from .hook_data import (
+    HookField,
+    HookDataCodec,
+    HOOK_DATA_FIELDS,
+    encode_hook_data,
+    decode_hook_data,
+)
 from .savings_calculator import (
     calculate_savings,
     format_savings_summary,
     validate_output,
 )
+from .savings_surface import savings_surface
 
 __all__ = [
     "ExecutionPlanBuilder",
     "LevelUsed",
+    "ExecutionPlan",
+    "PlanSplit",
+    "PlanLeg",
+    "SavingsData",
+    "GasEstimate",
+    "ExecutionLeg",
+    "MatchingResult",
     "simulate_amm_swap",
     "build_amm_leg",
+    "bundle_amm_legs",
     "get_amm_reference_price",
+    "HookField",
+    "HookDataCodec",
+    "HOOK_DATA_FIELDS",
+    "encode_hook_data",
+    "decode_hook_data",
     "calculate_savings",
     "format_savings_summary",
     "validate_output",
+    "savings_surface",
 ]
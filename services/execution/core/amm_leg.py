@@ -2,83 +2,47 @@
 amm_leg.py - Build AMM execution leg and simulate swaps
 
 Provides functions to:
-1. Simulate swap via Uniswap V3
-2. Build ExecutionLeg for AMM swap
+1. Simulate swap via Uniswap V3 (tick-exact against the pool state snapshot,
+   spot-price estimate when no tick data is available)
+2. Build ExecutionLeg for AMM swap (SwapRouter02 calldata), batch legs via multicall
 3. Calculate expected output from AMM
 """
 
 from decimal import Decimal
-from typing import Optional, Tuple
+from typing import Optional, Sequence, Tuple
 from web3 import Web3
 
-from services.amm_uniswap_v3.uniswap_v3 import get_price_for_pool, price_from_sqrtprice, get_pool_tokens_and_decimals
+from services.amm_uniswap_v3.pool_handle import PoolHandle
+from services.amm_uniswap_v3.swap_router import encode_exact_input_single, encode_multicall
 from .types import ExecutionLeg
 
 
 def simulate_amm_swap(
-    pool_address: str,
+    pool: PoolHandle,
     amount_in: int,
-    token_in_decimals: int,
-    token_out_decimals: int,
+    zero_for_one: bool,
 ) -> Decimal:
     """
     Simulate swap output amount via Uniswap V3 AMM.
     
-    Uses current sqrtPriceX96 to estimate output.
-    Note: This is an approximation; actual output may differ due to slippage.
+    If the pool state snapshot has tick data for this pool, the swap is
+    simulated exactly (price impact across ticks + fee, same as QuoterV2).
+    Otherwise uses the current price to estimate output (no slippage).
     
     Args:
-        pool_address: Uniswap V3 pool address
+        pool: Resolved pool (token0/token1, decimals), reused across calls
         amount_in: Input amount (raw, smallest units)
-        token_in_decimals: Decimals of input token (must match one of the pool's tokens)
-        token_out_decimals: Decimals of output token (must match the other pool's token)
+        zero_for_one: True for token0 -> token1 (use pool.zero_for_one(token_in))
     
     Returns:
         Estimated output amount (as Decimal, in raw units)
     
-    Important:
-        - Pool: token0=ETH (18 decimals), token1=USDT (6 decimals)
-        - If token_in_decimals=6 (USDT) and token_out_decimals=18 (ETH):
-          Swap USDT→ETH: amount_out = amount_in / price
-        - If token_in_decimals=18 (ETH) and token_out_decimals=6 (USDT):
-          Swap ETH→USDT: amount_out = amount_in * price
+    Example (pool token0=ETH, token1=USDC):
+        - zero_for_one=True:  ETH -> USDC, ~ amount_in * price
+        - zero_for_one=False: USDC -> ETH, ~ amount_in / price
     """
     try:
-        price_data = get_price_for_pool(pool_address)
-        # price = token1 per token0 (e.g., USDC per ETH = 2793.33)
-        # token0 = ETH (18 decimals), token1 = USDT (6 decimals)
-        
-        price = price_data['price_eth_per_usdt']
-        
-        # Get pool token decimals
-        token0_decimals = price_data['decimals0']  # ETH = 18
-        token1_decimals = price_data['decimals1']  # USDC = 6
-        
-        # Convert amount_in to human-readable
-        amount_in_human = Decimal(amount_in) / Decimal(10) ** Decimal(token_in_decimals)
-        
-        # Determine swap direction based on token decimals
-        if token_in_decimals == token0_decimals:
-            # token_in = token0 (ETH), token_out = token1 (USDT)
-            # amount_out = amount_in_human * price
-            # Example: 1 ETH * 2793.33 = 2793.33 USDT
-            amount_out_human = amount_in_human * price
-        elif token_in_decimals == token1_decimals:
-            # token_in = token1 (USDT), token_out = token0 (ETH)
-            # amount_out = amount_in_human / price
-            # Example: 5000 USDC / 2793.33 = 1.789 ETH
-            amount_out_human = amount_in_human / price
-        else:
-            raise ValueError(
-                f"token_in_decimals ({token_in_decimals}) does not match pool token decimals "
-                f"(token0: {token0_decimals}, token1: {token1_decimals})"
-            )
-        
-        # Convert back to raw
-        amount_out_raw = amount_out_human * Decimal(10) ** Decimal(token_out_decimals)
-        
-        return amount_out_raw
-    
+        return Decimal(pool.quote(zero_for_one, amount_in))
     except Exception as e:
         print(f"❌ Error simulating AMM swap: {e}")
         raise
@@ -93,54 +57,100 @@ def build_amm_leg(
     deadline: int,  # Block timestamp deadline
     token_in: str,
     token_out: str,
+    fee: int,
+    sqrt_price_limit_x96: int = 0,
 ) -> ExecutionLeg:
     """
     Build AMM execution leg.
     
-    For now, this creates a placeholder leg.
-    In production, encode actual swap calldata (e.g., SwapRouter02.exactInputSingle).
+    Calldata is SwapRouter02.multicall(deadline, [exactInputSingle(...)]):
+    SwapRouter02 swap params have no deadline field, the multicall wrapper
+    enforces it. The bare swap call is kept in meta['swap_calldata'] so
+    several legs can be batched with bundle_amm_legs().
     
     Args:
         pool_address: Uniswap V3 pool
-        router_address: SwapRouter or SwapRouter02 address
+        router_address: SwapRouter02 address (SWAP_ROUTER02_ADDRESS on Base)
         amount_in: Input amount (raw)
         min_amount_out: Min output (after slippage)
         receiver: Address to receive output
         deadline: Tx deadline
         token_in: Input token address
         token_out: Output token address
+        fee: Pool fee tier (e.g. 500 = 0.05%)
+        sqrt_price_limit_x96: Price limit (0 = none)
     
     Returns:
         ExecutionLeg for AMM swap
     """
-    # TODO: In production, encode the actual Uniswap V3 swap calldata
-    # For now, placeholder
-    calldata = "0x414bf389"  # Placeholder: SwapRouter.exactInputSingle selector
+    swap_calldata = encode_exact_input_single(
+        token_in, token_out, fee, receiver, amount_in, min_amount_out, sqrt_price_limit_x96
+    )
+    calldata = encode_multicall(deadline, [swap_calldata])
     
     leg = ExecutionLeg(
         source='amm',
         to=router_address,
-        calldata=calldata,
-        value='0',
-        sell_amount=str(amount_in),
-        min_buy_amount=str(min_amount_out),
+        calldata="0x" + calldata.hex(),
+        value=0,
+        sell_amount=amount_in,
+        min_buy_amount=min_amount_out,
         meta={
             'pool_address': pool_address,
             'token_in': token_in,
             'token_out': token_out,
+            'fee': fee,
             'receiver': receiver,
             'deadline': deadline,
+            'swap_calldata': "0x" + swap_calldata.hex(),
         }
     )
     
     return leg
 
 
+def bundle_amm_legs(legs: Sequence[ExecutionLeg], deadline: int) -> ExecutionLeg:
+    """
+    Combine AMM legs of the same pair (e.g. split across fee tiers) into one
+    SwapRouter02.multicall transaction.
+    
+    Raises:
+        ValueError: If legs target different routers or token pairs
+    """
+    if not legs:
+        raise ValueError("No AMM legs to bundle")
+    first = legs[0]
+    for leg in legs[1:]:
+        if leg.to.lower() != first.to.lower():
+            raise ValueError(f"Cannot bundle legs for different routers: {first.to}, {leg.to}")
+        if (leg.meta['token_in'], leg.meta['token_out']) != (first.meta['token_in'], first.meta['token_out']):
+            raise ValueError("Cannot bundle legs for different token pairs")
+    
+    calldata = encode_multicall(
+        deadline, [bytes.fromhex(leg.meta['swap_calldata'][2:]) for leg in legs]
+    )
+    
+    return ExecutionLeg(
+        source='amm',
+        to=first.to,
+        calldata="0x" + calldata.hex(),
+        value=0,
+        sell_amount=sum(leg.sell_amount for leg in legs),
+        min_buy_amount=sum(leg.min_buy_amount for leg in legs),
+        meta={
+            'token_in': first.meta['token_in'],
+            'token_out': first.meta['token_out'],
+            'deadline': deadline,
+            'pools': [leg.meta['pool_address'] for leg in legs],
+            'legs': [leg.meta for leg in legs],
+        }
+    )
+
+
 def get_amm_reference_price(
-    pool_address: str,
+    pool: PoolHandle,
     amount_in: int,
-    token_in_decimals: int,
-    token_out_decimals: int,
+    zero_for_one: bool,
 ) -> Tuple[Decimal, int]:
     """
     Get reference output if entire amountIn is swapped via AMM.
@@ -149,10 +159,9 @@ def get_amm_reference_price(
         (amount_out, decimals_out)
     """
     amount_out = simulate_amm_swap(
-        pool_address=pool_address,
+        pool=pool,
         amount_in=amount_in,
-        token_in_decimals=token_in_decimals,
-        token_out_decimals=token_out_decimals,
+        zero_for_one=zero_for_one,
     )
     
-    return amount_out, token_out_decimals
+    return amount_out, pool.decimals_out(zero_for_one)
@@ -1,14 +1,11 @@
+from dataclasses import replace
 from decimal import Decimal
-from typing import Dict, Any, List
-from dataclasses import dataclass
-from eth_abi import encode
+from typing import Callable, Dict, Any, List, Optional
 
-
-@dataclass
-class LevelUsed:
-    price: Decimal
-    amount_in_from_level: int
-    amount_out_from_level: int
+from services.amm_uniswap_v3.swap_simulator import InsufficientLiquidityError
+from .amm_leg import build_amm_leg
+from .hook_data import encode_hook_data
+from .types import ExecutionPlan, GasEstimate, LevelUsed, PlanLeg, PlanSplit, SavingsData
 
 
 class ExecutionPlanBuilder:
@@ -19,13 +16,17 @@ class ExecutionPlanBuilder:
         decimals_in: int,
         decimals_out: int,
         performance_fee_bps: int = 3000,
-        max_slippage_bps: int = 100
+        max_slippage_bps: int = 100,
+        amm_quote: Optional[Callable[[int], int]] = None
     ):
         self.price_amm = price_amm
         self.decimals_in = decimals_in
         self.decimals_out = decimals_out
         self.performance_fee_bps = performance_fee_bps
         self.max_slippage_bps = max_slippage_bps
+        # amount_in (raw) -> amount_out (raw) along the pool's liquidity curve.
+        # Without it, AMM amounts use the constant spot price (no price impact).
+        self.amm_quote = amm_quote
 
     def build_plan(
         self,
@@ -33,13 +34,19 @@ class ExecutionPlanBuilder:
         token_in_address: str,
         token_out_address: str,
         max_matches: int = 8,
-        me_slippage_limit: int = 200
-    ) -> Dict[str, Any]:
+        me_slippage_limit: int = 200,
+        plan_levels_used: Optional[List[LevelUsed]] = None
+    ) -> ExecutionPlan:
+        """
+        plan_levels_used: match_result['levels_used'] already converted with
+        to_plan_levels() (PlannerSession keeps them pre-built); used as is.
+        """
         amount_in_total = match_result['amount_in_on_orderbook'] + match_result['amount_in_on_amm']
         amount_in_on_orderbook = match_result['amount_in_on_orderbook']
         amount_in_on_amm = match_result['amount_in_on_amm']
         amount_out_from_orderbook = match_result['amount_out_from_orderbook']
-        levels_used = match_result['levels_used']
+        if plan_levels_used is None:
+            plan_levels_used = self.to_plan_levels(match_result['levels_used'])
         
         amount_out_from_amm = self._simulate_amm_leg(amount_in_on_amm)
         
@@ -48,115 +55,148 @@ class ExecutionPlanBuilder:
             amount_out_from_orderbook,
             amount_in_on_amm,
             amount_out_from_amm,
-            levels_used
+            plan_levels_used
         )
         
         amm_reference_out = self._calculate_amm_reference(amount_in_total)
         expected_total_out = amount_out_from_orderbook + amount_out_from_amm
-        savings_data = self._calculate_savings(expected_total_out, amm_reference_out)
+        savings = self._calculate_savings(expected_total_out, amm_reference_out)
         
         # Step 4: Build hook_data
         hook_data_args = {
             "tokenIn": token_in_address,
             "tokenOut": token_out_address,
-            "amountInOnOrderbook": str(amount_in_on_orderbook),
+            "amountInOnOrderbook": amount_in_on_orderbook,
             "maxMatches": max_matches,
             "slippageLimit": me_slippage_limit
         }
         hook_data = self._encode_hook_data(hook_data_args)
         
-        # Step 5: Calculate min_total_out (với slippage tolerance)
-        min_total_out = self._calculate_min_total_out(amm_reference_out)
-        
-        # Step 6: Build complete response
-        execution_plan = {
-            "split": {
-                "amount_in_total": str(amount_in_total),
-                "amount_in_on_orderbook": str(amount_in_on_orderbook),
-                "amount_in_on_amm": str(amount_in_on_amm)
-            },
-            "legs": legs,
-            "hook_data_args": hook_data_args,
-            "hook_data": hook_data,
-            "amm_reference_out": str(amm_reference_out),
-            "expected_total_out": str(expected_total_out),
-            "savings_before_fee": str(savings_data['savings_before_fee']),
-            "performance_fee_amount": str(savings_data['performance_fee_amount']),
-            "savings_after_fee": str(savings_data['savings_after_fee']),
-            "min_total_out": str(min_total_out)
-        }
+        # Gas-aware matching (GreedyMatcher with a GasCostModel)
+        gas = match_result.get('gas')
+        gas_estimate = None
+        if gas is not None:
+            gas_estimate = GasEstimate(
+                gas_price_wei=gas['gas_price_wei'],
+                gas_units=gas['gas_units'],
+                gas_cost_out=gas['gas_cost_out'],
+                amm_only_gas_cost_out=gas['amm_only_gas_cost_out'],
+                amm_ticks_crossed=gas['amm_ticks_crossed'],
+                orderbook_matches=gas['orderbook_matches']
+            )
         
-        return execution_plan
+        return ExecutionPlan(
+            split=PlanSplit(
+                amount_in_total=amount_in_total,
+                amount_in_on_orderbook=amount_in_on_orderbook,
+                amount_in_on_amm=amount_in_on_amm
+            ),
+            legs=legs,
+            hook_data_args=hook_data_args,
+            hook_data=hook_data,
+            savings=savings,
+            gas=gas_estimate
+        )
     
     def _simulate_amm_leg(self, amount_in_on_amm: int) -> int:
+        # InsufficientLiquidityError propagates: the AMM leg cannot execute
         if amount_in_on_amm == 0:
             return 0
-        
-        decimals_adjustment = Decimal(10) ** (self.decimals_out - self.decimals_in)
-        amount_in_decimal = Decimal(amount_in_on_amm)
-        amount_out_decimal = amount_in_decimal * self.price_amm * decimals_adjustment
-        return int(amount_out_decimal)
+        return self._amm_output(amount_in_on_amm)
     
     def _calculate_amm_reference(self, amount_in_total: int) -> int:
+        try:
+            return self._amm_output(amount_in_total)
+        except InsufficientLiquidityError as e:
+            # The AMM alone cannot fill the swap: compare against the most it delivers
+            return e.result.amount_out
+    
+    def _amm_output(self, amount_in: int) -> int:
+        if self.amm_quote is not None:
+            return self.amm_quote(amount_in)
+        
         decimals_adjustment = Decimal(10) ** (self.decimals_out - self.decimals_in)
-        amount_in_decimal = Decimal(amount_in_total)
+        amount_in_decimal = Decimal(amount_in)
         amount_out_decimal = amount_in_decimal * self.price_amm * decimals_adjustment
         return int(amount_out_decimal)
     
+    @staticmethod
+    def to_plan_levels(levels_used: List[Any]) -> List[LevelUsed]:
+        """Matcher fills -> plan LevelUsed."""
+        return [
+            LevelUsed(level.price, level.amount_in_from_level, level.amount_out_from_level)
+            for level in levels_used
+        ]
+    
     def _build_legs(
         self,
         amount_in_on_orderbook: int,
         amount_out_from_orderbook: int,
         amount_in_on_amm: int,
         amount_out_from_amm: int,
-        levels_used: List[Any]
-    ) -> List[Dict[str, Any]]:
+        levels_used: List[LevelUsed]
+    ) -> List[PlanLeg]:
         legs = []
         
         if amount_in_on_orderbook > 0:
-            effective_price_ob = (
-                Decimal(amount_out_from_orderbook) / Decimal(amount_in_on_orderbook)
-                if amount_in_on_orderbook > 0 else Decimal('0')
-            )
-            
-            levels_meta = []
-            for level in levels_used:
-                levels_meta.append({
-                    "price": str(level.price),
-                    "amount_in_from_level": str(level.amount_in_from_level),
-                    "amount_out_from_level": str(level.amount_out_from_level)
-                })
-            
-            legs.append({
-                "source": "internal_orderbook",
-                "amount_in": str(amount_in_on_orderbook),
-                "expected_amount_out": str(amount_out_from_orderbook),
-                "effective_price": str(effective_price_ob),
-                "meta": {
-                    "levels_used": levels_meta
-                }
-            })
+            legs.append(PlanLeg(
+                source="internal_orderbook",
+                amount_in=amount_in_on_orderbook,
+                expected_amount_out=amount_out_from_orderbook,
+                effective_price=Decimal(amount_out_from_orderbook) / Decimal(amount_in_on_orderbook),
+                levels_used=levels_used
+            ))
         
         if amount_in_on_amm > 0:
-            effective_price_amm = (
-                Decimal(amount_out_from_amm) / Decimal(amount_in_on_amm)
-                if amount_in_on_amm > 0 else Decimal('0')
-            )
-            
-            legs.append({
-                "source": "amm",
-                "amount_in": str(amount_in_on_amm),
-                "expected_amount_out": str(amount_out_from_amm),
-                "effective_price": str(effective_price_amm)
-            })
+            legs.append(PlanLeg(
+                source="amm",
+                amount_in=amount_in_on_amm,
+                expected_amount_out=amount_out_from_amm,
+                effective_price=Decimal(amount_out_from_amm) / Decimal(amount_in_on_amm),
+                min_amount_out=self._calculate_min_total_out(amount_out_from_amm)
+            ))
         
         return legs
     
+    @staticmethod
+    def with_amm_call(
+        plan: ExecutionPlan,
+        router_address: str,
+        pool_address: str,
+        fee: int,
+        receiver: str,
+        deadline: int
+    ) -> ExecutionPlan:
+        """
+        Copy of plan whose AMM leg carries the SwapRouter02 transaction
+        (multicall(deadline, [exactInputSingle]) for the leg's amount_in and
+        min_amount_out, see amm_leg.build_amm_leg). receiver and deadline are
+        per request, so this runs after the plan cache; plan itself is not
+        modified.
+        """
+        legs = []
+        for leg in plan.legs:
+            if leg.source == 'amm':
+                call = build_amm_leg(
+                    pool_address=pool_address,
+                    router_address=router_address,
+                    amount_in=leg.amount_in,
+                    min_amount_out=leg.min_amount_out,
+                    receiver=receiver,
+                    deadline=deadline,
+                    token_in=plan.hook_data_args['tokenIn'],
+                    token_out=plan.hook_data_args['tokenOut'],
+                    fee=fee
+                )
+                leg = replace(leg, to=call.to, calldata=call.calldata, deadline=deadline)
+            legs.append(leg)
+        return replace(plan, legs=legs)
+    
     def _calculate_savings(
         self,
         expected_total_out: int,
         amm_reference_out: int
-    ) -> Dict[str, int]:
+    ) -> SavingsData:
         savings_before_fee = expected_total_out - amm_reference_out
         
         if savings_before_fee < 0:
@@ -169,27 +209,22 @@ class ExecutionPlanBuilder:
             performance_fee_amount = 0
             savings_after_fee = 0
         
-        return {
-            'savings_before_fee': savings_before_fee,
-            'performance_fee_amount': performance_fee_amount,
-            'savings_after_fee': savings_after_fee
-        }
+        return SavingsData(
+            amm_reference_out=amm_reference_out,
+            expected_total_out=expected_total_out,
+            savings_before_fee=savings_before_fee,
+            performance_fee_bps=self.performance_fee_bps,
+            performance_fee_amount=performance_fee_amount,
+            savings_after_fee=savings_after_fee,
+            min_total_out=self._calculate_min_total_out(amm_reference_out),
+            max_slippage_bps=self.max_slippage_bps
+        )
     
     def _calculate_min_total_out(self, amm_reference_out: int) -> int:
         return (amm_reference_out * (10000 - self.max_slippage_bps)) // 10000
     
     def _encode_hook_data(self, hook_data_args: Dict[str, Any]) -> str:
-        types = ["address", "address", "uint256", "uint32", "uint32"]
-        values = [
-            hook_data_args["tokenIn"],
-            hook_data_args["tokenOut"],
-            int(hook_data_args["amountInOnOrderbook"]),
-            hook_data_args["maxMatches"],
-            hook_data_args["slippageLimit"]
-        ]
-        encoded = encode(types, values)
-        return "0x" + encoded.hex()
-
+        return encode_hook_data(hook_data_args)
 
 if __name__ == "__main__":
     from services.amm_uniswap_v3.uniswap_v3 import get_price_for_pool
@@ -259,28 +294,29 @@ if __name__ == "__main__":
     print("=" * 80 + "\n")
     
     print("📊 SPLIT:")
-    split = execution_plan['split']
-    print(f"   Total Input:      {int(split['amount_in_total']) / 10**6:,.2f} USDT")
-    print(f"   → Orderbook:      {int(split['amount_in_on_orderbook']) / 10**6:,.2f} USDT ({int(split['amount_in_on_orderbook']) * 100 // int(split['amount_in_total'])}%)")
-    print(f"   → AMM:            {int(split['amount_in_on_amm']) / 10**6:,.2f} USDT ({int(split['amount_in_on_amm']) * 100 // int(split['amount_in_total'])}%)\n")
+    split = execution_plan.split
+    print(f"   Total Input:      {split.amount_in_total / 10**6:,.2f} USDT")
+    print(f"   → Orderbook:      {split.amount_in_on_orderbook / 10**6:,.2f} USDT ({split.amount_in_on_orderbook * 100 // split.amount_in_total}%)")
+    print(f"   → AMM:            {split.amount_in_on_amm / 10**6:,.2f} USDT ({split.amount_in_on_amm * 100 // split.amount_in_total}%)\n")
     
     print("🔗 LEGS:")
-    for i, leg in enumerate(execution_plan['legs'], 1):
-        print(f"   Leg {i}: {leg['source']}")
-        print(f"      Amount In:  {int(leg['amount_in']) / 10**6:,.2f} USDT")
-        print(f"      Amount Out: {int(leg['expected_amount_out']) / 10**18:.6f} ETH")
-        print(f"      Price:      {float(leg['effective_price']):.10f} ETH/USDC")
+    for i, leg in enumerate(execution_plan.legs, 1):
+        print(f"   Leg {i}: {leg.source}")
+        print(f"      Amount In:  {leg.amount_in / 10**6:,.2f} USDT")
+        print(f"      Amount Out: {leg.expected_amount_out / 10**18:.6f} ETH")
+        print(f"      Price:      {float(leg.effective_price):.10f} ETH/USDC")
         
-        if 'meta' in leg and 'levels_used' in leg['meta']:
-            print(f"      Levels used: {len(leg['meta']['levels_used'])}")
+        if leg.levels_used is not None:
+            print(f"      Levels used: {len(leg.levels_used)}")
         print()
     
     print("💰 SAVINGS:")
-    amm_ref = int(execution_plan['amm_reference_out']) / 10**18
-    total_out = int(execution_plan['expected_total_out']) / 10**18
-    sav_before = int(execution_plan['savings_before_fee']) / 10**18
-    fee_amt = int(execution_plan['performance_fee_amount']) / 10**18
-    sav_after = int(execution_plan['savings_after_fee']) / 10**18
+    savings = execution_plan.savings
+    amm_ref = savings.amm_reference_out / 10**18
+    total_out = savings.expected_total_out / 10**18
+    sav_before = savings.savings_before_fee / 10**18
+    fee_amt = savings.performance_fee_amount / 10**18
+    sav_after = savings.savings_after_fee / 10**18
     
     print(f"   AMM Reference Out:    {amm_ref:.6f} ETH")
     print(f"   Expected Total Out:   {total_out:.6f} ETH")
@@ -289,16 +325,16 @@ if __name__ == "__main__":
     print(f"   Savings After Fee:    {sav_after:.6f} ETH ({sav_after / amm_ref * 10000:.2f} bps)\n")
     
     print("🔒 SLIPPAGE PROTECTION:")
-    min_out = int(execution_plan['min_total_out']) / 10**18
+    min_out = savings.min_total_out / 10**18
     print(f"   Min Total Out: {min_out:.6f} ETH\n")
     
     print("📦 HOOK DATA:")
-    print(f"   tokenIn:  {execution_plan['hook_data_args']['tokenIn']}")
-    print(f"   tokenOut: {execution_plan['hook_data_args']['tokenOut']}")
-    print(f"   amountInOnOrderbook: {execution_plan['hook_data_args']['amountInOnOrderbook']}")
-    print(f"   maxMatches: {execution_plan['hook_data_args']['maxMatches']}")
-    print(f"   slippageLimit: {execution_plan['hook_data_args']['slippageLimit']}")
-    print(f"   Encoded (hex): {execution_plan['hook_data'][:66]}...\n")
+    print(f"   tokenIn:  {execution_plan.hook_data_args['tokenIn']}")
+    print(f"   tokenOut: {execution_plan.hook_data_args['tokenOut']}")
+    print(f"   amountInOnOrderbook: {execution_plan.hook_data_args['amountInOnOrderbook']}")
+    print(f"   maxMatches: {execution_plan.hook_data_args['maxMatches']}")
+    print(f"   slippageLimit: {execution_plan.hook_data_args['slippageLimit']}")
+    print(f"   Encoded (hex): {execution_plan.hook_data[:66]}...\n")
     
     print("=" * 80)
     print("✅ MODULE 4 TEST COMPLETED!")
@@ -0,0 +1,189 @@
+"""
+hook_data.py - ABI codec for the hook payload
+
+The hook payload is abi.encode of static types only, so every field is one
+32-byte word at a fixed offset:
+
+    offset   0  address  tokenIn
+    offset  32  address  tokenOut
+    offset  64  uint256  amountInOnOrderbook
+    offset  96  uint32   maxMatches
+    offset 128  uint32   slippageLimit        (160 bytes total)
+
+`HookDataCodec` packs/unpacks that layout directly (one int.to_bytes per
+word, joined once), byte-identical to eth_abi.encode / decode for
+the same types. The schema is a tuple of `HookField`; new static fields are
+appended to it (e.g. HookDataCodec(HOOK_DATA_FIELDS + (HookField("deadline", "uint64"),))).
+
+Usage:
+    hook_data = encode_hook_data(hook_data_args)   # "0x..." (160 bytes)
+    args = decode_hook_data(hook_data)             # {"tokenIn": "0x...", ...}
+"""
+
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Iterable, List, Mapping, Tuple, Union
+
+
+WORD_SIZE = 32
+_ADDRESS_PADDING = bytes(12)
+
+
+@dataclass(frozen=True)
+class HookField:
+    name: str  # key in hook_data_args / decoded dict
+    abi_type: str  # static ABI type: address, bool, uint<N>, int<N>, bytes32
+
+
+HOOK_DATA_FIELDS: Tuple[HookField, ...] = (
+    HookField("tokenIn", "address"),
+    HookField("tokenOut", "address"),
+    HookField("amountInOnOrderbook", "uint256"),
+    HookField("maxMatches", "uint32"),
+    HookField("slippageLimit", "uint32"),
+)
+
+
+def _type_bits(abi_type: str, prefix: str) -> int:
+    bits = int(abi_type[len(prefix):] or 256)
+    if bits % 8 or not 8 <= bits <= 256:
+        raise ValueError(f"Invalid ABI type: {abi_type}")
+    return bits
+
+
+def _word_encoder(abi_type: str) -> Callable[[Any], bytes]:
+    """value -> 32-byte word, with the same range checks as eth_abi."""
+    if abi_type == "address":
+        def encode_address(value: Any) -> bytes:
+            raw = bytes.fromhex(value[2:] if value[:2] in ("0x", "0X") else value) if isinstance(value, str) else bytes(value)
+            if len(raw) != 20:
+                raise ValueError(f"address must be 20 bytes, got {len(raw)}")
+            return _ADDRESS_PADDING + raw
+        return encode_address
+
+    if abi_type == "bool":
+        def encode_bool(value: Any) -> bytes:
+            if not isinstance(value, bool):
+                raise TypeError(f"bool expected, got {type(value).__name__}")
+            return (1 if value else 0).to_bytes(WORD_SIZE, "big")
+        return encode_bool
+
+    if abi_type == "bytes32":
+        def encode_bytes32(value: Any) -> bytes:
+            raw = bytes.fromhex(value[2:]) if isinstance(value, str) else bytes(value)
+            if len(raw) > WORD_SIZE:
+                raise ValueError(f"bytes32 value is {len(raw)} bytes")
+            return raw.ljust(WORD_SIZE, b"\x00")
+        return encode_bytes32
+
+    if abi_type.startswith("uint"):
+        limit = 1 << _type_bits(abi_type, "uint")
+
+        def encode_uint(value: Any) -> bytes:
+            value = int(value)
+            if not 0 <= value < limit:
+                raise ValueError(f"{value} out of range for {abi_type}")
+            return value.to_bytes(WORD_SIZE, "big")
+        return encode_uint
+
+    if abi_type.startswith("int"):
+        half = 1 << (_type_bits(abi_type, "int") - 1)
+
+        def encode_int(value: Any) -> bytes:
+            value = int(value)
+            if not -half <= value < half:
+                raise ValueError(f"{value} out of range for {abi_type}")
+            return value.to_bytes(WORD_SIZE, "big", signed=True)
+        return encode_int
+
+    raise ValueError(f"Unsupported hook field type (static types only): {abi_type}")
+
+
+def _word_decoder(abi_type: str) -> Callable[[bytes], Any]:
+    """32-byte word -> value; non-canonical padding raises ValueError (eth_abi strict mode)."""
+    if abi_type == "address":
+        def decode_address(word: bytes) -> str:
+            if any(word[:12]):
+                raise ValueError("address word has non-zero padding")
+            return "0x" + word[12:].hex()
+        return decode_address
+
+    if abi_type == "bool":
+        def decode_bool(word: bytes) -> bool:
+            value = int.from_bytes(word, "big")
+            if value > 1:
+                raise ValueError(f"invalid bool word: {value}")
+            return value == 1
+        return decode_bool
+
+    if abi_type == "bytes32":
+        return bytes
+
+    if abi_type.startswith("uint"):
+        limit = 1 << _type_bits(abi_type, "uint")
+
+        def decode_uint(word: bytes) -> int:
+            value = int.from_bytes(word, "big")
+            if value >= limit:
+                raise ValueError(f"{value} out of range for {abi_type}")
+            return value
+        return decode_uint
+
+    if abi_type.startswith("int"):
+        half = 1 << (_type_bits(abi_type, "int") - 1)
+
+        def decode_int(word: bytes) -> int:
+            value = int.from_bytes(word, "big", signed=True)
+            if not -half <= value < half:
+                raise ValueError(f"{value} out of range for {abi_type}")
+            return value
+        return decode_int
+
+    raise ValueError(f"Unsupported hook field type (static types only): {abi_type}")
+
+
+class HookDataCodec:
+    """Encoder/decoder for a fixed layout of static ABI fields, compiled once per schema."""
+
+    def __init__(self, fields: Iterable[HookField] = HOOK_DATA_FIELDS):
+        self.fields = tuple(fields)
+        self.size = WORD_SIZE * len(self.fields)
+        self._encoders = tuple((f.name, _word_encoder(f.abi_type)) for f in self.fields)
+        self._decoders = tuple(
+            (f.name, offset * WORD_SIZE, _word_decoder(f.abi_type))
+            for offset, f in enumerate(self.fields)
+        )
+
+    @property
+    def abi_types(self) -> List[str]:
+        return [f.abi_type for f in self.fields]
+
+    def encode(self, args: Mapping[str, Any]) -> bytes:
+        return b"".join([encode_word(args[name]) for name, encode_word in self._encoders])
+
+    def encode_hex(self, args: Mapping[str, Any]) -> str:
+        return "0x" + self.encode(args).hex()
+
+    def decode(self, data: Union[bytes, str]) -> Dict[str, Any]:
+        if isinstance(data, str):
+            data = bytes.fromhex(data[2:] if data[:2] in ("0x", "0X") else data)
+        if len(data) != self.size:
+            raise ValueError(f"hook_data must be {self.size} bytes, got {len(data)}")
+        return {
+            name: decode_word(data[offset:offset + WORD_SIZE])
+            for name, offset, decode_word in self._decoders
+        }
+
+    def decode_many(self, payloads: Iterable[Union[bytes, str]]) -> List[Dict[str, Any]]:
+        return [self.decode(data) for data in payloads]
+
+
+HOOK_DATA_CODEC = HookDataCodec()
+
+
+def encode_hook_data(hook_data_args: Mapping[str, Any]) -> str:
+    """hook_data_args (see ExecutionPlanBuilder.build_plan) -> 0x-prefixed hook_data."""
+    return HOOK_DATA_CODEC.encode_hex(hook_data_args)
+
+
+def decode_hook_data(hook_data: Union[bytes, str]) -> Dict[str, Any]:
+    return HOOK_DATA_CODEC.decode(hook_data)
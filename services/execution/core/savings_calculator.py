@@ -5,7 +5,6 @@ Compares Kyber+AMM route vs pure AMM reference.
 Applies performance fee and calculates final min_out with slippage.
 """
 
-from decimal import Decimal
 from typing import Optional
 
 from .types import MatchingResult, SavingsData
@@ -41,45 +40,37 @@ def calculate_savings(
         SavingsData with full calculation
     """
     # Sum all leg min_buy_amounts for expected output
-    expected_total_out = Decimal(0)
-    for leg in matching_result.legs:
-        expected_total_out += Decimal(leg.min_buy_amount)
+    expected_total_out = sum(leg.min_buy_amount for leg in matching_result.legs)
     
     # If there's an AMM leg for remaining amount
     if amm_out_for_remaining is not None and amm_out_for_remaining > 0:
-        expected_total_out += Decimal(amm_out_for_remaining)
-    
-    # Reference output
-    amm_ref_out_decimal = Decimal(amm_reference_out)
+        expected_total_out += amm_out_for_remaining
     
     # Savings before fee (can be negative if worse than AMM)
-    savings_before_fee = expected_total_out - amm_ref_out_decimal
+    savings_before_fee = expected_total_out - amm_reference_out
     
     # Calculate performance fee (only on positive savings)
     if savings_before_fee > 0:
-        performance_fee = (savings_before_fee * Decimal(performance_fee_bps)) / Decimal(10000)
+        performance_fee = (savings_before_fee * performance_fee_bps) // 10000
     else:
-        performance_fee = Decimal(0)
+        performance_fee = 0
     
     # Savings after fee
     savings_after_fee = savings_before_fee - performance_fee
     
     # Min output with slippage protection (based on AMM reference)
-    slippage_factor = 1 - (Decimal(max_slippage_bps) / Decimal(10000))
-    min_total_out = amm_ref_out_decimal * slippage_factor
+    min_total_out = (amm_reference_out * (10000 - max_slippage_bps)) // 10000
     
-    result = SavingsData(
-        amm_reference_out=str(int(amm_ref_out_decimal)),
-        expected_total_out=str(int(expected_total_out)),
-        savings_before_fee=str(int(savings_before_fee)),
+    return SavingsData(
+        amm_reference_out=amm_reference_out,
+        expected_total_out=expected_total_out,
+        savings_before_fee=savings_before_fee,
         performance_fee_bps=performance_fee_bps,
-        performance_fee=str(int(performance_fee)),
-        savings_after_fee=str(int(savings_after_fee)),
-        min_total_out=str(int(min_total_out)),
+        performance_fee_amount=performance_fee,
+        savings_after_fee=savings_after_fee,
+        min_total_out=min_total_out,
         max_slippage_bps=max_slippage_bps,
     )
-    
-    return result
 
 
 def format_savings_summary(savings: SavingsData) -> str:
@@ -92,12 +83,12 @@ def format_savings_summary(savings: SavingsData) -> str:
     Returns:
         Formatted string summary
     """
-    amm_ref = int(savings.amm_reference_out)
-    expected = int(savings.expected_total_out)
-    savings_bf = int(savings.savings_before_fee)
-    fee = int(savings.performance_fee)
-    savings_af = int(savings.savings_after_fee)
-    min_out = int(savings.min_total_out)
+    amm_ref = savings.amm_reference_out
+    expected = savings.expected_total_out
+    savings_bf = savings.savings_before_fee
+    fee = savings.performance_fee_amount
+    savings_af = savings.savings_after_fee
+    min_out = savings.min_total_out
     
     summary = f"""
     ================================================================================
@@ -116,7 +107,7 @@ def format_savings_summary(savings: SavingsData) -> str:
        Savings (after fee):   {savings_af:+,}
     
     🛡️  Slippage Protection:
-       Max Slippage ({savings.max_slippage_bps} bps): {int(amm_ref - int(savings.min_total_out)):,}
+       Max Slippage ({savings.max_slippage_bps} bps): {amm_ref - min_out:,}
        Min Output to Accept: {min_out:,}
     
     ================================================================================
@@ -0,0 +1,146 @@
+"""
+savings_surface.py - Savings across a grid of swap sizes and fees, in bulk
+
+Evaluates what ExecutionPlanBuilder reports per plan (savings before / after
+performance fee, min_total_out) for a whole grid
+
+    ob_min_improve_bps (optional axis) × swap_amount × performance_fee_bps
+
+against one book and one AMM curve, with NumPy array ops instead of a
+match + build per point:
+
+- the book is sorted once; levels better than the AMM threshold are a prefix
+  of it, so each ob_min_improve_bps only changes how many levels are usable
+- the orderbook fill of every size is a binary search on the prefix sums of
+  level amounts (same split as GreedyMatcher), capped at the usable prefix
+- performance fees only scale savings, so the fee axis is broadcast last
+
+Values are float64 in raw token units (integer-floored where the builder
+floors), so raw amounts above 2**53 are approximate - fine for charting,
+not for calldata. Gas-aware selection and tick-aligned matching are not
+modeled. With `amm_quote` (e.g. PoolHandle.quote for a pool snapshot) the
+AMM curve is called once per distinct amount; without it AMM output uses the
+spot price, like ExecutionPlanBuilder.
+
+Usage:
+    surface = savings_surface(levels, is_bid, price_amm, 18, 6,
+                              swap_amounts=sizes, performance_fee_bps=[0, 1000, 3000])
+    surface['savings_after_fee']   # shape (len(sizes), 3)
+"""
+
+from decimal import Decimal
+from typing import Callable, Dict, Optional, Sequence, Union
+
+import numpy as np
+
+from services.matching import GreedyMatcher
+from services.orderbook import OrderbookLevel
+
+
+def _spot_output(amounts: np.ndarray, rate: float) -> np.ndarray:
+    return np.floor(amounts * rate)
+
+
+def _curve_output(amounts: np.ndarray, amm_quote: Callable[[int], int]) -> np.ndarray:
+    unique, inverse = np.unique(amounts, return_inverse=True)
+    quoted = np.array(
+        [amm_quote(int(amount)) if amount > 0 else 0 for amount in unique.tolist()],
+        dtype=np.float64
+    )
+    return quoted[inverse].reshape(amounts.shape)
+
+
+def savings_surface(
+    levels: Sequence[OrderbookLevel],
+    is_bid: bool,
+    price_amm: Decimal,
+    decimals_in: int,
+    decimals_out: int,
+    swap_amounts: Sequence[int],
+    performance_fee_bps: Sequence[int],
+    ob_min_improve_bps: Union[int, Sequence[int]] = 5,
+    max_slippage_bps: int = 100,
+    amm_quote: Optional[Callable[[int], int]] = None
+) -> Dict[str, np.ndarray]:
+    """
+    Savings surface of one book / AMM curve.
+
+    Returns arrays (raw token units), axes (K = improve grid, S = sizes, F = fees);
+    the K axis is dropped when ob_min_improve_bps is a single int:
+        swap_amounts (S), performance_fee_bps (F), ob_min_improve_bps (K)
+        amm_reference_out, min_total_out (S)
+        amount_in_on_orderbook, expected_total_out, savings_before_fee (K, S)
+        performance_fee_amount, savings_after_fee (K, S, F)
+    """
+    sizes = np.asarray(swap_amounts, dtype=np.float64)
+    fees = np.asarray(performance_fee_bps, dtype=np.float64)
+    improve_grid = np.atleast_1d(np.asarray(ob_min_improve_bps, dtype=np.int64))
+    rate_scale = Decimal(10) ** (decimals_out - decimals_in)
+
+    # Book sorted best first (as GreedyMatcher), fillable levels only
+    matchers = [
+        GreedyMatcher(price_amm, decimals_in, decimals_out, ob_min_improve_bps=int(bps))
+        for bps in improve_grid.tolist()
+    ]
+    sorted_levels = matchers[0]._prepare(list(levels), is_bid)[0]
+    book = [level for level in sorted_levels if level.amount_in_available > 0]
+
+    # Usable prefix length per threshold
+    usable = []
+    for matcher in matchers:
+        _, min_better_price, min_better_tick, _ = matcher._prepare([], is_bid)
+        usable.append(sum(
+            1 for level in book
+            if matcher._is_better(level, is_bid, False, min_better_price, min_better_tick)
+        ))
+    usable = np.asarray(usable, dtype=np.int64)[:, None]  # (K, 1)
+
+    cum_in = np.zeros(len(book) + 1)
+    cum_out = np.zeros(len(book) + 1)
+    np.cumsum([level.amount_in_available for level in book], out=cum_in[1:])
+    np.cumsum([level.amount_out_available for level in book], out=cum_out[1:])
+    # Raw out per raw in; one padding entry so indexing past the book stays valid
+    rates = np.array([float(level.price * rate_scale) for level in book] + [0.0])
+
+    # Levels filled completely (uncapped), then capped at the usable prefix
+    full = np.searchsorted(cum_in, sizes, side='right') - 1  # (S,)
+    full = np.minimum(full, len(book))
+    capped = np.minimum(full[None, :], usable)  # (K, S)
+    partial_in = np.where(full[None, :] < usable, sizes[None, :] - cum_in[capped], 0.0)
+    partial_out = np.floor(partial_in * rates[capped])
+    amount_in_on_orderbook = cum_in[capped] + partial_in
+    amount_out_from_orderbook = cum_out[capped] + partial_out
+
+    # AMM leg and 100%-AMM reference
+    amount_in_on_amm = sizes[None, :] - amount_in_on_orderbook
+    if amm_quote is None:
+        spot_rate = float(price_amm * rate_scale)
+        amount_out_from_amm = _spot_output(amount_in_on_amm, spot_rate)
+        amm_reference_out = _spot_output(sizes, spot_rate)
+    else:
+        amount_out_from_amm = _curve_output(amount_in_on_amm, amm_quote)
+        amm_reference_out = _curve_output(sizes, amm_quote)
+
+    expected_total_out = amount_out_from_orderbook + amount_out_from_amm
+    savings_before_fee = np.maximum(expected_total_out - amm_reference_out[None, :], 0.0)
+    performance_fee_amount = np.floor(savings_before_fee[..., None] * fees / 10000)
+    savings_after_fee = savings_before_fee[..., None] - performance_fee_amount
+    min_total_out = np.floor(amm_reference_out * (10000 - max_slippage_bps) / 10000)
+
+    surface = {
+        'swap_amounts': sizes,
+        'performance_fee_bps': fees,
+        'ob_min_improve_bps': improve_grid,
+        'amm_reference_out': amm_reference_out,
+        'min_total_out': min_total_out,
+        'amount_in_on_orderbook': amount_in_on_orderbook,
+        'expected_total_out': expected_total_out,
+        'savings_before_fee': savings_before_fee,
+        'performance_fee_amount': performance_fee_amount,
+        'savings_after_fee': savings_after_fee,
+    }
+    if np.ndim(ob_min_improve_bps) == 0:
+        for key in ('amount_in_on_orderbook', 'expected_total_out', 'savings_before_fee',
+                    'performance_fee_amount', 'savings_after_fee'):
+            surface[key] = surface[key][0]
+    return surface
@@ -2,6 +2,10 @@
 Type definitions for Module 4: Execution Planning
 
 Defines data classes and types used throughout the execution planning module.
+
+Raw token amounts are Python ints everywhere (uint256 values, no rounding);
+they are turned into strings only by `to_dict()`, at the JSON boundary
+(uint256 does not fit in a JSON number).
 """
 
 from dataclasses import dataclass, field
@@ -9,40 +13,67 @@ from typing import List, Optional, Dict, Any, Literal
 from decimal import Decimal
 
 
-@dataclass
+@dataclass(slots=True)
+class LevelUsed:
+    price: Decimal
+    amount_in_from_level: int
+    amount_out_from_level: int
+
+    def to_dict(self) -> Dict[str, str]:
+        return {
+            'price': str(self.price),
+            'amount_in_from_level': str(self.amount_in_from_level),
+            'amount_out_from_level': str(self.amount_out_from_level),
+        }
+
+
+@dataclass(slots=True)
 class ExecutionLeg:
-    
+
     source: Literal['kyber', 'amm']  # Where to execute
     to: str  # Contract address to call
     calldata: str  # Encoded function call
-    value: str  # ETH value sent (usually '0')
-    sell_amount: str  # Input amount (raw, with decimals)
-    min_buy_amount: str  # Minimum output amount (raw, with decimals)
+    value: int  # ETH value sent (usually 0)
+    sell_amount: int  # Input amount (raw, with decimals)
+    min_buy_amount: int  # Minimum output amount (raw, with decimals)
     meta: Optional[Dict[str, Any]] = None  # Extra metadata (order_id, pool, slippage, etc.)
 
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'source': self.source,
+            'to': self.to,
+            'calldata': self.calldata,
+            'value': str(self.value),
+            'sell_amount': str(self.sell_amount),
+            'min_buy_amount': str(self.min_buy_amount),
+            'meta': self.meta or {},
+        }
 
-@dataclass
+
+@dataclass(slots=True)
 class MatchingResult:
-    
+
     legs: List[ExecutionLeg]  # List of execution steps
-    remaining_in: str  # Unmatched amount
-    kyber_amount: str  # Amount matched from Kyber/synthetic orderbook
-    amm_amount: str  # Amount to swap via AMM
-    total_out_from_matching: str  # Total output from matched legs
+    remaining_in: int  # Unmatched amount
+    kyber_amount: int  # Amount matched from Kyber/synthetic orderbook
+    amm_amount: int  # Amount to swap via AMM
+    total_out_from_matching: int  # Total output from matched legs
 
 
-@dataclass
+@dataclass(slots=True)
 class SavingsData:
-    
-    amm_reference_out: Decimal  # Output if swapped 100% via AMM
-    expected_total_out: Decimal  # Combined output (orderbook + AMM)
-    savings_before_fee: Decimal  # Savings before performance fee
+
+    amm_reference_out: int  # Output if swapped 100% via AMM
+    expected_total_out: int  # Combined output (orderbook + AMM)
+    savings_before_fee: int  # Savings before performance fee
     performance_fee_bps: int  # Performance fee in basis points
-    performance_fee_amount: Decimal  # Performance fee in token units
-    savings_after_fee: Decimal  # Savings after performance fee
-    
+    performance_fee_amount: int  # Performance fee in token units
+    savings_after_fee: int  # Savings after performance fee
+    min_total_out: int  # Minimum output with slippage tolerance
+    max_slippage_bps: int  # Slippage tolerance used for min_total_out
+
     def to_dict(self) -> Dict[str, Any]:
-        
+
         return {
             'amm_reference_out': str(self.amm_reference_out),
             'expected_total_out': str(self.expected_total_out),
@@ -50,37 +81,108 @@ class SavingsData:
             'performance_fee_bps': self.performance_fee_bps,
             'performance_fee_amount': str(self.performance_fee_amount),
             'savings_after_fee': str(self.savings_after_fee),
+            'min_total_out': str(self.min_total_out),
+            'max_slippage_bps': self.max_slippage_bps,
         }
 
 
-@dataclass
+@dataclass(slots=True)
+class PlanSplit:
+
+    amount_in_total: int
+    amount_in_on_orderbook: int
+    amount_in_on_amm: int
+
+    def to_dict(self) -> Dict[str, str]:
+        return {
+            'amount_in_total': str(self.amount_in_total),
+            'amount_in_on_orderbook': str(self.amount_in_on_orderbook),
+            'amount_in_on_amm': str(self.amount_in_on_amm),
+        }
+
+
+@dataclass(slots=True)
+class PlanLeg:
+
+    source: Literal['internal_orderbook', 'amm']
+    amount_in: int
+    expected_amount_out: int
+    effective_price: Decimal  # expected_amount_out / amount_in (raw units)
+    levels_used: Optional[List[LevelUsed]] = None  # orderbook leg only
+    min_amount_out: Optional[int] = None  # AMM leg only, after max_slippage_bps
+    to: Optional[str] = None  # AMM leg: SwapRouter02 (ExecutionPlanBuilder.with_amm_call)
+    calldata: Optional[str] = None  # AMM leg: multicall(deadline, [exactInputSingle])
+    deadline: Optional[int] = None
+
+    def to_dict(self) -> Dict[str, Any]:
+        leg = {
+            'source': self.source,
+            'amount_in': str(self.amount_in),
+            'expected_amount_out': str(self.expected_amount_out),
+            'effective_price': str(self.effective_price),
+        }
+        if self.min_amount_out is not None:
+            leg['min_amount_out'] = str(self.min_amount_out)
+        if self.calldata is not None:
+            leg['to'] = self.to
+            leg['calldata'] = self.calldata
+            leg['deadline'] = self.deadline
+        if self.levels_used is not None:
+            leg['meta'] = {'levels_used': [level.to_dict() for level in self.levels_used]}
+        return leg
+
+
+@dataclass(slots=True)
+class GasEstimate:
+
+    gas_price_wei: int
+    gas_units: int
+    gas_cost_out: int  # raw token_out
+    amm_only_gas_cost_out: int  # raw token_out, same swap 100% via AMM
+    amm_ticks_crossed: int
+    orderbook_matches: int
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'gas_price_wei': str(self.gas_price_wei),
+            'gas_units': self.gas_units,
+            'gas_cost_out': str(self.gas_cost_out),
+            'amm_only_gas_cost_out': str(self.amm_only_gas_cost_out),
+            'amm_ticks_crossed': self.amm_ticks_crossed,
+            'orderbook_matches': self.orderbook_matches,
+        }
+
+
+@dataclass(slots=True)
 class ExecutionPlan:
-    
-    split: Dict[str, Any]  # {amount_in_total, amount_in_on_orderbook, amount_in_on_amm}
-    legs: List[ExecutionLeg]  # Execution steps
-    hook_data_args: Dict[str, Any]  # Arguments for hook_data
+
+    split: PlanSplit  # Input split between orderbook and AMM
+    legs: List[PlanLeg]  # Execution steps
+    hook_data_args: Dict[str, Any]  # Arguments for hook_data (amountInOnOrderbook as int)
     hook_data: str  # ABI encoded hook_data (hex string)
-    savings: SavingsData  # Savings metrics
-    min_total_out: str  # Minimum output with slippage tolerance
-    
+    savings: SavingsData  # Savings metrics and min_total_out
+    gas: Optional[GasEstimate] = None  # Gas-aware matching only
+    metadata: Dict[str, Any] = field(default_factory=dict)  # Filled in by the API
+
     def to_dict(self) -> Dict[str, Any]:
-        
-        return {
-            'split': self.split,
-            'legs': [
-                {
-                    'source': leg.source,
-                    'to': leg.to,
-                    'calldata': leg.calldata,
-                    'value': leg.value,
-                    'sell_amount': leg.sell_amount,
-                    'min_buy_amount': leg.min_buy_amount,
-                    'meta': leg.meta or {},
-                }
-                for leg in self.legs
-            ],
-            'hook_data_args': self.hook_data_args,
+        """Response shape of the execution-plan endpoint (see api/schemas.py)."""
+        savings = self.savings
+        plan = {
+            'split': self.split.to_dict(),
+            'legs': [leg.to_dict() for leg in self.legs],
+            'hook_data_args': {
+                **self.hook_data_args,
+                'amountInOnOrderbook': str(self.hook_data_args['amountInOnOrderbook']),
+            },
             'hook_data': self.hook_data,
-            'savings': self.savings.to_dict(),
-            'min_total_out': self.min_total_out,
+            'amm_reference_out': str(savings.amm_reference_out),
+            'expected_total_out': str(savings.expected_total_out),
+            'savings_before_fee': str(savings.savings_before_fee),
+            'performance_fee_amount': str(savings.performance_fee_amount),
+            'savings_after_fee': str(savings.savings_after_fee),
+            'min_total_out': str(savings.min_total_out),
         }
+        if self.gas is not None:
+            plan['gas'] = self.gas.to_dict()
+        plan['metadata'] = self.metadata
+        return plan
@@ -8,9 +8,11 @@ Modules:
 from .virtual_orderbook import (
     VirtualOrderBook,
     generate_sample_cex_snapshot,
+    cex_snapshot_to_arrays,
 )
 
 __all__ = [
     "VirtualOrderBook",
     "generate_sample_cex_snapshot",
+    "cex_snapshot_to_arrays",
 ]
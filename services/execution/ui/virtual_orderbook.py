@@ -23,11 +23,19 @@ Usage:
     )
 """
 
-from typing import List, Dict, Union, Optional
+from typing import List, Dict, Mapping, Union, Optional
 from decimal import Decimal
 import json
 import math
 
+import numpy as np
+
+from services.orderbook import OrderbookLevel, level_amount_out
+
+
+# Scenario large: chỉ dùng CEX levels trong ±2% quanh mid
+LARGE_PRICE_RANGE_PCT = 0.02
+
 
 class VirtualOrderBook:
     """
@@ -37,8 +45,15 @@ class VirtualOrderBook:
         mid_price (Decimal): Giá trung bình (token_out / token_in)
         token_in_decimals (int): Decimals của token input
         token_out_decimals (int): Decimals của token output
-        bid_levels (List[Dict]): Danh sách bid levels
-        ask_levels (List[Dict]): Danh sách ask levels
+        bid_levels (List[OrderbookLevel]): Bid levels, best trước (price < mid)
+        ask_levels (List[OrderbookLevel]): Ask levels, best trước (price > mid)
+    
+    Levels dùng chung kiểu OrderbookLevel với SyntheticOrderbookGenerator /
+    GreedyMatcher (price Decimal token_out / token_in, amount raw int), nên
+    book có thể match trực tiếp (orderbook_levels()); chỉ snapshot() đổi sang
+    float cho UI/JSON. Scenario large giữ levels dạng cột (build_large_levels),
+    OrderbookLevel chỉ được tạo khi cần (orderbook_levels / bid_levels /
+    ask_levels), snapshot() đọc thẳng từ mảng.
     
     Methods:
         build_orderbook(): Xây dựng orderbook theo scenario
@@ -65,9 +80,20 @@ class VirtualOrderBook:
         self.mid_price = Decimal(str(mid_price))
         self.token_in_decimals = token_in_decimals
         self.token_out_decimals = token_out_decimals
+        self._scale_in = Decimal(10) ** token_in_decimals
         
-        self.bid_levels: List[Dict] = []  # Bid side (price < mid)
-        self.ask_levels: List[Dict] = []  # Ask side (price > mid)
+        self._levels: Dict[str, Optional[List[OrderbookLevel]]] = {'bid': [], 'ask': []}
+        self._large_arrays: Optional[Dict[str, np.ndarray]] = None  # scenario large, dạng cột
+    
+    @property
+    def bid_levels(self) -> List[OrderbookLevel]:
+        """Bid side (price < mid), best trước."""
+        return self.orderbook_levels('bid')
+    
+    @property
+    def ask_levels(self) -> List[OrderbookLevel]:
+        """Ask side (price > mid), best trước."""
+        return self.orderbook_levels('ask')
     
     def build_orderbook(
         self,
@@ -77,7 +103,7 @@ class VirtualOrderBook:
         base_size: Optional[Union[float, Decimal]] = None,
         decay: float = 0.5,
         capital_usd: Optional[float] = None,
-        cex_snapshot: Optional[List[Dict]] = None
+        cex_snapshot: Optional[Union[List[Dict], Mapping[str, np.ndarray]]] = None
     ) -> Dict:
         """
         Xây dựng synthetic orderbook theo scenario.
@@ -92,7 +118,8 @@ class VirtualOrderBook:
             base_size: Size của level đầu tiên (token_in), default = 2 × swap_amount
             decay: Hệ số giảm size khi ra xa mid (0.5-0.7)
             capital_usd: Vốn UniHybrid cho scenario large (USD)
-            cex_snapshot: List [{price, size}, ...] từ CEX (dùng cho large)
+            cex_snapshot: List [{side, price, size}, ...] từ CEX hoặc dạng cột
+                (dùng cho large, xem build_large_levels)
         
         Returns:
             Dict: {
@@ -114,8 +141,8 @@ class VirtualOrderBook:
             base_size = Decimal(str(base_size))
         
         # Clear previous levels
-        self.bid_levels = []
-        self.ask_levels = []
+        self._levels = {'bid': [], 'ask': []}
+        self._large_arrays = None
         
         if scenario == 'small':
             self._build_small_orderbook(swap_amount, spread_step_bps)
@@ -163,19 +190,11 @@ class VirtualOrderBook:
         
         # Bid level (ask to buy): giá < mid
         bid_price = self.mid_price / spread_multiplier
-        self.bid_levels.append({
-            'price': float(bid_price),
-            'amount_in_available': float(depth),
-            'side': 'bid'
-        })
+        self.bid_levels.append(self._make_level(bid_price, depth))
         
         # Ask level (ask to sell): giá > mid
         ask_price = self.mid_price * spread_multiplier
-        self.ask_levels.append({
-            'price': float(ask_price),
-            'amount_in_available': float(depth),
-            'side': 'ask'
-        })
+        self.ask_levels.append(self._make_level(ask_price, depth))
     
     def _build_medium_orderbook(
         self,
@@ -200,56 +219,30 @@ class VirtualOrderBook:
         num_levels = 3  # 3-5, dùng 3 là default
         spread_multiplier = self._bps_to_multiplier(spread_step_bps)
         
-        # Build bid side (price < mid)
-        bid_levels_list = []
-        ask_levels_list = []
+        sizes = [base_size * Decimal(str(decay ** i)) for i in range(num_levels)]
         
-        for i in range(num_levels):
-            # Size tại level i: base_size * (decay ^ i)
-            size_at_level = base_size * Decimal(str(decay ** i))
-            
+        # Nếu tổng > 2-3 × swap_amount → scale xuống
+        total_size = sum(sizes)
+        target_total = swap_amount * Decimal('2.5')
+        if total_size > target_total:
+            scale_factor = target_total / total_size
+            sizes = [size * scale_factor for size in sizes]
+        
+        for i, size_at_level in enumerate(sizes):
             # Bid: price < mid, cộng spread dần
             bid_price = self.mid_price / (spread_multiplier ** (i + 1))
-            bid_levels_list.append({
-                'level': i,
-                'price': float(bid_price),
-                'amount_in_available': float(size_at_level),
-                'side': 'bid'
-            })
+            self.bid_levels.append(self._make_level(bid_price, size_at_level))
             
             # Ask: price > mid, cộng spread dần
             ask_price = self.mid_price * (spread_multiplier ** (i + 1))
-            ask_levels_list.append({
-                'level': i,
-                'price': float(ask_price),
-                'amount_in_available': float(size_at_level),
-                'side': 'ask'
-            })
-        
-        # Tính tổng liquidity
-        total_size = sum(
-            Decimal(str(level['amount_in_available']))
-            for level in bid_levels_list
-        )
-        
-        # Nếu tổng > 2-3 × swap_amount → scale xuống
-        target_total = swap_amount * Decimal('2.5')
-        if total_size > target_total:
-            scale_factor = float(target_total / total_size)
-            for level in bid_levels_list:
-                level['amount_in_available'] *= scale_factor
-            for level in ask_levels_list:
-                level['amount_in_available'] *= scale_factor
-        
-        self.bid_levels = bid_levels_list
-        self.ask_levels = ask_levels_list
+            self.ask_levels.append(self._make_level(ask_price, size_at_level))
     
     def _build_large_orderbook(
         self,
         swap_amount: Decimal,
         spread_step_bps: int,
         capital_usd: float,
-        cex_snapshot: List[Dict]
+        cex_snapshot: Union[List[Dict], Mapping[str, np.ndarray]]
     ) -> None:
         """
         Scenario Large / Binance-like: Dùng shape từ CEX.
@@ -273,97 +266,139 @@ class VirtualOrderBook:
                 {'side': 'ask', 'price': 2702, 'size': 8.3},
                 ...
             ]
+            hoặc dạng cột (xem build_large_levels)
         """
-        # Filter levels trong ±1-2% quanh mid
-        price_range_pct = Decimal('0.02')  # 2%
-        price_min = self.mid_price * (Decimal('1') - price_range_pct)
-        price_max = self.mid_price * (Decimal('1') + price_range_pct)
-        
-        filtered_bids = []
-        filtered_asks = []
-        bid_notional = Decimal('0')
-        ask_notional = Decimal('0')
-        
-        for level in cex_snapshot:
-            side = level.get('side', '').lower()
-            price = Decimal(str(level['price']))
-            size = Decimal(str(level['size']))
-            
-            # Check nếu price trong range
-            if not (price_min <= price <= price_max):
-                continue
-            
-            notional = price * size
-            
-            if side == 'bid':
-                filtered_bids.append({
-                    'price': price,
-                    'size': size,
-                    'notional': notional
-                })
-                bid_notional += notional
-            elif side == 'ask':
-                filtered_asks.append({
-                    'price': price,
-                    'size': size,
-                    'notional': notional
-                })
-                ask_notional += notional
-        
-        # Tính scale factor dựa trên capital_usd
-        capital_decimal = Decimal(str(capital_usd))
-        total_cex_notional = bid_notional + ask_notional
-        
-        if total_cex_notional > 0:
-            scale_factor = capital_decimal / total_cex_notional
+        # Giữ dạng cột; OrderbookLevel tạo lazily trong orderbook_levels()
+        self._large_arrays = self.build_large_levels(capital_usd, cex_snapshot)
+        self._levels = {'bid': None, 'ask': None}
+    
+    def build_large_levels(
+        self,
+        capital_usd: float,
+        cex_snapshot: Union[List[Dict], Mapping[str, np.ndarray]],
+        price_range_pct: float = LARGE_PRICE_RANGE_PCT
+    ) -> Dict[str, np.ndarray]:
+        """
+        Scenario Large, vectorized: levels dạng cột (NumPy float64).
+        
+        - Lọc levels trong ±price_range_pct quanh mid
+        - Notional = price × size, scale theo capital_usd / tổng notional
+        - amount_in = notional × scale / price
+        - Bids sort giảm dần, asks sort tăng dần (best first)
+        
+        Args:
+            capital_usd: Vốn UniHybrid (USD)
+            cex_snapshot: List [{side, price, size}, ...] hoặc dạng cột
+                {'bid_prices', 'bid_sizes', 'ask_prices', 'ask_sizes'}
+                (vd L2Book.to_arrays())
+            price_range_pct: Biên lọc quanh mid (0.02 = ±2%)
+        
+        Returns:
+            Dict: {'bid_prices', 'bid_amounts', 'bid_amounts_raw', 'bid_amounts_out_raw',
+                   'ask_prices', 'ask_amounts', 'ask_amounts_raw', 'ask_amounts_out_raw'}
+            *_amounts theo đơn vị token_in; *_raw là số nguyên (floor) lưu float64
+            như MonteCarloOrderbookGenerator, vì raw 18 decimals vượt int64
+        """
+        if isinstance(cex_snapshot, Mapping):
+            columns = cex_snapshot
         else:
-            scale_factor = Decimal('1')
-        
-        # Build bid levels từ filtered_bids
-        for level in sorted(filtered_bids, key=lambda x: x['price'], reverse=True):
-            scaled_size_usd = level['notional'] * scale_factor
-            # Convert USD size → token_in amount
-            # amount_in = scaled_size_usd / price
-            amount_in = scaled_size_usd / level['price']
-            
-            self.bid_levels.append({
-                'price': float(level['price']),
-                'amount_in_available': float(amount_in),
-                'side': 'bid'
-            })
-        
-        # Build ask levels từ filtered_asks
-        for level in sorted(filtered_asks, key=lambda x: x['price']):
-            scaled_size_usd = level['notional'] * scale_factor
-            amount_in = scaled_size_usd / level['price']
-            
-            self.ask_levels.append({
-                'price': float(level['price']),
-                'amount_in_available': float(amount_in),
-                'side': 'ask'
-            })
+            columns = cex_snapshot_to_arrays(cex_snapshot)
+        
+        mid = float(self.mid_price)
+        price_min = mid * (1 - price_range_pct)
+        price_max = mid * (1 + price_range_pct)
+        
+        sides = []
+        total_notional = 0.0
+        for side in ('bid', 'ask'):
+            prices = np.asarray(columns[f'{side}_prices'], dtype=np.float64)
+            sizes = np.asarray(columns[f'{side}_sizes'], dtype=np.float64)
+            in_band = (prices >= price_min) & (prices <= price_max)
+            prices = prices[in_band]
+            sizes = sizes[in_band]
+            total_notional += float(np.dot(prices, sizes))
+            sides.append((side, prices, sizes))
+        
+        scale_factor = capital_usd / total_notional if total_notional > 0 else 1.0
+        scale_in = 10.0 ** self.token_in_decimals
+        rate_scale = 10.0 ** (self.token_out_decimals - self.token_in_decimals)
+        
+        result: Dict[str, np.ndarray] = {}
+        for side, prices, sizes in sides:
+            order = np.argsort(-prices if side == 'bid' else prices, kind='stable')
+            prices = prices[order]
+            # amount_in = (price × size × scale) / price = size × scale
+            amounts = sizes[order] * scale_factor
+            amounts_raw = np.floor(amounts * scale_in)
+            result[f'{side}_prices'] = prices
+            result[f'{side}_amounts'] = amounts
+            result[f'{side}_amounts_raw'] = amounts_raw
+            result[f'{side}_amounts_out_raw'] = np.floor(amounts_raw * prices * rate_scale)
+        return result
     
-    def get_best_bid(self) -> Optional[Dict]:
+    def _make_level(self, price: Decimal, amount_in: Decimal) -> OrderbookLevel:
+        """Level từ price (token_out / token_in) và amount_in (đơn vị token_in)."""
+        amount_in_raw = int(amount_in * self._scale_in)
+        return OrderbookLevel(
+            price=price,
+            amount_in_available=amount_in_raw,
+            amount_out_available=level_amount_out(
+                amount_in_raw, price, self.token_in_decimals, self.token_out_decimals
+            )
+        )
+    
+    def orderbook_levels(self, side: str) -> List[OrderbookLevel]:
+        """
+        Levels của một phía cho GreedyMatcher.match(), không copy / convert.
+        
+        Args:
+            side: 'bid' hoặc 'ask'
+        
+        Returns:
+            List[OrderbookLevel]: Chính list levels của book (best trước),
+                scenario large tạo từ mảng ở lần gọi đầu
+        """
+        if side not in ('bid', 'ask'):
+            raise ValueError(f"Unknown side '{side}'. Must be 'bid' or 'ask'")
+        levels = self._levels[side]
+        if levels is None:
+            arrays = self._large_arrays
+            # repr ngắn nhất của float → Decimal, round-trip exact
+            levels = self._levels[side] = [
+                OrderbookLevel(
+                    price=Decimal(repr(price)),
+                    amount_in_available=int(amount_in),
+                    amount_out_available=int(amount_out)
+                )
+                for price, amount_in, amount_out in zip(
+                    arrays[f'{side}_prices'].tolist(),
+                    arrays[f'{side}_amounts_raw'].tolist(),
+                    arrays[f'{side}_amounts_out_raw'].tolist()
+                )
+            ]
+        return levels
+    
+    def get_best_bid(self) -> Optional[OrderbookLevel]:
         """
         Lấy mức bid tốt nhất (giá cao nhất).
         
         Returns:
-            Dict: {price, amount_in_available} hoặc None nếu không có bid
+            OrderbookLevel hoặc None nếu không có bid
         """
         if not self.bid_levels:
             return None
-        return max(self.bid_levels, key=lambda x: x['price'])
+        return max(self.bid_levels, key=lambda x: x.price)
     
-    def get_best_ask(self) -> Optional[Dict]:
+    def get_best_ask(self) -> Optional[OrderbookLevel]:
         """
         Lấy mức ask tốt nhất (giá thấp nhất).
         
         Returns:
-            Dict: {price, amount_in_available} hoặc None nếu không có ask
+            OrderbookLevel hoặc None nếu không có ask
         """
         if not self.ask_levels:
             return None
-        return min(self.ask_levels, key=lambda x: x['price'])
+        return min(self.ask_levels, key=lambda x: x.price)
     
     def get_spread(self) -> Optional[float]:
         """
@@ -378,10 +413,7 @@ class VirtualOrderBook:
         if best_bid is None or best_ask is None:
             return None
         
-        bid_price = Decimal(str(best_bid['price']))
-        ask_price = Decimal(str(best_ask['price']))
-        
-        spread = (ask_price - bid_price) / self.mid_price * Decimal('10000')
+        spread = (best_ask.price - best_bid.price) / self.mid_price * Decimal('10000')
         return float(spread)
     
     def get_total_bid_liquidity(self) -> Decimal:
@@ -391,10 +423,7 @@ class VirtualOrderBook:
         Returns:
             Decimal: Tổng amount_in_available từ tất cả bid levels
         """
-        return sum(
-            Decimal(str(level['amount_in_available']))
-            for level in self.bid_levels
-        )
+        return Decimal(sum(level.amount_in_available for level in self.bid_levels)) / self._scale_in
     
     def get_total_ask_liquidity(self) -> Decimal:
         """
@@ -403,10 +432,16 @@ class VirtualOrderBook:
         Returns:
             Decimal: Tổng amount_in_available từ tất cả ask levels
         """
-        return sum(
-            Decimal(str(level['amount_in_available']))
-            for level in self.ask_levels
-        )
+        return Decimal(sum(level.amount_in_available for level in self.ask_levels)) / self._scale_in
+    
+    def _level_dict(self, level: OrderbookLevel, side: str, index: int) -> Dict:
+        """OrderbookLevel → dict float cho UI/JSON."""
+        return {
+            'level': index,
+            'price': float(level.price),
+            'amount_in_available': level.amount_in_available / 10 ** self.token_in_decimals,
+            'side': side
+        }
     
     def snapshot(self) -> Dict:
         """
@@ -424,21 +459,56 @@ class VirtualOrderBook:
                 'total_ask_liquidity': float
             }
         """
-        best_bid = self.get_best_bid()
-        best_ask = self.get_best_ask()
-        spread = self.get_spread()
+        if self._large_arrays is not None:
+            return self._snapshot_from_arrays(self._large_arrays)
+        
+        bid_levels = [self._level_dict(level, 'bid', i) for i, level in enumerate(self.bid_levels)]
+        ask_levels = [self._level_dict(level, 'ask', i) for i, level in enumerate(self.ask_levels)]
         
         return {
             'mid_price': float(self.mid_price),
-            'bid_levels': self.bid_levels,
-            'ask_levels': self.ask_levels,
-            'best_bid': best_bid,
-            'best_ask': best_ask,
-            'spread_bps': spread,
+            'bid_levels': bid_levels,
+            'ask_levels': ask_levels,
+            'best_bid': max(bid_levels, key=lambda x: x['price']) if bid_levels else None,
+            'best_ask': min(ask_levels, key=lambda x: x['price']) if ask_levels else None,
+            'spread_bps': self.get_spread(),
             'total_bid_liquidity': float(self.get_total_bid_liquidity()),
             'total_ask_liquidity': float(self.get_total_ask_liquidity())
         }
     
+    def _snapshot_from_arrays(self, arrays: Dict[str, np.ndarray]) -> Dict:
+        """snapshot() cho scenario large, không tạo OrderbookLevel."""
+        scale_in = 10 ** self.token_in_decimals
+        sides = {}
+        for side in ('bid', 'ask'):
+            amounts = arrays[f'{side}_amounts_raw'] / scale_in
+            sides[side] = [
+                {'level': i, 'price': price, 'amount_in_available': amount, 'side': side}
+                for i, (price, amount) in enumerate(zip(arrays[f'{side}_prices'].tolist(), amounts.tolist()))
+            ]
+        bid_levels = sides['bid']
+        ask_levels = sides['ask']
+        
+        # Levels đã sort best trước; spread tính bằng Decimal như get_spread()
+        spread_bps = None
+        if bid_levels and ask_levels:
+            spread = (
+                (Decimal(repr(ask_levels[0]['price'])) - Decimal(repr(bid_levels[0]['price'])))
+                / self.mid_price * Decimal('10000')
+            )
+            spread_bps = float(spread)
+        
+        return {
+            'mid_price': float(self.mid_price),
+            'bid_levels': bid_levels,
+            'ask_levels': ask_levels,
+            'best_bid': bid_levels[0] if bid_levels else None,
+            'best_ask': ask_levels[0] if ask_levels else None,
+            'spread_bps': spread_bps,
+            'total_bid_liquidity': float(arrays['bid_amounts_raw'].sum()) / scale_in,
+            'total_ask_liquidity': float(arrays['ask_amounts_raw'].sum()) / scale_in
+        }
+    
     def to_json(self, indent: int = 2) -> str:
         """
         Serialize orderbook thành JSON string.
@@ -474,6 +544,25 @@ class VirtualOrderBook:
         return Decimal('1') + (Decimal(str(bps)) / Decimal('10000'))
 
 
+def cex_snapshot_to_arrays(cex_snapshot: List[Dict]) -> Dict[str, np.ndarray]:
+    """
+    List [{side, price, size}, ...] → dạng cột
+    {'bid_prices', 'bid_sizes', 'ask_prices', 'ask_sizes'} (float64).
+    """
+    n = len(cex_snapshot)
+    prices = np.fromiter((level['price'] for level in cex_snapshot), dtype=np.float64, count=n)
+    sizes = np.fromiter((level['size'] for level in cex_snapshot), dtype=np.float64, count=n)
+    sides = np.array([level.get('side', '').lower() for level in cex_snapshot])
+    is_bid = sides == 'bid'
+    is_ask = sides == 'ask'
+    return {
+        'bid_prices': prices[is_bid],
+        'bid_sizes': sizes[is_bid],
+        'ask_prices': prices[is_ask],
+        'ask_sizes': sizes[is_ask],
+    }
+
+
 # ============================================================================
 # HELPER: Sample CEX snapshot generator (dùng cho testing)
 # ============================================================================
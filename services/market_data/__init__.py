@@ -0,0 +1,22 @@
+"""
+Market Data Package
+
+CEX L2 depth ingestion: a local book kept in sync from snapshot + diff
+messages (recorded files or a local replay server), exposing its current
+shape to VirtualOrderBook / SyntheticOrderbookGenerator.
+"""
+
+from .l2_book import L2Book, SequenceGapError
+from .sources import parse_message, read_recorded, ReplayServer, stream_replay
+from .feed import ingest, ingest_async
+
+__all__ = [
+    'L2Book',
+    'SequenceGapError',
+    'parse_message',
+    'read_recorded',
+    'ReplayServer',
+    'stream_replay',
+    'ingest',
+    'ingest_async',
+]
@@ -0,0 +1,51 @@
+"""
+feed.py - Drive an L2Book from a message source, resyncing on sequence gaps
+
+On a gap the book is unsynced and buffers diffs. With a `resync` callable
+(e.g. a REST depth snapshot fetch) the book is rebuilt right away; without
+one (recorded files / replay, which carry periodic snapshots) the next
+snapshot in the stream rebuilds it.
+"""
+
+from typing import Any, AsyncIterable, Callable, Iterable, Mapping, Optional
+
+from .l2_book import L2Book, SequenceGapError
+
+
+Resync = Callable[[], Mapping[str, Any]]
+
+
+def _on_gap(book: L2Book, resync: Optional[Resync]) -> None:
+    if resync is not None:
+        snapshot = resync()
+        book.apply_snapshot(snapshot["seq"], snapshot["bids"], snapshot["asks"])
+
+
+def ingest(book: L2Book, messages: Iterable[Mapping[str, Any]], resync: Optional[Resync] = None) -> int:
+    """Apply every message to the book; returns the number of messages read."""
+    count = 0
+    apply = book.apply
+    for message in messages:
+        count += 1
+        try:
+            apply(message)
+        except SequenceGapError:
+            _on_gap(book, resync)
+    return count
+
+
+async def ingest_async(
+    book: L2Book,
+    messages: AsyncIterable[Mapping[str, Any]],
+    resync: Optional[Resync] = None
+) -> int:
+    """Async variant of `ingest` (e.g. for `stream_replay`)."""
+    count = 0
+    apply = book.apply
+    async for message in messages:
+        count += 1
+        try:
+            apply(message)
+        except SequenceGapError:
+            _on_gap(book, resync)
+    return count
@@ -0,0 +1,190 @@
+"""
+l2_book.py - Local CEX L2 depth book maintained from a snapshot + diff stream
+
+Standard CEX depth-sync protocol (Binance-style update ids):
+- a snapshot carries `seq` (last update id included in it)
+- each diff carries `first_seq` .. `seq` (update ids it covers)
+- diffs with seq <= book.seq are stale and dropped
+- a diff with first_seq > book.seq + 1 means messages were lost: the book is
+  marked unsynced (SequenceGapError) and must be rebuilt from a new snapshot
+- diffs received while unsynced are buffered and replayed on top of the next
+  snapshot (the ones it already covers are dropped as stale)
+
+A size of 0 removes the level.
+
+Each price level is stored once, as the dict read by VirtualOrderBook
+({'side', 'price', 'size'}); a diff updates that dict in place. `cex_snapshot()`
+returns the book's own level dicts (sorted view cached until a price level is
+added or removed), so consumers read the live shape without a per-call copy;
+`to_arrays()` gives the columnar form for VirtualOrderBook.build_large_levels.
+The view reflects the book until the next apply(); readers on another thread
+must copy it first.
+"""
+
+from collections import deque
+from typing import Any, Deque, Dict, Iterable, List, Mapping, Optional, Sequence
+
+import numpy as np
+
+
+# Diffs kept while waiting for a (re)sync snapshot
+MAX_PENDING_DIFFS = 10000
+
+
+class SequenceGapError(Exception):
+    """Diff does not follow the last applied update id; the book needs a new snapshot."""
+
+
+class L2Book:
+
+    __slots__ = (
+        "symbol", "bids", "asks", "seq", "synced",
+        "updates_applied", "gaps", "_pending", "_bid_view", "_ask_view", "_view",
+    )
+
+    def __init__(self, symbol: str = "", max_pending: int = MAX_PENDING_DIFFS):
+        self.symbol = symbol
+        self.bids: Dict[float, Dict[str, Any]] = {}
+        self.asks: Dict[float, Dict[str, Any]] = {}
+        self.seq: Optional[int] = None
+        self.synced = False
+        self.updates_applied = 0
+        self.gaps = 0
+        self._pending: Deque[Mapping[str, Any]] = deque(maxlen=max_pending)
+        self._bid_view: Optional[List[Dict[str, Any]]] = None
+        self._ask_view: Optional[List[Dict[str, Any]]] = None
+        self._view: Optional[List[Dict[str, Any]]] = None
+
+    # ------------------------------------------------------------------
+    # Updates
+    # ------------------------------------------------------------------
+
+    def apply(self, message: Mapping[str, Any]) -> bool:
+        """Apply a normalized message (see sources.parse_message). True if the book changed."""
+        if message["type"] == "snapshot":
+            self.apply_snapshot(message["seq"], message["bids"], message["asks"])
+            return True
+        return self.apply_diff(message)
+
+    def apply_snapshot(self, seq: int, bids: Iterable[Sequence], asks: Iterable[Sequence]) -> None:
+        """Replace the book, then replay buffered diffs newer than the snapshot."""
+        self.bids = {}
+        self.asks = {}
+        self._invalidate_bids()
+        self._invalidate_asks()
+        self._update_side(self.bids, "bid", bids)
+        self._update_side(self.asks, "ask", asks)
+        self.seq = seq
+        self.synced = True
+
+        pending = self._pending
+        self._pending = deque(maxlen=pending.maxlen)
+        while pending:
+            try:
+                self.apply_diff(pending.popleft())
+            except SequenceGapError:
+                # Snapshot older than the buffered stream: keep the rest for the next one
+                self._pending.extend(pending)
+                return
+
+    def apply_diff(self, diff: Mapping[str, Any]) -> bool:
+        """
+        Apply one diff. False if it was buffered (book unsynced) or stale.
+        Raises SequenceGapError if update ids were skipped.
+        """
+        if not self.synced:
+            self._pending.append(diff)
+            return False
+        if diff["seq"] <= self.seq:
+            return False
+        if diff["first_seq"] > self.seq + 1:
+            self.synced = False
+            self.gaps += 1
+            self._pending.clear()
+            self._pending.append(diff)
+            raise SequenceGapError(
+                f"{self.symbol or 'book'}: expected update {self.seq + 1}, got {diff['first_seq']}"
+            )
+
+        if diff["bids"]:
+            self._update_side(self.bids, "bid", diff["bids"])
+        if diff["asks"]:
+            self._update_side(self.asks, "ask", diff["asks"])
+        self.seq = diff["seq"]
+        self.updates_applied += 1
+        return True
+
+    def _update_side(self, levels: Dict[float, Dict[str, Any]], side: str, updates: Iterable[Sequence]) -> None:
+        reshaped = False
+        for price, size in updates:
+            price = float(price)
+            size = float(size)
+            level = levels.get(price)
+            if size == 0.0:
+                if level is not None:
+                    del levels[price]
+                    reshaped = True
+            elif level is not None:
+                level["size"] = size
+            else:
+                levels[price] = {"side": side, "price": price, "size": size}
+                reshaped = True
+        if reshaped:
+            if side == "bid":
+                self._invalidate_bids()
+            else:
+                self._invalidate_asks()
+
+    def _invalidate_bids(self) -> None:
+        self._bid_view = None
+        self._view = None
+
+    def _invalidate_asks(self) -> None:
+        self._ask_view = None
+        self._view = None
+
+    # ------------------------------------------------------------------
+    # Views (no level copies)
+    # ------------------------------------------------------------------
+
+    def bid_levels(self) -> List[Dict[str, Any]]:
+        """Bid level dicts, best (highest price) first."""
+        if self._bid_view is None:
+            self._bid_view = [self.bids[p] for p in sorted(self.bids, reverse=True)]
+        return self._bid_view
+
+    def ask_levels(self) -> List[Dict[str, Any]]:
+        """Ask level dicts, best (lowest price) first."""
+        if self._ask_view is None:
+            self._ask_view = [self.asks[p] for p in sorted(self.asks)]
+        return self._ask_view
+
+    def cex_snapshot(self) -> List[Dict[str, Any]]:
+        """Current shape as VirtualOrderBook's `cex_snapshot`: [{side, price, size}, ...]."""
+        if self._view is None:
+            self._view = self.bid_levels() + self.ask_levels()
+        return self._view
+
+    def to_arrays(self) -> Dict[str, np.ndarray]:
+        """Columnar float64 shape {bid_prices, bid_sizes, ask_prices, ask_sizes}, best first."""
+        result = {}
+        for side, levels in (("bid", self.bid_levels()), ("ask", self.ask_levels())):
+            n = len(levels)
+            result[f"{side}_prices"] = np.fromiter((lvl["price"] for lvl in levels), dtype=np.float64, count=n)
+            result[f"{side}_sizes"] = np.fromiter((lvl["size"] for lvl in levels), dtype=np.float64, count=n)
+        return result
+
+    def best_bid(self) -> Optional[float]:
+        bids = self.bid_levels()
+        return bids[0]["price"] if bids else None
+
+    def best_ask(self) -> Optional[float]:
+        asks = self.ask_levels()
+        return asks[0]["price"] if asks else None
+
+    def mid_price(self) -> Optional[float]:
+        bid = self.best_bid()
+        ask = self.best_ask()
+        if bid is None or ask is None:
+            return None
+        return (bid + ask) / 2
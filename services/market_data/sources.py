@@ -0,0 +1,143 @@
+"""
+sources.py - CEX L2 depth message sources: recorded files and a local replay server
+
+Messages are newline-delimited JSON, one per line. Two layouts are accepted
+and normalized by `parse_message`:
+
+    generic:  {"type": "snapshot", "seq": 100, "bids": [[p, q], ...], "asks": [...]}
+              {"type": "diff", "first_seq": 101, "seq": 103, "bids": [...], "asks": [...]}
+    Binance:  REST depth snapshot {"lastUpdateId", "bids", "asks"}
+              depthUpdate event {"U", "u", "b", "a"} (optionally wrapped as {"stream", "data"})
+
+`ReplayServer` streams a recorded file over TCP (stand-in for an exchange
+websocket when backtesting or running locally); `stream_replay` is the client.
+
+Usage:
+    for message in read_recorded("depth_ethusdt.jsonl.gz"):
+        book.apply(message)
+
+    server = ReplayServer("depth_ethusdt.jsonl")
+    host, port = await server.start()
+    async for message in stream_replay(host, port):
+        book.apply(message)
+"""
+
+import asyncio
+import gzip
+import json
+from pathlib import Path
+from typing import Any, AsyncIterator, Dict, Iterator, Mapping, Optional, Tuple, Union
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional speedup
+    orjson = None
+
+# orjson.loads when available; json.loads accepts the same bytes lines
+_loads = orjson.loads if orjson is not None else json.loads
+
+
+def parse_message(raw: Mapping[str, Any]) -> Dict[str, Any]:
+    """Normalize a generic or Binance depth message to {type, first_seq, seq, bids, asks}."""
+    if "data" in raw and "stream" in raw:
+        raw = raw["data"]
+
+    if "type" in raw:
+        if raw["type"] == "snapshot":
+            return {"type": "snapshot", "first_seq": raw["seq"], "seq": raw["seq"],
+                    "bids": raw.get("bids", ()), "asks": raw.get("asks", ())}
+        if raw["type"] == "diff":
+            return {"type": "diff", "first_seq": raw.get("first_seq", raw["seq"]), "seq": raw["seq"],
+                    "bids": raw.get("bids", ()), "asks": raw.get("asks", ())}
+        raise ValueError(f"Unknown depth message type: {raw['type']}")
+
+    if "lastUpdateId" in raw:
+        seq = raw["lastUpdateId"]
+        return {"type": "snapshot", "first_seq": seq, "seq": seq,
+                "bids": raw.get("bids", ()), "asks": raw.get("asks", ())}
+    if "U" in raw and "u" in raw:
+        return {"type": "diff", "first_seq": raw["U"], "seq": raw["u"],
+                "bids": raw.get("b", ()), "asks": raw.get("a", ())}
+
+    raise ValueError(f"Unrecognized depth message: keys {sorted(raw)}")
+
+
+def _open_recording(path: Union[str, Path]):
+    path = Path(path)
+    return gzip.open(path, "rb") if path.suffix == ".gz" else open(path, "rb")
+
+
+def read_recorded(path: Union[str, Path]) -> Iterator[Dict[str, Any]]:
+    """Normalized messages from a recorded JSONL file (.gz supported), in file order."""
+    with _open_recording(path) as f:
+        for line in f:
+            if line.strip():
+                yield parse_message(_loads(line))
+
+
+class ReplayServer:
+    """
+    Serves a recorded file over TCP as newline-delimited JSON.
+
+    Every connection gets the whole file from the start. rate: messages per
+    second per connection (None = as fast as the client reads).
+    """
+
+    def __init__(
+        self,
+        path: Union[str, Path],
+        host: str = "127.0.0.1",
+        port: int = 0,
+        rate: Optional[float] = None
+    ):
+        self.path = Path(path)
+        self.host = host
+        self.port = port
+        self.rate = rate
+        self._server: Optional[asyncio.AbstractServer] = None
+
+    async def start(self) -> Tuple[str, int]:
+        """Start listening; returns the bound (host, port) (port=0 picks a free port)."""
+        self._server = await asyncio.start_server(self._serve, self.host, self.port)
+        self.host, self.port = self._server.sockets[0].getsockname()[:2]
+        return self.host, self.port
+
+    async def close(self) -> None:
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+            self._server = None
+
+    async def _serve(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        interval = 1.0 / self.rate if self.rate else None
+        try:
+            with _open_recording(self.path) as f:
+                for line in f:
+                    if not line.strip():
+                        continue
+                    writer.write(line if line.endswith(b"\n") else line + b"\n")
+                    await writer.drain()
+                    if interval is not None:
+                        await asyncio.sleep(interval)
+        except (ConnectionResetError, BrokenPipeError):
+            return
+        finally:
+            writer.close()
+            try:
+                await writer.wait_closed()
+            except (ConnectionResetError, BrokenPipeError):
+                pass
+
+
+async def stream_replay(host: str, port: int) -> AsyncIterator[Dict[str, Any]]:
+    """Normalized messages from a ReplayServer until it closes the connection."""
+    reader, writer = await asyncio.open_connection(host, port)
+    try:
+        while True:
+            line = await reader.readline()
+            if not line:
+                break
+            if line.strip():
+                yield parse_message(_loads(line))
+    finally:
+        writer.close()
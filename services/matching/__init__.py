@@ -4,8 +4,17 @@ Module 3: Greedy Matcher
 Exports:
 - GreedyMatcher: Main class for splitting swap between Orderbook and AMM
 - LevelUsed: Dataclass for tracking which orderbook levels were used
+- GasCostModel: Gas cost of AMM / orderbook legs, priced in token_out
+- PlannerSession: Re-plan one book at many swap amounts (prefix sums + binary search)
+- BatchMatcher: Greedy split for many padded books / swap sizes at once (NumPy)
+- MatchingEngine: Two-sided price-time priority book (Order, Trade) with hook-style swaps
 """
 
+from .gas_model import GasCostModel
 from .greedy_matcher import GreedyMatcher, LevelUsed
+from .planner_session import PlannerSession
+from .batch_matcher import BatchMatcher
+from .matching_engine import MatchingEngine, Order, Trade
 
-__all__ = ['GreedyMatcher', 'LevelUsed']
+__all__ = ['GreedyMatcher', 'LevelUsed', 'GasCostModel', 'PlannerSession', 'BatchMatcher',
+           'MatchingEngine', 'Order', 'Trade']
@@ -0,0 +1,140 @@
+"""
+batch_matcher.py - GreedyMatcher over many books / swap sizes at once
+
+Books are padded arrays, one row per book (the MonteCarloOrderbookGenerator
+batch layout):
+
+    prices        (B, L)  token_out per token_in (human units)
+    amounts_in    (B, L)  raw
+    amounts_out   (B, L)  raw
+    mask          (B, L)  optional, False for padding (default amounts_in > 0)
+
+For each book / size pair the split is the one GreedyMatcher.match computes:
+levels best first, only levels better than the AMM threshold
+(ob_min_improve_bps), filled in order until the swap is covered, at most
+`max_matches` fills (the hook's maxMatches). Every step is an array op over
+the level axis - cumulative sums of level amounts and clipping against the
+swap size - so there is no per-book Python.
+
+swap_amounts broadcasts against the book axis:
+    scalar or (B,)   one size per book          -> results (B,)
+    (B, S) / (1, S)  a grid of sizes per book   -> results (B, S)
+
+Values are float64 in raw token units (integer-floored where GreedyMatcher
+floors), so raw amounts above 2**53 are approximate - for distributions, not
+calldata. AMM output uses the spot price; gas-aware selection and
+tick-aligned matching are not modeled.
+
+Usage:
+    batch = MonteCarloOrderbookGenerator(price, 18, 6, seed=1).generate_batch(100_000, size, is_bid=True)
+    result = BatchMatcher(price, 18, 6).match(batch, size, is_bid=True)
+    result['savings_before_fee']   # (100000,)
+"""
+
+from decimal import Decimal
+from typing import Dict, Mapping, Optional, Union
+
+import numpy as np
+
+
+class BatchMatcher:
+
+    def __init__(
+        self,
+        price_amm: Decimal,
+        decimals_in: int,
+        decimals_out: int,
+        ob_min_improve_bps: int = 5,
+        max_matches: Optional[int] = None
+    ):
+        self.price_amm = price_amm
+        self.decimals_in = decimals_in
+        self.decimals_out = decimals_out
+        self.ob_min_improve_bps = ob_min_improve_bps
+        self.max_matches = max_matches
+        # Raw out per raw in = price × 10^(decimals_out - decimals_in)
+        self._rate_scale = 10.0 ** (decimals_out - decimals_in)
+
+    def min_better_price(self, is_bid: bool) -> float:
+        """Same threshold as GreedyMatcher._prepare, as a float."""
+        margin = self.ob_min_improve_bps / 10000
+        return float(self.price_amm) * (1 - margin if is_bid else 1 + margin)
+
+    def match(
+        self,
+        book: Mapping[str, np.ndarray],
+        swap_amounts: Union[int, np.ndarray],
+        is_bid: bool = False
+    ) -> Dict[str, np.ndarray]:
+        """
+        Match every book against its swap size(s).
+
+        Returns arrays shaped like the broadcast swap_amounts:
+            swap_amounts, amount_in_on_orderbook, amount_out_from_orderbook,
+            amount_in_on_amm, amount_out_from_amm, expected_total_out,
+            amm_reference_out, savings_before_fee, levels_used,
+            levels_better_than_amm (every better level in the book; GreedyMatcher
+            stops counting once the swap is covered)
+        """
+        prices = np.asarray(book['prices'], dtype=np.float64)
+        amounts_in = np.asarray(book['amounts_in'], dtype=np.float64)
+        amounts_out = np.asarray(book['amounts_out'], dtype=np.float64)
+        mask = book.get('mask')
+        mask = amounts_in > 0 if mask is None else np.asarray(mask, dtype=bool) & (amounts_in > 0)
+        n_books = prices.shape[0]
+
+        # Best first per book: BID high -> low, ASK low -> high; padding last
+        key = np.where(mask, -prices if is_bid else prices, np.inf)
+        if not np.all(key[:, 1:] >= key[:, :-1]):
+            order = np.argsort(key, axis=1, kind='stable')
+            prices = np.take_along_axis(prices, order, axis=1)
+            amounts_in = np.take_along_axis(amounts_in, order, axis=1)
+            amounts_out = np.take_along_axis(amounts_out, order, axis=1)
+            mask = np.take_along_axis(mask, order, axis=1)
+
+        threshold = self.min_better_price(is_bid)
+        better = mask & ((prices >= threshold) if is_bid else (prices <= threshold))
+        levels_better_than_amm = better.sum(axis=1)
+        if self.max_matches is not None:
+            better &= np.cumsum(better, axis=1) <= self.max_matches
+        level_in = np.where(better, amounts_in, 0.0)
+        level_out = np.where(better, amounts_out, 0.0)
+        rates = prices * self._rate_scale
+        before_in = np.cumsum(level_in, axis=1) - level_in  # book filled before each level
+
+        # Broadcast books against sizes: (B, 1.., L) vs (B|1, S.., 1)
+        sizes = np.asarray(swap_amounts, dtype=np.float64)
+        if sizes.ndim == 0:
+            sizes = np.broadcast_to(sizes, (n_books,))
+        expand = (slice(None),) + (None,) * (sizes.ndim - 1)
+        level_in = level_in[expand]
+        level_out = level_out[expand]
+        rates = rates[expand]
+        before_in = before_in[expand]
+
+        fill_in = np.clip(sizes[..., None] - before_in, 0.0, level_in)
+        fill_out = np.where(fill_in == level_in, level_out, np.floor(fill_in * rates))
+
+        amount_in_on_orderbook = fill_in.sum(axis=-1)
+        amount_out_from_orderbook = fill_out.sum(axis=-1)
+        amount_in_on_amm = sizes - amount_in_on_orderbook
+        spot_rate = float(self.price_amm) * self._rate_scale
+        amount_out_from_amm = np.floor(amount_in_on_amm * spot_rate)
+        amm_reference_out = np.floor(sizes * spot_rate)
+        expected_total_out = amount_out_from_orderbook + amount_out_from_amm
+
+        return {
+            'swap_amounts': np.broadcast_to(sizes, amount_in_on_orderbook.shape),
+            'amount_in_on_orderbook': amount_in_on_orderbook,
+            'amount_out_from_orderbook': amount_out_from_orderbook,
+            'amount_in_on_amm': amount_in_on_amm,
+            'amount_out_from_amm': amount_out_from_amm,
+            'expected_total_out': expected_total_out,
+            'amm_reference_out': np.broadcast_to(amm_reference_out, amount_in_on_orderbook.shape),
+            # Clamped at 0, as ExecutionPlanBuilder and savings_surface report it
+            'savings_before_fee': np.maximum(expected_total_out - amm_reference_out, 0.0),
+            'levels_used': (fill_in > 0).sum(axis=-1),
+            'levels_better_than_amm': np.broadcast_to(
+                levels_better_than_amm[expand], amount_in_on_orderbook.shape
+            ),
+        }
@@ -0,0 +1,57 @@
+"""
+gas_model.py - Execution gas cost, priced in the output token
+
+Gas of a hybrid swap:
+- AMM: a base swap cost plus a cost per initialized tick crossed (the
+  pool's tick loop; ticks crossed come from the swap simulation). The pool
+  swap carries the hook, so the base cost applies to every route, even when
+  the orderbook fills everything.
+- orderbook: hook overhead once, plus a cost per matched level (bounded
+  on-chain by maxMatches)
+
+Costs are converted to raw token_out at the current gas price using the
+native token price in token_out (1 when token_out is WETH, the pool price
+when token_in is WETH). Default gas figures are estimates for Base; override
+them per deployment.
+
+Usage:
+    model = GasCostModel(gas_price_wei=base_fee, out_per_native=Decimal('2700'), decimals_out=6)
+    cost = model.cost_out(model.amm_gas(ticks_crossed=2) + model.orderbook_gas(matches=3))
+"""
+
+from dataclasses import dataclass
+from decimal import Decimal, ROUND_CEILING
+
+
+# Estimates (gas units) - SwapRouter02 exactInputSingle / UniHybrid hook
+AMM_BASE_GAS = 110_000
+AMM_GAS_PER_TICK = 25_000
+ORDERBOOK_BASE_GAS = 60_000
+ORDERBOOK_GAS_PER_MATCH = 45_000
+
+NATIVE_DECIMALS = 18
+
+
+@dataclass(frozen=True, slots=True)
+class GasCostModel:
+    gas_price_wei: int  # base fee + priority fee
+    out_per_native: Decimal  # token_out per native token (ETH), human units
+    decimals_out: int
+    amm_base_gas: int = AMM_BASE_GAS
+    amm_gas_per_tick: int = AMM_GAS_PER_TICK
+    orderbook_base_gas: int = ORDERBOOK_BASE_GAS
+    orderbook_gas_per_match: int = ORDERBOOK_GAS_PER_MATCH
+
+    def amm_gas(self, ticks_crossed: int) -> int:
+        return self.amm_base_gas + self.amm_gas_per_tick * ticks_crossed
+
+    def orderbook_gas(self, matches: int) -> int:
+        if matches == 0:
+            return 0
+        return self.orderbook_base_gas + self.orderbook_gas_per_match * matches
+
+    def cost_out(self, gas_units: int) -> int:
+        """Raw token_out worth gas_units at gas_price_wei (rounded up)."""
+        cost_wei = gas_units * self.gas_price_wei
+        scaled = Decimal(cost_wei) * self.out_per_native * Decimal(10 ** self.decimals_out)
+        return int((scaled / Decimal(10 ** NATIVE_DECIMALS)).to_integral_value(rounding=ROUND_CEILING))
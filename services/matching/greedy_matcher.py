@@ -1,5 +1,5 @@
 from decimal import Decimal
-from typing import List, Dict, Literal
+from typing import Callable, List, Dict, Literal, Optional, Tuple
 from dataclasses import dataclass
 import sys
 import os
@@ -7,6 +7,9 @@ import os
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
 
 from services.orderbook import OrderbookLevel
+from services.orderbook.tick_grid import swap_tick_amount_out, ticks_within_bps
+from services.matching.gas_model import GasCostModel
+from services.amm_uniswap_v3.swap_simulator import InsufficientLiquidityError
 
 
 @dataclass
@@ -23,12 +26,25 @@ class GreedyMatcher:
         price_amm: Decimal,
         decimals_in: int,
         decimals_out: int,
-        ob_min_improve_bps: int = 5
+        ob_min_improve_bps: int = 5,
+        amm_tick: Optional[int] = None,
+        gas_model: Optional[GasCostModel] = None,
+        amm_swap: Optional[Callable[[int], Tuple[int, int]]] = None,
+        max_matches: Optional[int] = None
     ):
         self.price_amm = price_amm
         self.decimals_in = decimals_in
         self.decimals_out = decimals_out
         self.ob_min_improve_bps = ob_min_improve_bps
+        # AMM price as a swap-direction tick (see services/orderbook/tick_grid).
+        # With tick-aligned levels, matching compares ticks instead of Decimals.
+        self.amm_tick = amm_tick
+        # Gas-aware split: keep only the prefix of fills (at most max_matches)
+        # that maximizes output net of gas, possibly none (AMM only).
+        # amm_swap: amount_in (raw) -> (amount_out, ticks_crossed); spot price if None.
+        self.gas_model = gas_model
+        self.amm_swap = amm_swap
+        self.max_matches = max_matches
     
     def match(
         self,
@@ -49,29 +65,7 @@ class GreedyMatcher:
           → Sort levels từ CAO → THẤP
           → Dùng levels có price > AMM * (1 - margin)
         """
-        
-        # Calculate price threshold based on direction
-        if is_bid:
-            # BID: User bán tokenIn → muốn giá CAO hơn AMM
-            # Chỉ dùng levels có price >= AMM * (1 - margin)
-            min_better_price = self.price_amm * (
-                Decimal('1') - Decimal(self.ob_min_improve_bps) / Decimal('10000')
-            )
-        else:
-            # ASK: User mua tokenOut → muốn giá THẤP hơn AMM
-            # Chỉ dùng levels có price <= AMM * (1 + margin)
-            min_better_price = self.price_amm * (
-                Decimal('1') + Decimal(self.ob_min_improve_bps) / Decimal('10000')
-            )
-        
-        # Sort levels based on direction
-        # BID: cao → thấp (reverse=True) - bán với giá cao nhất trước
-        # ASK: thấp → cao (reverse=False) - mua với giá thấp nhất trước
-        sorted_levels = sorted(
-            levels,
-            key=lambda lvl: lvl.price,
-            reverse=is_bid
-        )
+        sorted_levels, min_better_price, min_better_tick, use_ticks = self._prepare(levels, is_bid)
         
         remaining_in = swap_amount
         amount_in_on_orderbook = 0
@@ -80,17 +74,8 @@ class GreedyMatcher:
         levels_better_than_amm = 0
         
         for level in sorted_levels:
-            # Check if level price is better than AMM threshold
-            is_level_better = False
-            if is_bid:
-                # BID: Level tốt nếu giá >= threshold (bán đắt)
-                is_level_better = level.price >= min_better_price
-            else:
-                # ASK: Level tốt nếu giá <= threshold (mua rẻ)
-                is_level_better = level.price <= min_better_price
-            
             # Skip level if not better than AMM
-            if not is_level_better:
+            if not self._is_better(level, is_bid, use_ticks, min_better_price, min_better_tick):
                 continue
             
             levels_better_than_amm += 1
@@ -103,9 +88,7 @@ class GreedyMatcher:
             if fill_in == 0:
                 continue
             
-            fill_out = level.amount_out_available if fill_in == level.amount_in_available else int(
-                Decimal(fill_in) * level.price * Decimal(10 ** self.decimals_out) / Decimal(10 ** self.decimals_in)
-            )
+            fill_out = self._fill_out(level, fill_in, use_ticks)
             
             amount_in_on_orderbook += fill_in
             amount_out_from_orderbook += fill_out
@@ -119,7 +102,13 @@ class GreedyMatcher:
                 )
             )
         
-        amount_in_on_amm = remaining_in
+        gas = None
+        if self.gas_model is not None:
+            levels_used, gas = self._select_fills_for_gas(levels_used, swap_amount)
+            amount_in_on_orderbook = sum(fill.amount_in_from_level for fill in levels_used)
+            amount_out_from_orderbook = sum(fill.amount_out_from_level for fill in levels_used)
+        
+        amount_in_on_amm = swap_amount - amount_in_on_orderbook
         
         return {
             'amount_in_on_orderbook': amount_in_on_orderbook,
@@ -129,7 +118,134 @@ class GreedyMatcher:
             'total_levels_available': len(sorted_levels),
             'levels_better_than_amm': levels_better_than_amm,
             'min_better_price': min_better_price,
-            'price_amm': self.price_amm
+            'min_better_tick': min_better_tick,
+            'price_amm': self.price_amm,
+            'gas': gas
+        }
+    
+    def _prepare(
+        self,
+        levels: List[OrderbookLevel],
+        is_bid: bool
+    ) -> Tuple[List[OrderbookLevel], Decimal, Optional[int], bool]:
+        """Levels sorted best-first and the AMM thresholds they are compared against."""
+        # Calculate price threshold based on direction
+        if is_bid:
+            # BID: User bán tokenIn → muốn giá CAO hơn AMM
+            # Chỉ dùng levels có price >= AMM * (1 - margin)
+            min_better_price = self.price_amm * (
+                Decimal('1') - Decimal(self.ob_min_improve_bps) / Decimal('10000')
+            )
+        else:
+            # ASK: User mua tokenOut → muốn giá THẤP hơn AMM
+            # Chỉ dùng levels có price <= AMM * (1 + margin)
+            min_better_price = self.price_amm * (
+                Decimal('1') + Decimal(self.ob_min_improve_bps) / Decimal('10000')
+            )
+        
+        # Tick domain: same thresholds as integer tick bounds (1 tick ~ 1 bps)
+        use_ticks = (
+            self.amm_tick is not None
+            and len(levels) > 0
+            and all(level.tick is not None for level in levels)
+        )
+        min_better_tick = None
+        if use_ticks:
+            min_better_tick = self.amm_tick + ticks_within_bps(self.ob_min_improve_bps, above=not is_bid)
+        
+        # Sort levels based on direction
+        # BID: cao → thấp (reverse=True) - bán với giá cao nhất trước
+        # ASK: thấp → cao (reverse=False) - mua với giá thấp nhất trước
+        sorted_levels = sorted(
+            levels,
+            key=(lambda lvl: lvl.tick) if use_ticks else (lambda lvl: lvl.price),
+            reverse=is_bid
+        )
+        return sorted_levels, min_better_price, min_better_tick, use_ticks
+    
+    @staticmethod
+    def _is_better(
+        level: OrderbookLevel,
+        is_bid: bool,
+        use_ticks: bool,
+        min_better_price: Decimal,
+        min_better_tick: Optional[int]
+    ) -> bool:
+        """Level price is better than the AMM threshold."""
+        if use_ticks:
+            return level.tick >= min_better_tick if is_bid else level.tick <= min_better_tick
+        if is_bid:
+            # BID: Level tốt nếu giá >= threshold (bán đắt)
+            return level.price >= min_better_price
+        # ASK: Level tốt nếu giá <= threshold (mua rẻ)
+        return level.price <= min_better_price
+    
+    def _fill_out(self, level: OrderbookLevel, fill_in: int, use_ticks: bool) -> int:
+        if fill_in == level.amount_in_available:
+            return level.amount_out_available
+        if use_ticks:
+            return swap_tick_amount_out(fill_in, level.tick)
+        return int(
+            Decimal(fill_in) * level.price * Decimal(10 ** self.decimals_out) / Decimal(10 ** self.decimals_in)
+        )
+    
+    def _amm_output(self, amount_in: int) -> Tuple[int, int]:
+        if self.amm_swap is not None:
+            return self.amm_swap(amount_in)
+        amount_out = int(
+            Decimal(amount_in) * self.price_amm * Decimal(10 ** self.decimals_out) / Decimal(10 ** self.decimals_in)
+        )
+        return amount_out, 0
+    
+    def _select_fills_for_gas(
+        self,
+        fills: List[LevelUsed],
+        swap_amount: int
+    ) -> Tuple[List[LevelUsed], Dict]:
+        """
+        Number of fills k (0..max_matches) maximizing
+            orderbook_out(k) + amm_out(rest) - gas_cost_out(k fills, AMM ticks crossed).
+        Fills are best-first, so only prefixes are considered; ties keep fewer fills.
+        Prefixes whose rest the AMM cannot absorb (InsufficientLiquidityError)
+        are skipped; if none is feasible, the error of the longest one is raised.
+        """
+        model = self.gas_model
+        limit = len(fills) if self.max_matches is None else min(len(fills), self.max_matches)
+        
+        best = None
+        amm_only_gas_cost_out = 0
+        ob_in = 0
+        ob_out = 0
+        for k in range(limit + 1):
+            if k > 0:
+                ob_in += fills[k - 1].amount_in_from_level
+                ob_out += fills[k - 1].amount_out_from_level
+            remaining = swap_amount - ob_in
+            try:
+                amm_out, ticks_crossed = self._amm_output(remaining) if remaining > 0 else (0, 0)
+            except InsufficientLiquidityError as e:
+                if k == 0:
+                    amm_only_gas_cost_out = model.cost_out(model.amm_gas(e.result.ticks_crossed))
+                if k == limit and best is None:
+                    raise
+                continue
+            gas_units = model.amm_gas(ticks_crossed) + model.orderbook_gas(k)
+            gas_cost_out = model.cost_out(gas_units)
+            if k == 0:
+                amm_only_gas_cost_out = gas_cost_out
+            net_out = ob_out + amm_out - gas_cost_out
+            if best is None or net_out > best[0]:
+                best = (net_out, k, gas_units, gas_cost_out, ticks_crossed)
+        
+        net_out, k, gas_units, gas_cost_out, ticks_crossed = best
+        return fills[:k], {
+            'gas_price_wei': model.gas_price_wei,
+            'gas_units': gas_units,
+            'gas_cost_out': gas_cost_out,
+            'amm_only_gas_cost_out': amm_only_gas_cost_out,
+            'amm_ticks_crossed': ticks_crossed,
+            'orderbook_matches': k,
+            'net_out': net_out
         }
     
     def calculate_savings(
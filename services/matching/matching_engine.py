@@ -0,0 +1,289 @@
+"""
+matching_engine.py - Two-sided limit order book with price-time priority
+
+Resting maker orders sit in one FIFO queue per price level; each side keeps
+its price levels in a heap (best bid = highest price, best ask = lowest), so
+
+    submit_limit   O(log levels) for a new level, O(1) to join a queue
+    cancel         O(1) amortized
+    matching       O(1) per fill
+
+Memory stays proportional to resting interest: a price is on the heap at
+most once, the heap is rebuilt when stale prices outnumber live levels, and
+a level's queue is compacted when cancelled entries outnumber live orders.
+
+Orders are in raw base units; prices are quote per base (human units, int or
+Decimal) and quote amounts are raw: a fill of `amount` base at `price` is
+worth amount × price × 10^(decimals_quote - decimals_base) quote, rounded in
+the maker's favor. Incoming orders match against the opposite side while
+they cross, best price first, oldest order first within a price, with
+partial fills; every fill is appended to `trades`.
+
+`swap()` is the hook's taker leg against actual resting interest, with the
+GreedyMatcher convention for is_bid (the book side the user trades into) and
+an exact tokenIn amount (amountInOnOrderbook):
+
+    is_bid=True   tokenIn = base:  sell amount_in base into the bids
+    is_bid=False  tokenIn = quote: spend amount_in quote on the asks
+
+It is immediate-or-cancel and stops after `max_matches` maker fills
+(maxMatches) or at the first level more than `slippage_limit_bps` worse than
+the best price at entry (slippageLimit). What is left goes to the AMM.
+
+Usage:
+    engine = MatchingEngine(decimals_base=18, decimals_quote=6)
+    engine.submit_limit(is_bid=True, price=Decimal('2701'), amount=5 * 10**17)
+    engine.submit_limit(is_bid=True, price=Decimal('2700'), amount=10**18)
+    fills = engine.swap(is_bid=True, amount_in=10**18, max_matches=8, slippage_limit_bps=200)
+    amount_in_filled = sum(trade.amount for trade in fills)   # rest of 10**18 -> AMM
+    amount_out = sum(trade.quote_amount for trade in fills)
+"""
+
+from collections import deque
+from dataclasses import dataclass
+from fractions import Fraction
+from heapq import heapify, heappop, heappush
+from typing import Any, Deque, Dict, List, Optional, Set, Tuple
+
+
+@dataclass(slots=True)
+class Order:
+    order_id: int
+    is_bid: bool
+    price: Any
+    amount: int
+    remaining: int  # base units (quote units for a quote-in swap)
+    owner: Optional[str] = None
+
+
+@dataclass(slots=True)
+class Trade:
+    seq: int
+    price: Any  # maker price
+    amount: int  # base units
+    quote_amount: int  # quote units
+    taker_order_id: int
+    maker_order_id: int
+    taker_buys_base: bool
+    taker_owner: Optional[str] = None
+    maker_owner: Optional[str] = None
+
+
+class _Level:
+    """FIFO queue of one price; `live` orders with `volume` base still resting."""
+
+    __slots__ = ("queue", "volume", "live", "rate")
+
+    def __init__(self, rate: Fraction):
+        self.queue: Deque[Order] = deque()
+        self.volume = 0
+        self.live = 0
+        self.rate = rate  # raw quote per raw base, exact
+
+    def compact(self) -> None:
+        self.queue = deque(order for order in self.queue if order.remaining > 0)
+
+
+class _BookSide:
+    """Price levels of one side, best price on a heap (each price pushed at most once)."""
+
+    __slots__ = ("is_bid", "levels", "_heap", "_in_heap")
+
+    def __init__(self, is_bid: bool):
+        self.is_bid = is_bid
+        self.levels: Dict[Any, _Level] = {}
+        self._heap: List[Any] = []  # -price for bids, price for asks
+        self._in_heap: Set[Any] = set()
+
+    def level_for(self, price: Any, rate_scale: Fraction) -> _Level:
+        level = self.levels.get(price)
+        if level is None:
+            level = self.levels[price] = _Level(Fraction(price) * rate_scale)
+            if price not in self._in_heap:
+                self._in_heap.add(price)
+                heappush(self._heap, -price if self.is_bid else price)
+        return level
+
+    def best_price(self) -> Optional[Any]:
+        heap = self._heap
+        while heap:
+            price = -heap[0] if self.is_bid else heap[0]
+            if price in self.levels:
+                return price
+            heappop(heap)
+            self._in_heap.discard(price)
+        return None
+
+    def remove_level(self, price: Any) -> None:
+        del self.levels[price]
+        # Stale prices below the top are only popped when reached; rebuild
+        # the heap once they outnumber the live levels
+        if len(self._heap) > 2 * len(self.levels) + 16:
+            self._in_heap = set(self.levels)
+            self._heap = [-price if self.is_bid else price for price in self.levels]
+            heapify(self._heap)
+
+    def depth(self) -> List[Tuple[Any, int]]:
+        """(price, resting amount) best first."""
+        return sorted(
+            ((price, level.volume) for price, level in self.levels.items()),
+            key=lambda item: item[0],
+            reverse=self.is_bid
+        )
+
+
+class MatchingEngine:
+
+    def __init__(self, decimals_base: int = 0, decimals_quote: int = 0):
+        self.bids = _BookSide(is_bid=True)
+        self.asks = _BookSide(is_bid=False)
+        self.orders: Dict[int, Order] = {}  # resting orders by id
+        self.trades: List[Trade] = []
+        self._next_order_id = 1
+        self._rate_scale = Fraction(10) ** (decimals_quote - decimals_base)
+
+    def submit_limit(self, is_bid: bool, price: Any, amount: int, owner: Optional[str] = None) -> Order:
+        """Buy (is_bid) or sell `amount` base; matches while prices cross, the rest rests at `price`."""
+        if amount <= 0:
+            raise ValueError(f"Order amount must be positive, got {amount}")
+        order = self._new_order(is_bid, price, amount, owner)
+        self._match(order, buys_base=is_bid, limit_price=price)
+        if order.remaining > 0:
+            book = self.bids if is_bid else self.asks
+            level = book.level_for(price, self._rate_scale)
+            level.queue.append(order)
+            level.volume += order.remaining
+            level.live += 1
+            self.orders[order.order_id] = order
+        return order
+
+    def swap(
+        self,
+        is_bid: bool,
+        amount_in: int,
+        max_matches: Optional[int] = None,
+        slippage_limit_bps: Optional[int] = None,
+        owner: Optional[str] = None
+    ) -> List[Trade]:
+        """
+        Exact-input, immediate-or-cancel taker order, as the hook matches it.
+        is_bid=True sells amount_in base into the bids; is_bid=False spends
+        amount_in quote on the asks. At most max_matches maker fills, no level
+        worse than the entry best price by more than slippage_limit_bps.
+        Unfilled input is not rested.
+        """
+        if amount_in <= 0:
+            raise ValueError(f"Swap amount must be positive, got {amount_in}")
+        buys_base = not is_bid
+        book = self.bids if is_bid else self.asks
+        best = book.best_price()
+        if best is None:
+            return []
+        limit_price = None
+        if slippage_limit_bps is not None:
+            # price * 10000 vs best * (10000 ± bps): no division, exact for int prices
+            limit_price = best * (10000 + slippage_limit_bps if buys_base else 10000 - slippage_limit_bps)
+        order = self._new_order(buys_base, None, amount_in, owner)
+        first_trade = len(self.trades)
+        self._match(
+            order,
+            buys_base=buys_base,
+            limit_price=limit_price,
+            max_matches=max_matches,
+            limit_scale=10000,
+            quote_in=buys_base
+        )
+        return self.trades[first_trade:]
+
+    def cancel(self, order_id: int) -> bool:
+        """Cancel a resting order; False if it is not resting (filled, cancelled, unknown)."""
+        order = self.orders.pop(order_id, None)
+        if order is None:
+            return False
+        book = self.bids if order.is_bid else self.asks
+        level = book.levels[order.price]
+        level.volume -= order.remaining
+        level.live -= 1
+        order.remaining = 0
+        if level.live == 0:
+            book.remove_level(order.price)
+        elif len(level.queue) > 2 * level.live + 8:
+            level.compact()
+        return True
+
+    def best_bid(self) -> Optional[Any]:
+        return self.bids.best_price()
+
+    def best_ask(self) -> Optional[Any]:
+        return self.asks.best_price()
+
+    def depth(self, is_bid: bool) -> List[Tuple[Any, int]]:
+        """Aggregated (price, resting amount) of one side, best first."""
+        return (self.bids if is_bid else self.asks).depth()
+
+    def _new_order(self, is_bid: bool, price: Any, amount: int, owner: Optional[str]) -> Order:
+        order = Order(self._next_order_id, is_bid, price, amount, amount, owner)
+        self._next_order_id += 1
+        return order
+
+    def _match(
+        self,
+        taker: Order,
+        buys_base: bool,
+        limit_price: Optional[Any],
+        max_matches: Optional[int] = None,
+        limit_scale: int = 1,
+        quote_in: bool = False
+    ) -> None:
+        """
+        Fill `taker` against the opposite side; maker prices are compared as
+        price * limit_scale. With quote_in, taker.remaining is quote units.
+        """
+        book = self.asks if buys_base else self.bids
+        trades = self.trades
+        orders = self.orders
+        matches = 0
+        while taker.remaining > 0:
+            price = book.best_price()
+            if price is None:
+                break
+            if limit_price is not None and (
+                price * limit_scale > limit_price if buys_base else price * limit_scale < limit_price
+            ):
+                break
+            level = book.levels[price]
+            rate = level.rate
+            queue = level.queue
+            while queue and taker.remaining > 0:
+                maker = queue[0]
+                if maker.remaining == 0:  # cancelled
+                    queue.popleft()
+                    continue
+                if max_matches is not None and matches >= max_matches:
+                    return
+                if quote_in:
+                    # Base the remaining quote buys at this price (maker gets the rounding)
+                    fill = min(maker.remaining, taker.remaining * rate.denominator // rate.numerator)
+                    if fill == 0:
+                        return
+                else:
+                    fill = min(taker.remaining, maker.remaining)
+                # Makers are paid rounded up (asks) / pay rounded down (bids)
+                if buys_base:
+                    quote_amount = -(-fill * rate.numerator // rate.denominator)
+                else:
+                    quote_amount = fill * rate.numerator // rate.denominator
+                taker.remaining -= quote_amount if quote_in else fill
+                maker.remaining -= fill
+                level.volume -= fill
+                matches += 1
+                trades.append(Trade(
+                    len(trades), price, fill, quote_amount, taker.order_id, maker.order_id,
+                    buys_base, taker.owner, maker.owner
+                ))
+                if maker.remaining == 0:
+                    queue.popleft()
+                    level.live -= 1
+                    del orders[maker.order_id]
+            if level.live == 0:
+                book.remove_level(price)
@@ -0,0 +1,184 @@
+"""
+planner_session.py - Incremental re-planning when only the swap amount changes
+
+A PlannerSession fixes everything that does not depend on amount_in for one
+pair / block: the book (levels better than the AMM threshold, best first),
+prefix sums of their input and output, the matcher (AMM price, gas model,
+AMM swap simulator) and optionally the plan builder (AMM curve, fees).
+
+A new amount finds its split point by binary search on the prefix sums:
+
+    cum_in[j] <= amount_in < cum_in[j + 1]
+    -> levels 0..j-1 filled completely, level j partially (amount_in - cum_in[j])
+
+so the split costs O(log levels) instead of a walk over the book. Fills of
+whole levels are built once and shared by every amount, both as matcher
+LevelUsed (match()) and as plan LevelUsed (plan(), built with the builder's
+to_plan_levels); amount totals come from the prefix sums, and only the
+partial fill at the split point is computed per call. match() / plan()
+return the same result as GreedyMatcher.match / ExecutionPlanBuilder.build_plan
+on the same book.
+
+Bound per call, for k levels used: O(log levels) Python work plus two
+O(k) list slices (a pointer copy, no per-level Python), plus the builder's
+AMM quote. With a gas model, the prefix selection still evaluates each of
+the k candidate prefixes in Python.
+
+Usage:
+    session = PlannerSession(matcher, levels, is_bid, builder=builder,
+                             token_in_address=token_in, token_out_address=token_out)
+    for amount_in in amounts:
+        plan = session.plan(amount_in)
+"""
+
+from bisect import bisect_right
+from typing import Any, Dict, List, Optional, Tuple
+
+from services.orderbook import OrderbookLevel
+from services.matching.greedy_matcher import GreedyMatcher, LevelUsed
+
+
+class PlannerSession:
+
+    def __init__(
+        self,
+        matcher: GreedyMatcher,
+        levels: List[OrderbookLevel],
+        is_bid: bool,
+        builder: Optional[Any] = None,
+        token_in_address: Optional[str] = None,
+        token_out_address: Optional[str] = None,
+        max_matches: int = 8,
+        me_slippage_limit: int = 200
+    ):
+        self.matcher = matcher
+        self.is_bid = is_bid
+        # ExecutionPlanBuilder for plan(); match()/quote() work without it
+        self.builder = builder
+        self.token_in_address = token_in_address
+        self.token_out_address = token_out_address
+        self.max_matches = max_matches
+        self.me_slippage_limit = me_slippage_limit
+
+        sorted_levels, min_better_price, min_better_tick, use_ticks = matcher._prepare(levels, is_bid)
+        self.min_better_price = min_better_price
+        self.min_better_tick = min_better_tick
+        self.total_levels_available = len(sorted_levels)
+        self._use_ticks = use_ticks
+
+        better = [
+            level for level in sorted_levels
+            if matcher._is_better(level, is_bid, use_ticks, min_better_price, min_better_tick)
+        ]
+        self._better_count = len(better)
+
+        # Fillable levels (amount_in_available > 0), their position among the
+        # better levels (for levels_better_than_amm) and prefix sums
+        self._levels: List[OrderbookLevel] = []
+        self._positions: List[int] = []
+        self._full_fills: List[LevelUsed] = []
+        self._plan_full_fills: List[Any] = []  # builder.to_plan_levels(self._full_fills)
+        self.cum_in: List[int] = [0]
+        self.cum_out: List[int] = [0]
+        for position, level in enumerate(better):
+            if level.amount_in_available == 0:
+                continue
+            self._levels.append(level)
+            self._positions.append(position)
+            self._full_fills.append(
+                LevelUsed(level.price, level.amount_in_available, level.amount_out_available)
+            )
+            self.cum_in.append(self.cum_in[-1] + level.amount_in_available)
+            self.cum_out.append(self.cum_out[-1] + level.amount_out_available)
+        if builder is not None:
+            self._plan_full_fills = builder.to_plan_levels(self._full_fills)
+
+    @property
+    def orderbook_depth(self) -> int:
+        """Total amount_in the book can absorb at better-than-AMM prices."""
+        return self.cum_in[-1]
+
+    def _split(self, amount_in: int) -> Tuple[int, int]:
+        """(levels filled completely, amount_in on the partially filled level)."""
+        full = bisect_right(self.cum_in, amount_in) - 1
+        if full >= len(self._levels):
+            return len(self._levels), 0
+        return full, amount_in - self.cum_in[full]
+
+    def _partial_fill(self, full: int, partial_in: int) -> LevelUsed:
+        level = self._levels[full]
+        return LevelUsed(level.price, partial_in, self.matcher._fill_out(level, partial_in, self._use_ticks))
+
+    def quote(self, amount_in: int) -> Tuple[int, int]:
+        """
+        (amount_in_on_orderbook, amount_out_from_orderbook) of the greedy split,
+        before gas-aware selection. O(log levels).
+        """
+        full, partial_in = self._split(amount_in)
+        amount_in_on_orderbook = self.cum_in[full]
+        amount_out_from_orderbook = self.cum_out[full]
+        if partial_in:
+            amount_in_on_orderbook += partial_in
+            amount_out_from_orderbook += self._partial_fill(full, partial_in).amount_out_from_level
+        return amount_in_on_orderbook, amount_out_from_orderbook
+
+    def match(self, amount_in: int) -> Dict:
+        """Same result as GreedyMatcher.match(levels, amount_in, is_bid)."""
+        full, partial_in = self._split(amount_in)
+        levels_used = self._full_fills[:full]
+        amount_in_on_orderbook = self.cum_in[full]
+        amount_out_from_orderbook = self.cum_out[full]
+        if partial_in:
+            fill = self._partial_fill(full, partial_in)
+            levels_used.append(fill)
+            amount_in_on_orderbook += partial_in
+            amount_out_from_orderbook += fill.amount_out_from_level
+
+        # GreedyMatcher counts better levels until the one after the last fill
+        if len(levels_used) == len(self._levels) and amount_in > amount_in_on_orderbook:
+            levels_better_than_amm = self._better_count
+        else:
+            last_position = self._positions[len(levels_used) - 1] if levels_used else -1
+            levels_better_than_amm = min(last_position + 2, self._better_count)
+
+        gas = None
+        if self.matcher.gas_model is not None:
+            selected, gas = self.matcher._select_fills_for_gas(levels_used, amount_in)
+            # A prefix of the fills: totals of whole levels come from the prefix sums
+            if len(selected) <= full:
+                amount_in_on_orderbook = self.cum_in[len(selected)]
+                amount_out_from_orderbook = self.cum_out[len(selected)]
+            levels_used = selected
+
+        return {
+            'amount_in_on_orderbook': amount_in_on_orderbook,
+            'amount_out_from_orderbook': amount_out_from_orderbook,
+            'amount_in_on_amm': amount_in - amount_in_on_orderbook,
+            'levels_used': levels_used,
+            'total_levels_available': self.total_levels_available,
+            'levels_better_than_amm': levels_better_than_amm,
+            'min_better_price': self.min_better_price,
+            'min_better_tick': self.min_better_tick,
+            'price_amm': self.matcher.price_amm,
+            'gas': gas
+        }
+
+    def plan(self, amount_in: int):
+        """ExecutionPlan for amount_in (needs builder and token addresses)."""
+        if self.builder is None:
+            raise ValueError("PlannerSession.plan() needs a builder")
+        full, _ = self._split(amount_in)
+        match_result = self.match(amount_in)
+        levels_used = match_result['levels_used']
+        # Fills are a prefix of the full fills, plus at most the partial one
+        plan_levels_used = self._plan_full_fills[:min(len(levels_used), full)]
+        if len(levels_used) > full:
+            plan_levels_used += self.builder.to_plan_levels(levels_used[full:])
+        return self.builder.build_plan(
+            match_result=match_result,
+            token_in_address=self.token_in_address,
+            token_out_address=self.token_out_address,
+            max_matches=self.max_matches,
+            me_slippage_limit=self.me_slippage_limit,
+            plan_levels_used=plan_levels_used
+        )
@@ -6,10 +6,30 @@ This package provides synthetic orderbook generation for UniHybrid backtesting.
 
 from .synthetic_orderbook import (
     SyntheticOrderbookGenerator,
-    OrderbookLevel
+    OrderbookLevel,
+    level_amount_out
+)
+from .monte_carlo import (
+    MonteCarloOrderbookGenerator,
+    MonteCarloConfig,
+    Distribution
+)
+from .tick_grid import (
+    swap_tick_price,
+    swap_tick_amount_out,
+    swap_tick_from_sqrt_price,
+    ticks_within_bps
 )
 
 __all__ = [
     'SyntheticOrderbookGenerator',
-    'OrderbookLevel'
+    'OrderbookLevel',
+    'level_amount_out',
+    'MonteCarloOrderbookGenerator',
+    'MonteCarloConfig',
+    'Distribution',
+    'swap_tick_price',
+    'swap_tick_amount_out',
+    'swap_tick_from_sqrt_price',
+    'ticks_within_bps'
 ]
@@ -0,0 +1,171 @@
+"""
+monte_carlo.py - Seeded Monte Carlo orderbooks, generated in vectorized batches
+
+Where SyntheticOrderbookGenerator builds three fixed shapes, this samples a
+book shape per draw:
+
+    num_levels        levels in the book (padded to max_levels)
+    first_spread_bps  distance of the best level from mid
+    step_bps          distance between consecutive levels
+    decay             size of level i ∝ decay ** i
+    depth_multiplier  total depth = depth_multiplier × swap_amount
+
+Each parameter comes from a `Distribution` (fixed / uniform / normal /
+lognormal / integer uniform). A batch of N books is a few array ops on
+(N, max_levels) arrays, no per-level Python, so thousands of books per
+second are cheap. Same seed -> same books.
+
+Orientation is the same as SyntheticOrderbookGenerator: BID levels above
+mid, ASK levels below mid; prices are token_out per token_in (human units),
+amounts raw (floored, stored as float64). Padded entries have mask False and
+zero amounts.
+
+Usage:
+    mc = MonteCarloOrderbookGenerator(Decimal('2700'), 18, 6, seed=42)
+    batch = mc.generate_batch(10_000, swap_amount=10**18, is_bid=True)
+    batch['prices'].shape        # (10000, max_levels)
+    levels = mc.to_levels(batch, 0)   # List[OrderbookLevel] for GreedyMatcher
+"""
+
+from dataclasses import dataclass
+from decimal import Decimal
+from typing import Dict, Iterator, List, Optional
+
+import numpy as np
+
+from .synthetic_orderbook import OrderbookLevel
+
+
+@dataclass(frozen=True)
+class Distribution:
+    """
+    kind / parameters:
+        fixed       a
+        uniform     [a, b)
+        randint     a..b inclusive (integers)
+        normal      mean a, std b
+        lognormal   median a, sigma b (of the underlying normal)
+    Samples are clipped to [low, high] when given.
+    """
+    kind: str
+    a: float
+    b: float = 0.0
+    low: Optional[float] = None
+    high: Optional[float] = None
+
+    def sample(self, rng: np.random.Generator, size: int) -> np.ndarray:
+        if self.kind == "fixed":
+            values = np.full(size, self.a, dtype=np.float64)
+        elif self.kind == "uniform":
+            values = rng.uniform(self.a, self.b, size)
+        elif self.kind == "randint":
+            values = rng.integers(int(self.a), int(self.b), size, endpoint=True).astype(np.float64)
+        elif self.kind == "normal":
+            values = rng.normal(self.a, self.b, size)
+        elif self.kind == "lognormal":
+            values = rng.lognormal(np.log(self.a), self.b, size)
+        else:
+            raise ValueError(f"Unknown distribution kind: {self.kind}")
+        if self.low is not None or self.high is not None:
+            values = np.clip(values, self.low, self.high)
+        return values
+
+
+@dataclass(frozen=True)
+class MonteCarloConfig:
+    # Ranges bracket the small / medium / large scenarios
+    num_levels: Distribution = Distribution("randint", 1, 10)
+    first_spread_bps: Distribution = Distribution("uniform", 5, 40)
+    step_bps: Distribution = Distribution("uniform", 5, 12)
+    decay: Distribution = Distribution("uniform", 0.4, 0.9)
+    depth_multiplier: Distribution = Distribution("lognormal", 1.5, 0.5, low=0.1, high=10.0)
+    max_levels: int = 10
+
+
+class MonteCarloOrderbookGenerator:
+
+    def __init__(
+        self,
+        mid_price: Decimal,
+        decimals_in: int,
+        decimals_out: int,
+        config: MonteCarloConfig = MonteCarloConfig(),
+        seed: Optional[int] = None
+    ):
+        self.mid_price = mid_price
+        self.decimals_in = decimals_in
+        self.decimals_out = decimals_out
+        self.config = config
+        self.seed = seed
+        self.rng = np.random.default_rng(seed)
+        # Raw out per raw in = price × 10^(decimals_out - decimals_in)
+        self._rate_scale = 10.0 ** (decimals_out - decimals_in)
+
+    def generate_batch(self, n_books: int, swap_amount: int, is_bid: bool = False) -> Dict[str, np.ndarray]:
+        """
+        n_books sampled books as arrays:
+            prices, amounts_in, amounts_out, mask       (n_books, max_levels)
+            num_levels, first_spread_bps, step_bps,
+            decay, depth_multiplier                     (n_books,)
+        """
+        config = self.config
+        rng = self.rng
+        max_levels = config.max_levels
+
+        num_levels = np.clip(config.num_levels.sample(rng, n_books), 1, max_levels).astype(np.int64)
+        first_spread_bps = np.maximum(config.first_spread_bps.sample(rng, n_books), 0.0)
+        step_bps = np.maximum(config.step_bps.sample(rng, n_books), 0.0)
+        decay = np.clip(config.decay.sample(rng, n_books), 1e-6, 1.0)
+        depth_multiplier = np.maximum(config.depth_multiplier.sample(rng, n_books), 0.0)
+
+        index = np.arange(max_levels, dtype=np.float64)
+        mask = index[None, :] < num_levels[:, None]
+
+        spread_bps = first_spread_bps[:, None] + step_bps[:, None] * index[None, :]
+        direction = 1.0 if is_bid else -1.0
+        prices = float(self.mid_price) * (1.0 + direction * spread_bps / 10000.0)
+
+        weights = np.where(mask, decay[:, None] ** index[None, :], 0.0)
+        weights /= weights.sum(axis=1, keepdims=True)
+        amounts_in = np.floor(weights * (depth_multiplier * float(swap_amount))[:, None])
+        amounts_out = np.floor(amounts_in * prices * self._rate_scale)
+
+        return {
+            'prices': np.where(mask, prices, 0.0),
+            'amounts_in': amounts_in,
+            'amounts_out': amounts_out,
+            'mask': mask,
+            'num_levels': num_levels,
+            'first_spread_bps': first_spread_bps,
+            'step_bps': step_bps,
+            'decay': decay,
+            'depth_multiplier': depth_multiplier,
+        }
+
+    def iter_batches(
+        self,
+        n_books: int,
+        swap_amount: int,
+        is_bid: bool = False,
+        batch_size: int = 10_000
+    ) -> Iterator[Dict[str, np.ndarray]]:
+        """n_books in batches of at most batch_size (same draws as one big batch per batch)."""
+        for start in range(0, n_books, batch_size):
+            yield self.generate_batch(min(batch_size, n_books - start), swap_amount, is_bid)
+
+    @staticmethod
+    def to_levels(batch: Dict[str, np.ndarray], book: int) -> List[OrderbookLevel]:
+        """One book of a batch as OrderbookLevels (best first), e.g. for GreedyMatcher."""
+        mask = batch['mask'][book]
+        return [
+            OrderbookLevel(
+                price=Decimal(repr(price)),
+                amount_in_available=int(amount_in),
+                amount_out_available=int(amount_out)
+            )
+            for price, amount_in, amount_out in zip(
+                batch['prices'][book][mask].tolist(),
+                batch['amounts_in'][book][mask].tolist(),
+                batch['amounts_out'][book][mask].tolist()
+            )
+        ]
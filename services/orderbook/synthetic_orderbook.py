@@ -1,6 +1,9 @@
 from decimal import Decimal
-from typing import List, Dict, Literal
+from typing import Dict, List, Literal, Optional, Sequence, Tuple
 from dataclasses import dataclass
+from functools import lru_cache
+
+from .tick_grid import swap_tick_price, swap_tick_amount_out
 
 
 @dataclass
@@ -8,6 +11,17 @@ class OrderbookLevel:
     price: Decimal
     amount_in_available: int
     amount_out_available: int
+    tick: Optional[int] = None  # swap-direction tick (tick-aligned mode only)
+
+
+@lru_cache(maxsize=None)
+def _pow10(decimals: int) -> Decimal:
+    return Decimal(10 ** decimals)
+
+
+def level_amount_out(amount_in: int, price: Decimal, decimals_in: int, decimals_out: int) -> int:
+    """Raw amount out for raw amount_in at price (token_out per token_in, human units)."""
+    return int(Decimal(amount_in) / _pow10(decimals_in) * price * _pow10(decimals_out))
 
 
 class SyntheticOrderbookGenerator:
@@ -16,11 +30,44 @@ class SyntheticOrderbookGenerator:
         self,
         mid_price: Decimal,
         decimals_in: int,
-        decimals_out: int
+        decimals_out: int,
+        mid_tick: Optional[int] = None,
+        tick_spacing: int = 1
     ):
+        """
+        mid_tick: swap-direction tick of the mid price (see tick_grid). When set,
+        levels are placed on the tick grid (multiples of tick_spacing, N bps
+        spread ~ N ticks) and amounts come from exact tick prices.
+        """
         self.mid_price = mid_price
         self.decimals_in = decimals_in
         self.decimals_out = decimals_out
+        self.tick_spacing = tick_spacing
+        self.mid_tick = None
+        if mid_tick is not None:
+            self.mid_tick = (mid_tick // tick_spacing) * tick_spacing
+    
+    def _level_price(
+        self,
+        spread_bps: Decimal,
+        is_bid: bool,
+        prev_tick: Optional[int] = None
+    ) -> Tuple[Decimal, Optional[int]]:
+        """
+        Level price at spread_bps from mid: above mid for BID, below for ASK.
+        In tick mode the level is at least one tick_spacing further from mid
+        than prev_tick (the previous level), so nearby spreads never share a tick.
+        """
+        if self.mid_tick is None:
+            spread = spread_bps / Decimal('10000')
+            price = self.mid_price * (1 + spread) if is_bid else self.mid_price * (1 - spread)
+            return price, None
+        
+        offset = max(1, round(spread_bps / self.tick_spacing)) * self.tick_spacing
+        if prev_tick is not None:
+            offset = max(offset, abs(prev_tick - self.mid_tick) + self.tick_spacing)
+        tick = self.mid_tick + offset if is_bid else self.mid_tick - offset
+        return swap_tick_price(tick, self.decimals_in, self.decimals_out), tick
     
     def generate_scenario_small(
         self,
@@ -45,21 +92,19 @@ class SyntheticOrderbookGenerator:
         DEPTH_MULTIPLIER = Decimal('0.5')  # 50% coverage
         SPREAD_BPS = Decimal('35')  # ✅ 35 bps below spot = ~8 bps better than AMM effective (~-43 bps)
         
-        if is_bid:
-            # BID: giá cao hơn mid
-            price = self.mid_price * (1 + SPREAD_BPS / Decimal('10000'))
-        else:
-            # ASK: giá thấp hơn mid BUT better than AMM effective
-            price = self.mid_price * (1 - SPREAD_BPS / Decimal('10000'))
+        # BID: giá cao hơn mid
+        # ASK: giá thấp hơn mid BUT better than AMM effective
+        price, tick = self._level_price(SPREAD_BPS, is_bid)
         
         amount_in_available = int(Decimal(swap_amount) * DEPTH_MULTIPLIER)
-        amount_out_available = self._calculate_amount_out(amount_in_available, price)
+        amount_out_available = self._calculate_amount_out(amount_in_available, price, tick)
         
         return [
             OrderbookLevel(
                 price=price,
                 amount_in_available=amount_in_available,
-                amount_out_available=amount_out_available
+                amount_out_available=amount_out_available,
+                tick=tick
             )
         ]
     
@@ -92,15 +137,12 @@ class SyntheticOrderbookGenerator:
         
         levels: List[OrderbookLevel] = []
         total_unscaled = Decimal('0')
+        tick = None
         
         for i in range(1, num_levels + 1):
-            spread = spread_step_bps * i / Decimal('10000')
-            if is_bid:
-                # BID: User bán base → muốn giá CAO (above mid)
-                price = self.mid_price * (1 + spread)
-            else:
-                # ASK: User mua base → muốn giá THẤP (below mid)
-                price = self.mid_price * (1 - spread)
+            # BID: User bán base → muốn giá CAO (above mid)
+            # ASK: User mua base → muốn giá THẤP (below mid)
+            price, tick = self._level_price(spread_step_bps * i, is_bid, tick)
             
             size_multiplier = base_size_multiplier * (decay_factor ** (i - 1))
             amount_in_unscaled = Decimal(swap_amount) * size_multiplier
@@ -108,6 +150,7 @@ class SyntheticOrderbookGenerator:
             
             levels.append({
                 'price': price,
+                'tick': tick,
                 'amount_in_unscaled': amount_in_unscaled
             })
         
@@ -119,14 +162,16 @@ class SyntheticOrderbookGenerator:
             amount_in_available = int(level_data['amount_in_unscaled'] * scale_factor)
             amount_out_available = self._calculate_amount_out(
                 amount_in_available, 
-                level_data['price']
+                level_data['price'],
+                level_data['tick']
             )
             
             result.append(
                 OrderbookLevel(
                     price=level_data['price'],
                     amount_in_available=amount_in_available,
-                    amount_out_available=amount_out_available
+                    amount_out_available=amount_out_available,
+                    tick=level_data['tick']
                 )
             )
         
@@ -164,15 +209,12 @@ class SyntheticOrderbookGenerator:
         
         levels: List[OrderbookLevel] = []
         total_unscaled = Decimal('0')
+        tick = None
         
         for i in range(1, num_levels + 1):
-            spread = spread_step_bps * i / Decimal('10000')
-            if is_bid:
-                # BID: User mua ETH → muốn giá CAO (above mid)
-                price = self.mid_price * (1 + spread)
-            else:
-                # ASK: User bán ETH → muốn giá THẤP (below mid)
-                price = self.mid_price * (1 - spread)
+            # BID: User mua ETH → muốn giá CAO (above mid)
+            # ASK: User bán ETH → muốn giá THẤP (below mid)
+            price, tick = self._level_price(spread_step_bps * i, is_bid, tick)
             
             size_multiplier = base_size_multiplier * (decay_factor ** (i - 1))
             amount_in_unscaled = Decimal(swap_amount) * size_multiplier
@@ -180,6 +222,7 @@ class SyntheticOrderbookGenerator:
             
             levels.append({
                 'price': price,
+                'tick': tick,
                 'amount_in_unscaled': amount_in_unscaled
             })
         
@@ -191,19 +234,86 @@ class SyntheticOrderbookGenerator:
             amount_in_available = int(level_data['amount_in_unscaled'] * scale_factor)
             amount_out_available = self._calculate_amount_out(
                 amount_in_available, 
-                level_data['price']
+                level_data['price'],
+                level_data['tick']
             )
             
             result.append(
                 OrderbookLevel(
                     price=level_data['price'],
                     amount_in_available=amount_in_available,
-                    amount_out_available=amount_out_available
+                    amount_out_available=amount_out_available,
+                    tick=level_data['tick']
                 )
             )
         
         return result
-    
+
+    def generate_scenario_cex(
+        self,
+        swap_amount: int,
+        cex_levels: Sequence[Dict],
+        is_bid: bool = False,
+        max_spread_bps: Decimal = Decimal('200'),
+        target_depth_multiplier: Decimal = Decimal('2.5')
+    ) -> List[OrderbookLevel]:
+        """
+        Orderbook with the shape of a real CEX book (e.g. L2Book.cex_snapshot()).
+
+        Each CEX level keeps its distance from the CEX mid (bps) and its share of
+        notional; levels are re-centred on self.mid_price and scaled to
+        target_depth_multiplier × swap_amount. Only levels within max_spread_bps
+        of the CEX mid are used (±2% by default, same band as VirtualOrderBook).
+
+        - is_bid=False (ASK, prices below mid): shape of the CEX bid side
+        - is_bid=True (BID, prices above mid): shape of the CEX ask side
+        """
+        best_bid = None
+        best_ask = None
+        for level in cex_levels:
+            if level['side'] == 'bid':
+                if best_bid is None or level['price'] > best_bid:
+                    best_bid = level['price']
+            elif best_ask is None or level['price'] < best_ask:
+                best_ask = level['price']
+        if best_bid is None or best_ask is None:
+            return []
+        cex_mid = (best_bid + best_ask) / 2
+
+        side = 'ask' if is_bid else 'bid'
+        max_distance = float(max_spread_bps)
+        shape = []
+        total_notional = 0.0
+        for level in cex_levels:
+            if level['side'] != side:
+                continue
+            distance_bps = abs(level['price'] - cex_mid) / cex_mid * 10000
+            if distance_bps > max_distance:
+                continue
+            notional = level['price'] * level['size']
+            shape.append((distance_bps, notional))
+            total_notional += notional
+        if total_notional == 0:
+            return []
+        shape.sort()
+
+        target_total = Decimal(swap_amount) * target_depth_multiplier
+        result: List[OrderbookLevel] = []
+        tick = None
+        for distance_bps, notional in shape:
+            price, tick = self._level_price(Decimal(str(round(distance_bps, 4))), is_bid, tick)
+            amount_in_available = int(target_total * Decimal(notional / total_notional))
+            result.append(
+                OrderbookLevel(
+                    price=price,
+                    amount_in_available=amount_in_available,
+                    amount_out_available=self._calculate_amount_out(amount_in_available, price, tick),
+                    tick=tick
+                )
+            )
+
+        return result
+
     def generate(
         self,
         scenario: Literal['small', 'medium', 'large'],
@@ -214,8 +324,12 @@ class SyntheticOrderbookGenerator:
         spread_step_bps: Decimal = Decimal('8'),  # ✅ OPTIMIZED: 8 bps default
         base_size_multiplier: Decimal = Decimal('1.0'),
         decay_factor: Decimal = Decimal('0.7'),
-        target_depth_multiplier: Decimal = Decimal('2.5')
+        target_depth_multiplier: Decimal = Decimal('2.5'),
+        cex_levels: Optional[Sequence[Dict]] = None
     ) -> List[OrderbookLevel]:
+        """cex_levels: real CEX shape for scenario 'large' (see generate_scenario_cex)."""
+        if scenario == 'large' and cex_levels is not None:
+            return self.generate_scenario_cex(swap_amount, cex_levels, is_bid)
         if scenario == 'small':
             return self.generate_scenario_small(swap_amount, is_bid)
         elif scenario == 'medium':
@@ -243,11 +357,10 @@ class SyntheticOrderbookGenerator:
         else:
             raise ValueError(f"Invalid scenario: {scenario}")
     
-    def _calculate_amount_out(self, amount_in: int, price: Decimal) -> int:
-        amount_in_human = Decimal(amount_in) / Decimal(10 ** self.decimals_in)
-        amount_out_human = amount_in_human * price
-        amount_out = int(amount_out_human * Decimal(10 ** self.decimals_out))
-        return amount_out
+    def _calculate_amount_out(self, amount_in: int, price: Decimal, tick: Optional[int] = None) -> int:
+        if tick is not None:
+            return swap_tick_amount_out(amount_in, tick)
+        return level_amount_out(amount_in, price, self.decimals_in, self.decimals_out)
     
     def get_total_depth(self, levels: List[OrderbookLevel]) -> Dict[str, int]:
         total_in = sum(level.amount_in_available for level in levels)
@@ -0,0 +1,55 @@
+"""
+tick_grid.py - Orderbook prices on the Uniswap V3 tick grid
+
+Levels in tick-aligned mode sit on ticks of the swap direction:
+
+    price(tick) = 1.0001^tick * 10^(decimals_in - decimals_out)   (token_out per token_in)
+
+For token0 -> token1 this is the pool tick; for token1 -> token0 it is the
+negated pool tick. A higher tick is always more output per input, so the
+orderbook and the AMM compare as integers, and level amounts come from the
+exact sqrt ratio instead of Decimal multiplication.
+
+One tick is ~1 bps (1.0001), so a spread of N bps maps to N ticks.
+"""
+
+import math
+from decimal import Decimal
+from functools import lru_cache
+
+from services.amm_uniswap_v3.price_math import tick_to_price
+from services.amm_uniswap_v3.v3_math import get_sqrt_ratio_at_tick, get_tick_at_sqrt_ratio
+
+
+_LOG_1_0001 = math.log(1.0001)
+
+
+@lru_cache(maxsize=65536)
+def swap_tick_price(tick: int, decimals_in: int, decimals_out: int) -> Decimal:
+    """Human price (token_out per token_in) of a swap-direction tick, cached per tick."""
+    return tick_to_price(tick, decimals_in, decimals_out)
+
+
+def swap_tick_amount_out(amount_in: int, tick: int) -> int:
+    """Raw amount out for raw amount_in at a tick's price, floor (integer only)."""
+    sqrt_price = get_sqrt_ratio_at_tick(tick)
+    return (amount_in * sqrt_price * sqrt_price) >> 192
+
+
+def swap_tick_from_sqrt_price(sqrt_price_x96: int, zero_for_one: bool) -> int:
+    """Pool sqrtPriceX96 -> tick in the swap direction (floor)."""
+    if zero_for_one:
+        return get_tick_at_sqrt_ratio(sqrt_price_x96)
+    return get_tick_at_sqrt_ratio((1 << 192) // sqrt_price_x96)
+
+
+def ticks_within_bps(bps: int, above: bool) -> int:
+    """
+    Largest tick offset still inside a relative band of `bps`:
+    above=True:  max k with 1.0001^k <= 1 + bps/10000
+    above=False: min k with 1.0001^k >= 1 - bps/10000 (k <= 0)
+    """
+    # 1e-9 absorbs float error when the band edge falls exactly on a tick
+    if above:
+        return math.floor(math.log1p(bps / 10000) / _LOG_1_0001 + 1e-9)
+    return math.ceil(math.log1p(-bps / 10000) / _LOG_1_0001 - 1e-9)
@@ -0,0 +1,20 @@
+"""
+State Package
+
+Per-block chain state published off the request path (lock-free snapshot),
+shared across processes in multi-worker API deployments.
+"""
+
+from .shared_store import SharedStateStore, LeaderLock, default_state_dir
+from .snapshot import PoolState, StateSnapshot, get_snapshot, publish_snapshot, clear_snapshot
+
+__all__ = [
+    'SharedStateStore',
+    'LeaderLock',
+    'default_state_dir',
+    'PoolState',
+    'StateSnapshot',
+    'get_snapshot',
+    'publish_snapshot',
+    'clear_snapshot',
+]
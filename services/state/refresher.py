@@ -0,0 +1,141 @@
+"""
+refresher.py - Background pool state refresh, decoupled from the request path
+
+An asyncio task (started by the API lifespan) polls the chain at block cadence.
+On every new block it reads slot0 + liquidity of every registered pool and the
+block base fee in ONE Multicall3 call at that block, builds an immutable
+`StateSnapshot` and publishes it (see snapshot.py). Request handlers read the
+snapshot instead of calling RPC inline.
+
+Immutable pool fields (tokens, decimals, symbols, fee, tickSpacing) are read
+once, also batched. With tick data enabled, each PoolState also carries the
+pool's initialized ticks (TickTable), loaded once and then kept current from
+Mint/Burn logs.
+
+Multi-worker mode (shared store + leader lock): only the leader reads the
+chain; it also writes the snapshot to the `SharedStateStore`. The other
+workers adopt the shared snapshot, so RPC load does not grow with workers.
+If the leader dies, the next worker to get the lock takes over.
+"""
+
+import asyncio
+import time
+from typing import Dict, Iterable, Optional
+
+from services.amm_uniswap_v3.tick_data import TickDataLoader
+from services.amm_uniswap_v3.uniswap_v3 import (
+    web3,
+    get_block_number,
+    get_pools_metadata_batch,
+    get_pool_states_batch,
+    price_from_sqrtprice,
+)
+from .shared_store import SharedStateStore, LeaderLock
+from .snapshot import PoolState, StateSnapshot, get_snapshot, publish_snapshot
+
+
+POOL_STATE_KEY = "pool_state"
+
+
+class PoolStateRefresher:
+
+    def __init__(
+        self,
+        pool_addresses: Iterable[str],
+        poll_interval_s: float = 2.0,  # Base block time
+        store: Optional[SharedStateStore] = None,
+        leader_lock: Optional[LeaderLock] = None,
+        load_ticks: bool = True
+    ):
+        self.pool_addresses = sorted({addr.lower() for addr in pool_addresses})
+        self.poll_interval_s = poll_interval_s
+        self.store = store
+        self.leader_lock = leader_lock
+        self.last_block: Optional[int] = None
+        self._metadata: Optional[Dict[str, Dict]] = None
+        self.tick_loader = TickDataLoader(web3) if load_ticks else None
+
+    @property
+    def is_leader(self) -> bool:
+        """Whether this worker currently holds leadership (no side effects)."""
+        return self.leader_lock is None or self.leader_lock.is_leader
+
+    def try_become_leader(self) -> bool:
+        """Take the leader lock if it is free; True if this worker is (now) the leader."""
+        return self.leader_lock is None or self.leader_lock.try_acquire()
+
+    def refresh_once(self) -> Optional[StateSnapshot]:
+        """Read chain state if a new block arrived and publish it. Blocking (runs in a thread)."""
+        block_number = get_block_number()
+        if block_number == self.last_block:
+            return None
+
+        if self._metadata is None:
+            self._metadata = get_pools_metadata_batch(self.pool_addresses)
+        state = get_pool_states_batch(self.pool_addresses, block_identifier=block_number)
+        tick_tables = self._sync_ticks(block_number)
+
+        pools = {}
+        for addr, meta in self._metadata.items():
+            live = state["pools"][addr]
+            pools[addr] = PoolState(
+                pool=meta["pool"],
+                token0=meta["token0"],
+                token1=meta["token1"],
+                decimals0=meta["decimals0"],
+                decimals1=meta["decimals1"],
+                symbol0=meta["symbol0"],
+                symbol1=meta["symbol1"],
+                fee=meta["fee"],
+                tick_spacing=meta["tickSpacing"],
+                sqrt_price_x96=live["sqrtPriceX96"],
+                tick=live["tick"],
+                liquidity=live["liquidity"],
+                price=price_from_sqrtprice(live["sqrtPriceX96"], meta["decimals0"], meta["decimals1"]),
+                ticks=tick_tables.get(addr),
+            )
+
+        snapshot = StateSnapshot.build(block_number, time.time(), state["base_fee"], pools)
+        publish_snapshot(snapshot)
+        if self.store is not None:
+            self.store.publish(POOL_STATE_KEY, snapshot)
+        self.last_block = block_number
+        return snapshot
+
+    def _sync_ticks(self, block_number: int) -> Dict:
+        if self.tick_loader is None:
+            return {}
+        spacings = {addr: meta["tickSpacing"] for addr, meta in self._metadata.items() if meta["tickSpacing"]}
+        try:
+            return self.tick_loader.sync(spacings, block_number)
+        except Exception as e:
+            # Price state is still published; tick tables are fully reloaded next block
+            print(f"⚠️  Tick data sync failed: {e}")
+            self.tick_loader.synced_block = None
+            return {}
+
+    def follow_once(self) -> Optional[StateSnapshot]:
+        """Adopt the leader's snapshot from the shared store if it is newer."""
+        if self.store is None:
+            return None
+        shared = self.store.load(POOL_STATE_KEY)
+        current = get_snapshot()
+        if shared is None or (current is not None and shared.block_number <= current.block_number):
+            return None
+        publish_snapshot(shared)
+        self.last_block = shared.block_number
+        return shared
+
+    async def run(self) -> None:
+        while True:
+            try:
+                if self.try_become_leader():
+                    await asyncio.to_thread(self.refresh_once)
+                else:
+                    self.follow_once()
+            except Exception as e:
+                print(f"⚠️  Pool state refresh failed: {e}")
+            await asyncio.sleep(self.poll_interval_s)
+
+    def start(self) -> "asyncio.Task[None]":
+        return asyncio.create_task(self.run(), name="unihybrid-pool-refresher")
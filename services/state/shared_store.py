@@ -0,0 +1,134 @@
+"""
+shared_store.py - Cross-process shared state for multi-worker deployments
+
+Each API worker is a separate process, so in-memory caches are per-process.
+`SharedStateStore` publishes snapshots (pool state, token metadata, orderbook
+snapshots) as files in a shared-memory directory (/dev/shm on Linux) that every
+worker can read:
+
+- publish(): pickle to a temp file, then os.replace() → readers never see a
+  partially written snapshot
+- load(): re-reads a key only when the file changed (inode / mtime), so the
+  common case is one stat() call
+
+`LeaderLock` elects the one process that refreshes chain state, so RPC load
+does not grow with the number of workers. The lock is an flock() on a file:
+the kernel releases it when the leader exits, and another worker takes over.
+
+Snapshots are pickles, and unpickling runs code, so only files this user
+wrote are loaded: the default directory is per-uid, created 0o700, and both
+the directory and each file must be owned by the current user and not
+writable by group / others, or they are refused with PermissionError.
+"""
+
+import fcntl
+import os
+import pickle
+import stat
+import tempfile
+import threading
+from typing import Any, Dict, Optional, Tuple
+
+
+def default_state_dir() -> str:
+    base = "/dev/shm" if os.path.isdir("/dev/shm") else tempfile.gettempdir()
+    return os.path.join(base, f"unihybrid-{os.getuid()}")
+
+
+def _check_owned(st: os.stat_result, path: str) -> None:
+    """Refuse paths another user owns or could write."""
+    if st.st_uid != os.getuid():
+        raise PermissionError(f"{path} is owned by uid {st.st_uid}, not {os.getuid()}")
+    if st.st_mode & (stat.S_IWGRP | stat.S_IWOTH):
+        raise PermissionError(f"{path} is writable by group/others (mode {stat.S_IMODE(st.st_mode):o})")
+
+
+def _ensure_private_dir(directory: str) -> str:
+    """Create directory with mode 0o700 if missing; refuse one that is not private to this user."""
+    os.makedirs(directory, mode=0o700, exist_ok=True)
+    st = os.lstat(directory)
+    if not stat.S_ISDIR(st.st_mode):
+        raise PermissionError(f"{directory} is not a directory")
+    _check_owned(st, directory)
+    return directory
+
+
+class SharedStateStore:
+
+    def __init__(self, directory: Optional[str] = None):
+        self.directory = _ensure_private_dir(directory or default_state_dir())
+        # key -> ((st_ino, st_mtime_ns, st_size), value)
+        self._loaded: Dict[str, Tuple[Tuple[int, int, int], Any]] = {}
+        self._lock = threading.Lock()
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, f"{key}.pkl")
+
+    def publish(self, key: str, value: Any) -> None:
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, prefix=f".{key}.")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                pickle.dump(value, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_path, self._path(key))
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.unlink(tmp_path)
+            raise
+
+    def load(self, key: str) -> Optional[Any]:
+        """Return the latest published value for key, or None if never published."""
+        try:
+            st = os.stat(self._path(key))
+        except FileNotFoundError:
+            return None
+        version = (st.st_ino, st.st_mtime_ns, st.st_size)
+
+        cached = self._loaded.get(key)
+        if cached is not None and cached[0] == version:
+            return cached[1]
+
+        with self._lock:
+            try:
+                fd = os.open(self._path(key), os.O_RDONLY | os.O_NOFOLLOW)
+            except FileNotFoundError:
+                return None
+            with os.fdopen(fd, "rb") as f:
+                # Check the file actually opened, not the path stat()ed above
+                st = os.fstat(fd)
+                _check_owned(st, self._path(key))
+                value = pickle.load(f)
+            self._loaded[key] = ((st.st_ino, st.st_mtime_ns, st.st_size), value)
+            return value
+
+
+class LeaderLock:
+    """Non-blocking, process-wide exclusive lock (one leader per state dir)."""
+
+    def __init__(self, directory: Optional[str] = None, name: str = "leader"):
+        self.directory = _ensure_private_dir(directory or default_state_dir())
+        self.path = os.path.join(self.directory, f"{name}.lock")
+        self._fd: Optional[int] = None
+
+    @property
+    def is_leader(self) -> bool:
+        return self._fd is not None
+
+    def try_acquire(self) -> bool:
+        if self._fd is not None:
+            return True
+        fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o600)
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            os.close(fd)
+            return False
+        os.ftruncate(fd, 0)
+        os.write(fd, str(os.getpid()).encode())
+        self._fd = fd
+        return True
+
+    def release(self) -> None:
+        if self._fd is not None:
+            fcntl.flock(self._fd, fcntl.LOCK_UN)
+            os.close(self._fd)
+            self._fd = None
@@ -0,0 +1,107 @@
+"""
+snapshot.py - Immutable per-block pool state, read lock-free by request handlers
+
+The refresher builds a new `StateSnapshot` for every block and swaps it in with
+`publish_snapshot()`. Readers call `get_snapshot()` and get a consistent view of
+every pool at one block; nothing is mutated after publish, so no locks are
+needed (a module attribute swap is atomic).
+"""
+
+import time
+from dataclasses import dataclass, field
+from decimal import Decimal
+from types import MappingProxyType
+from typing import Any, Dict, Mapping, Optional
+
+from services.amm_uniswap_v3.swap_simulator import SwapResult, simulate_exact_input
+from services.amm_uniswap_v3.tick_data import TickTable
+
+
+@dataclass(frozen=True, slots=True)
+class PoolState:
+    pool: str
+    token0: str
+    token1: str
+    decimals0: int
+    decimals1: int
+    symbol0: Optional[str]
+    symbol1: Optional[str]
+    fee: Optional[int]
+    tick_spacing: Optional[int]
+    sqrt_price_x96: int
+    tick: int
+    liquidity: int
+    price: Decimal  # token1 per token0 (human units)
+    ticks: Optional[TickTable] = None  # initialized ticks at the same block
+
+    def simulate_exact_input(self, zero_for_one: bool, amount_in: int) -> Optional[SwapResult]:
+        """Local exact-input swap at this block; None without tick data."""
+        if self.ticks is None or self.fee is None:
+            return None
+        return simulate_exact_input(
+            self.sqrt_price_x96, self.tick, self.liquidity, self.ticks, self.fee, zero_for_one, amount_in
+        )
+
+    def as_pool_data(self) -> Dict[str, Any]:
+        """Same fields as get_price_for_pool() (+ fee, tickSpacing, liquidity)."""
+        return {
+            "pool": self.pool,
+            "token0": self.token0,
+            "token1": self.token1,
+            "symbol0": self.symbol0,
+            "symbol1": self.symbol1,
+            "decimals0": self.decimals0,
+            "decimals1": self.decimals1,
+            "fee": self.fee,
+            "tickSpacing": self.tick_spacing,
+            "sqrtPriceX96": str(self.sqrt_price_x96),
+            "tick": self.tick,
+            "liquidity": self.liquidity,
+            "price_eth_per_usdt": self.price,
+        }
+
+
+@dataclass(frozen=True, slots=True)
+class StateSnapshot:
+    block_number: int
+    updated_at: float  # unix time
+    base_fee: Optional[int]
+    pools: Mapping[str, PoolState] = field(default_factory=lambda: MappingProxyType({}))
+
+    @classmethod
+    def build(
+        cls,
+        block_number: int,
+        updated_at: float,
+        base_fee: Optional[int],
+        pools: Dict[str, PoolState]
+    ) -> "StateSnapshot":
+        frozen_pools = MappingProxyType({addr.lower(): state for addr, state in pools.items()})
+        return cls(block_number, updated_at, base_fee, frozen_pools)
+
+    def pool(self, pool_address: str) -> Optional[PoolState]:
+        return self.pools.get(pool_address.lower())
+
+    def age_s(self) -> float:
+        return time.time() - self.updated_at
+
+    def __reduce__(self):
+        # mappingproxy is not picklable; rebuild it on load (shared store)
+        return (StateSnapshot.build, (self.block_number, self.updated_at, self.base_fee, dict(self.pools)))
+
+
+_current: Optional[StateSnapshot] = None
+
+
+def get_snapshot() -> Optional[StateSnapshot]:
+    return _current
+
+
+def publish_snapshot(snapshot: StateSnapshot) -> None:
+    global _current
+    _current = snapshot
+
+
+def clear_snapshot() -> None:
+    global _current
+    _current = None
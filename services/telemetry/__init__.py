@@ -0,0 +1,34 @@
+"""
+Telemetry Package
+
+Latency instrumentation for the execution-plan pipeline and
+RPC call accounting for the web3 layer.
+"""
+
+from .spans import (
+    span,
+    request_timings,
+    format_server_timing,
+    registry,
+    set_enabled,
+    is_enabled,
+)
+from .rpc import (
+    InstrumentedHTTPProvider,
+    RpcTally,
+    rpc_accounting,
+    register_abi,
+)
+
+__all__ = [
+    'span',
+    'request_timings',
+    'format_server_timing',
+    'registry',
+    'set_enabled',
+    'is_enabled',
+    'InstrumentedHTTPProvider',
+    'RpcTally',
+    'rpc_accounting',
+    'register_abi',
+]
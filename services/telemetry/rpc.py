@@ -0,0 +1,194 @@
+"""
+rpc.py - RPC call accounting for the web3 layer
+
+`InstrumentedHTTPProvider` wraps web3's HTTPProvider and records, for every
+JSON-RPC call: the method, the contract function (for eth_call, resolved from
+the 4-byte selector of registered ABIs), latency and request/response sizes.
+
+Calls are recorded into:
+- the current `RpcTally` bound by `rpc_accounting()` (per request / per plan);
+  nested scopes also count into the enclosing ones
+- process-wide Prometheus metrics (`unihybrid_rpc_*`) when metrics are enabled
+
+Usage:
+    with rpc_accounting() as tally:
+        plan = build_plan(...)
+    plan.metadata["rpc"] = tally.to_dict()
+"""
+
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Dict, Iterator, List, Optional
+
+from web3 import Web3
+
+from .spans import registry, is_enabled
+
+
+RPC_DURATION_METRIC = "unihybrid_rpc_duration_seconds"
+RPC_REQUEST_BYTES_METRIC = "unihybrid_rpc_request_bytes_total"
+RPC_RESPONSE_BYTES_METRIC = "unihybrid_rpc_response_bytes_total"
+
+registry.describe(RPC_DURATION_METRIC, "Latency of JSON-RPC calls by method and contract function")
+registry.describe(RPC_REQUEST_BYTES_METRIC, "JSON-RPC request payload bytes")
+registry.describe(RPC_RESPONSE_BYTES_METRIC, "JSON-RPC response payload bytes")
+
+# 4-byte selector (0x-prefixed hex) -> function signature
+_SELECTORS: Dict[str, str] = {}
+
+
+def _canonical_type(param: Dict[str, Any]) -> str:
+    abi_type = param["type"]
+    if abi_type.startswith("tuple"):
+        inner = ",".join(_canonical_type(c) for c in param["components"])
+        return f"({inner}){abi_type[len('tuple'):]}"
+    return abi_type
+
+
+def register_abi(abi: List[Dict[str, Any]]) -> None:
+    """Register contract functions so eth_call selectors resolve to names."""
+    for entry in abi:
+        if entry.get("type") != "function":
+            continue
+        signature = f"{entry['name']}({','.join(_canonical_type(p) for p in entry.get('inputs', []))})"
+        register_selector(signature)
+
+
+def register_selector(signature: str) -> None:
+    selector = "0x" + Web3.keccak(text=signature)[:4].hex().removeprefix("0x")
+    _SELECTORS[selector] = signature
+
+
+def call_label(method: str, params: Any) -> str:
+    """Label for a call: 'eth_call:slot0()' for contract reads, else the method."""
+    if method == "eth_call" and params:
+        tx = params[0]
+        data = (tx.get("data") or tx.get("input")) if isinstance(tx, dict) else None
+        if isinstance(data, bytes):
+            data = "0x" + data.hex()
+        if data:
+            selector = data[:10].lower()
+            return f"eth_call:{_SELECTORS.get(selector, selector)}"
+    return method
+
+
+class RpcTally:
+    """Per-scope RPC call counts, latency and payload sizes, keyed by call label."""
+
+    def __init__(self, parent: Optional["RpcTally"] = None):
+        self.calls: Dict[str, Dict[str, float]] = {}
+        self.parent = parent  # enclosing scope, also gets every call
+        self._lock = threading.Lock()
+
+    def record(
+        self,
+        label: str,
+        elapsed: float,
+        request_bytes: int,
+        response_bytes: int
+    ) -> None:
+        with self._lock:
+            entry = self.calls.get(label)
+            if entry is None:
+                entry = self.calls[label] = {
+                    "count": 0,
+                    "latency_s": 0.0,
+                    "max_latency_s": 0.0,
+                    "request_bytes": 0,
+                    "response_bytes": 0,
+                }
+            entry["count"] += 1
+            entry["latency_s"] += elapsed
+            entry["max_latency_s"] = max(entry["max_latency_s"], elapsed)
+            entry["request_bytes"] += request_bytes
+            entry["response_bytes"] += response_bytes
+        if self.parent is not None:
+            self.parent.record(label, elapsed, request_bytes, response_bytes)
+
+    @property
+    def total_calls(self) -> int:
+        return sum(int(e["count"]) for e in self.calls.values())
+
+    def to_dict(self) -> Dict[str, Any]:
+        with self._lock:
+            calls = {
+                label: {
+                    "count": int(e["count"]),
+                    "latency_ms": round(e["latency_s"] * 1000, 3),
+                    "max_latency_ms": round(e["max_latency_s"] * 1000, 3),
+                    "request_bytes": int(e["request_bytes"]),
+                    "response_bytes": int(e["response_bytes"]),
+                }
+                for label, e in sorted(self.calls.items())
+            }
+        return {
+            "total_calls": sum(c["count"] for c in calls.values()),
+            "total_latency_ms": round(sum(c["latency_ms"] for c in calls.values()), 3),
+            "request_bytes": sum(c["request_bytes"] for c in calls.values()),
+            "response_bytes": sum(c["response_bytes"] for c in calls.values()),
+            "calls": calls,
+        }
+
+
+_current_tally: ContextVar[Optional[RpcTally]] = ContextVar("unihybrid_rpc_tally", default=None)
+
+
+@contextmanager
+def rpc_accounting() -> Iterator[RpcTally]:
+    """Record every RPC call made in this context into a fresh RpcTally (and any enclosing one)."""
+    tally = RpcTally(parent=_current_tally.get())
+    token = _current_tally.set(tally)
+    try:
+        yield tally
+    finally:
+        _current_tally.reset(token)
+
+
+def record_call(method: str, params: Any, elapsed: float, request_bytes: int, response_bytes: int) -> None:
+    label = call_label(method, params)
+    tally = _current_tally.get()
+    if tally is not None:
+        tally.record(label, elapsed, request_bytes, response_bytes)
+    if is_enabled():
+        registry.observe(RPC_DURATION_METRIC, elapsed, method=method, call=label)
+        registry.inc(RPC_REQUEST_BYTES_METRIC, request_bytes, method=method)
+        registry.inc(RPC_RESPONSE_BYTES_METRIC, response_bytes, method=method)
+
+
+class InstrumentedHTTPProvider(Web3.HTTPProvider):
+    """
+    HTTPProvider that accounts every JSON-RPC round trip.
+
+    Payload sizes are taken from the encoded request / raw response bytes,
+    so no extra serialization is done.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._payload_sizes = threading.local()
+
+    def encode_rpc_request(self, method, params):
+        encoded = super().encode_rpc_request(method, params)
+        self._payload_sizes.request = len(encoded)
+        return encoded
+
+    def decode_rpc_response(self, raw_response):
+        self._payload_sizes.response = len(raw_response)
+        return super().decode_rpc_response(raw_response)
+
+    def make_request(self, method, params):
+        self._payload_sizes.request = 0
+        self._payload_sizes.response = 0
+        start = time.perf_counter()
+        try:
+            return super().make_request(method, params)
+        finally:
+            record_call(
+                method,
+                params,
+                time.perf_counter() - start,
+                self._payload_sizes.request,
+                self._payload_sizes.response,
+            )
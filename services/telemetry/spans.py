@@ -0,0 +1,208 @@
+"""
+spans.py - Lightweight per-stage latency instrumentation
+
+Usage:
+    with span("get_amm_output"):
+        quote = get_amm_output(...)
+
+Each span records its duration into a Prometheus-style histogram
+(`unihybrid_stage_duration_seconds{stage="..."}`) and, when a request scope
+is active (see `request_timings()`), into the per-request timing list used
+for the `Server-Timing` response header.
+
+When metrics are disabled (METRICS_ENABLED=false), `span()` returns a shared
+no-op context manager, so instrumented code pays one function call per stage.
+"""
+
+import os
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+
+
+# Seconds. Covers in-process CPU stages (sub-ms) up to slow RPC round trips.
+DEFAULT_BUCKETS: Tuple[float, ...] = (
+    0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05,
+    0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0,
+)
+
+STAGE_METRIC = "unihybrid_stage_duration_seconds"
+
+
+class Histogram:
+    """Cumulative histogram in Prometheus exposition semantics."""
+
+    def __init__(self, buckets: Sequence[float] = DEFAULT_BUCKETS):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * len(self.buckets)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value: float) -> None:
+        for i, upper in enumerate(self.buckets):
+            if value <= upper:
+                self.counts[i] += 1
+                break
+        self.count += 1
+        self.sum += value
+
+
+class MetricsRegistry:
+
+    def __init__(self):
+        self._histograms: Dict[Tuple[str, Tuple[Tuple[str, str], ...]], Histogram] = {}
+        self._counters: Dict[Tuple[str, Tuple[Tuple[str, str], ...]], float] = {}
+        self._help: Dict[str, str] = {}
+        self._lock = threading.Lock()
+
+    def describe(self, name: str, help_text: str) -> None:
+        self._help[name] = help_text
+
+    def observe(self, name: str, value: float, **labels: str) -> None:
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            histogram = self._histograms.get(key)
+            if histogram is None:
+                histogram = self._histograms[key] = Histogram()
+            histogram.observe(value)
+
+    def inc(self, name: str, value: float = 1, **labels: str) -> None:
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + value
+
+    def render_prometheus(self) -> str:
+        """Render all histograms and counters in the Prometheus text exposition format."""
+        lines: List[str] = []
+        with self._lock:
+            items = sorted(self._histograms.items())
+            by_name: Dict[str, List] = {}
+            for (name, labels), histogram in items:
+                by_name.setdefault(name, []).append((labels, histogram))
+
+            for name, series in by_name.items():
+                if name in self._help:
+                    lines.append(f"# HELP {name} {self._help[name]}")
+                lines.append(f"# TYPE {name} histogram")
+                for labels, histogram in series:
+                    cumulative = 0
+                    for upper, count in zip(histogram.buckets, histogram.counts):
+                        cumulative += count
+                        lines.append(
+                            f"{name}_bucket{_format_labels(labels, le=_format_float(upper))} {cumulative}"
+                        )
+                    lines.append(f"{name}_bucket{_format_labels(labels, le='+Inf')} {histogram.count}")
+                    lines.append(f"{name}_sum{_format_labels(labels)} {histogram.sum}")
+                    lines.append(f"{name}_count{_format_labels(labels)} {histogram.count}")
+
+            counters: Dict[str, List] = {}
+            for (name, labels), value in sorted(self._counters.items()):
+                counters.setdefault(name, []).append((labels, value))
+
+            for name, series in counters.items():
+                if name in self._help:
+                    lines.append(f"# HELP {name} {self._help[name]}")
+                lines.append(f"# TYPE {name} counter")
+                for labels, value in series:
+                    lines.append(f"{name}{_format_labels(labels)} {value}")
+        return "\n".join(lines) + "\n"
+
+    def reset(self) -> None:
+        with self._lock:
+            self._histograms.clear()
+            self._counters.clear()
+
+
+def _format_float(value: float) -> str:
+    return repr(float(value))
+
+
+def _format_labels(labels: Tuple[Tuple[str, str], ...], **extra: str) -> str:
+    pairs = list(labels) + list(extra.items())
+    if not pairs:
+        return ""
+    body = ",".join(f'{k}="{v}"' for k, v in pairs)
+    return "{" + body + "}"
+
+
+registry = MetricsRegistry()
+registry.describe(STAGE_METRIC, "Duration of execution-plan pipeline stages")
+
+_enabled = os.getenv("METRICS_ENABLED", "true").lower() in ("1", "true", "yes")
+
+# Per-request list of (stage, seconds), bound by request_timings()
+_request_timings: ContextVar[Optional[List[Tuple[str, float]]]] = ContextVar(
+    "unihybrid_request_timings", default=None
+)
+
+
+def set_enabled(enabled: bool) -> None:
+    global _enabled
+    _enabled = enabled
+
+
+def is_enabled() -> bool:
+    return _enabled
+
+
+class _NullSpan:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+
+_NULL_SPAN = _NullSpan()
+
+
+class _Span:
+    __slots__ = ("stage", "start")
+
+    def __init__(self, stage: str):
+        self.stage = stage
+        self.start = 0.0
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        elapsed = time.perf_counter() - self.start
+        registry.observe(STAGE_METRIC, elapsed, stage=self.stage)
+        timings = _request_timings.get()
+        if timings is not None:
+            timings.append((self.stage, elapsed))
+        return False
+
+
+def span(stage: str):
+    """Time a pipeline stage. No-op when metrics are disabled."""
+    if not _enabled:
+        return _NULL_SPAN
+    return _Span(stage)
+
+
+@contextmanager
+def request_timings() -> Iterator[List[Tuple[str, float]]]:
+    """
+    Collect the spans recorded during one request.
+
+    The list is shared with worker threads started from this context
+    (e.g. `run_in_threadpool`), since they run in a copy of the context.
+    """
+    timings: List[Tuple[str, float]] = []
+    token = _request_timings.set(timings)
+    try:
+        yield timings
+    finally:
+        _request_timings.reset(token)
+
+
+def format_server_timing(timings: List[Tuple[str, float]]) -> str:
+    """Format timings as a Server-Timing header value (durations in ms)."""
+    return ", ".join(f"{stage};dur={elapsed * 1000:.2f}" for stage, elapsed in timings)
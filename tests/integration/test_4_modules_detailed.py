@@ -292,10 +292,10 @@ try:
     print("-" * 40)
     
     # Split
-    split = plan['split']
-    total_in = int(split['amount_in_total'])
-    ob_in = int(split['amount_in_on_orderbook'])
-    amm_in = int(split['amount_in_on_amm'])
+    split = plan.split
+    total_in = split.amount_in_total
+    ob_in = split.amount_in_on_orderbook
+    amm_in = split.amount_in_on_amm
     
     print(f"SPLIT:")
     print(f"  Total Input:    {total_in / 10**18:.4f} ETH")
@@ -304,12 +304,12 @@ try:
     print()
     
     # Savings
-    amm_ref = int(plan['amm_reference_out'])
-    total_out = int(plan['expected_total_out'])
-    sav_before = int(plan['savings_before_fee'])
-    sav_after = int(plan['savings_after_fee'])
-    perf_fee = int(plan['performance_fee_amount'])
-    min_out = int(plan['min_total_out'])
+    amm_ref = plan.savings.amm_reference_out
+    total_out = plan.savings.expected_total_out
+    sav_before = plan.savings.savings_before_fee
+    sav_after = plan.savings.savings_after_fee
+    perf_fee = plan.savings.performance_fee_amount
+    min_out = plan.savings.min_total_out
     
     print(f"SAVINGS:")
     print(f"  AMM Baseline:       {amm_ref / 10**6:.2f} USDC")
@@ -321,8 +321,8 @@ try:
     print()
     
     # Hook data
-    hook_args = plan['hook_data_args']
-    hook_data = plan['hook_data']
+    hook_args = plan.hook_data_args
+    hook_data = plan.hook_data
     
     print(f"HOOK DATA:")
     print(f"  tokenIn:              {hook_args['tokenIn']}")
@@ -335,14 +335,14 @@ try:
     print()
     
     # Legs
-    print(f"LEGS ({len(plan['legs'])} total):")
-    for i, leg in enumerate(plan['legs'][:3]):  # Show first 3
+    print(f"LEGS ({len(plan.legs)} total):")
+    for i, leg in enumerate(plan.legs[:3]):  # Show first 3
         print(f"  Leg {i+1}:")
-        print(f"    Source:      {leg['source']}")
-        print(f"    Amount In:   {int(leg['amount_in']) / 10**18:.6f} ETH")
-        print(f"    Amount Out:  {int(leg['expected_amount_out']) / 10**6:.2f} USDC")
-        if 'meta' in leg and 'levels_used' in leg['meta']:
-            print(f"    Levels Used: {len(leg['meta']['levels_used'])}")
+        print(f"    Source:      {leg.source}")
+        print(f"    Amount In:   {leg.amount_in / 10**18:.6f} ETH")
+        print(f"    Amount Out:  {leg.expected_amount_out / 10**6:.2f} USDC")
+        if leg.levels_used is not None:
+            print(f"    Levels Used: {len(leg.levels_used)}")
     
     print()
     print("✅ MODULE 4: PASSED - Execution plan builder hoạt động đầy đủ")
@@ -125,35 +125,35 @@ def test_full_pipeline(scenario: str, swap_amount_usdt: int):
     print()
     
     # Split
-    split = execution_plan['split']
+    split = execution_plan.split
     print("📊 SPLIT:")
-    print(f"   Total Input:      {int(split['amount_in_total']) / 10**6:,.2f} USDT")
-    print(f"   → Orderbook:      {int(split['amount_in_on_orderbook']) / 10**6:,.2f} USDT ({pct_ob}%)")
-    print(f"   → AMM:            {int(split['amount_in_on_amm']) / 10**6:,.2f} USDT ({pct_amm}%)")
+    print(f"   Total Input:      {split.amount_in_total / 10**6:,.2f} USDT")
+    print(f"   → Orderbook:      {split.amount_in_on_orderbook / 10**6:,.2f} USDT ({pct_ob}%)")
+    print(f"   → AMM:            {split.amount_in_on_amm / 10**6:,.2f} USDT ({pct_amm}%)")
     print()
     
     # Legs
     print("🔗 LEGS:")
-    for i, leg in enumerate(execution_plan['legs'], 1):
-        print(f"   Leg {i}: {leg['source']}")
+    for i, leg in enumerate(execution_plan.legs, 1):
+        print(f"   Leg {i}: {leg.source}")
         
         # Calculate in human units based on source
-        if leg['source'] == 'internal_orderbook':
-            amt_in = int(leg['amount_in']) / 10**6
-            amt_out = int(leg['expected_amount_out']) / 10**18
+        if leg.source == 'internal_orderbook':
+            amt_in = leg.amount_in / 10**6
+            amt_out = leg.expected_amount_out / 10**18
             print(f"      Amount In:  {amt_in:,.2f} USDT")
             print(f"      Amount Out: {amt_out:.6f} ETH")
             
-            if 'meta' in leg and 'levels_used' in leg['meta']:
-                print(f"      Levels filled: {len(leg['meta']['levels_used'])}")
+            if leg.levels_used is not None:
+                print(f"      Levels filled: {len(leg.levels_used)}")
                 # Print first level detail
-                if len(leg['meta']['levels_used']) > 0:
-                    first_level = leg['meta']['levels_used'][0]
-                    level_price_usdt = Decimal('1') / Decimal(first_level['price'])
+                if len(leg.levels_used) > 0:
+                    first_level = leg.levels_used[0]
+                    level_price_usdt = Decimal('1') / first_level.price
                     print(f"         Best level: {level_price_usdt:.2f} USDT/ETH")
         else:  # AMM
-            amt_in = int(leg['amount_in']) / 10**6
-            amt_out = int(leg['expected_amount_out']) / 10**18
+            amt_in = leg.amount_in / 10**6
+            amt_out = leg.expected_amount_out / 10**18
             print(f"      Amount In:  {amt_in:,.2f} USDT")
             print(f"      Amount Out: {amt_out:.6f} ETH")
             print(f"      AMM Price:  {price_usdt_per_eth:.2f} USDT/ETH")
@@ -161,11 +161,11 @@ def test_full_pipeline(scenario: str, swap_amount_usdt: int):
     
     # Savings
     print("💰 SAVINGS:")
-    amm_ref = int(execution_plan['amm_reference_out']) / 10**18
-    total_out = int(execution_plan['expected_total_out']) / 10**18
-    sav_before = int(execution_plan['savings_before_fee']) / 10**18
-    fee_amt = int(execution_plan['performance_fee_amount']) / 10**18
-    sav_after = int(execution_plan['savings_after_fee']) / 10**18
+    amm_ref = execution_plan.savings.amm_reference_out / 10**18
+    total_out = execution_plan.savings.expected_total_out / 10**18
+    sav_before = execution_plan.savings.savings_before_fee / 10**18
+    fee_amt = execution_plan.savings.performance_fee_amount / 10**18
+    sav_after = execution_plan.savings.savings_after_fee / 10**18
     
     improvement_bps = (sav_after / amm_ref * 10000) if amm_ref > 0 else 0
     
@@ -180,28 +180,28 @@ def test_full_pipeline(scenario: str, swap_amount_usdt: int):
     
     # Slippage protection
     print("🔒 SLIPPAGE PROTECTION:")
-    min_out = int(execution_plan['min_total_out']) / 10**18
+    min_out = execution_plan.savings.min_total_out / 10**18
     print(f"   Min Total Out (1% slippage): {min_out:.6f} ETH")
     print()
     
     # Hook data
     print("📦 HOOK DATA (for smart contract):")
-    hook_args = execution_plan['hook_data_args']
+    hook_args = execution_plan.hook_data_args
     print(f"   tokenIn:  {hook_args['tokenIn'][:10]}...{hook_args['tokenIn'][-4:]}")
     print(f"   tokenOut: {hook_args['tokenOut'][:10]}...{hook_args['tokenOut'][-4:]}")
     print(f"   amountInOnOrderbook: {hook_args['amountInOnOrderbook']}")
     print(f"   maxMatches: {hook_args['maxMatches']}")
     print(f"   slippageLimit: {hook_args['slippageLimit']}")
-    print(f"   Encoded: {execution_plan['hook_data'][:20]}...{execution_plan['hook_data'][-10:]}")
+    print(f"   Encoded: {execution_plan.hook_data[:20]}...{execution_plan.hook_data[-10:]}")
     print()
     
     # Validation checks
     print("✅ VALIDATION CHECKS:")
     
     # Check 1: Split adds up
-    total_in = int(split['amount_in_total'])
-    ob_in = int(split['amount_in_on_orderbook'])
-    amm_in = int(split['amount_in_on_amm'])
+    total_in = split.amount_in_total
+    ob_in = split.amount_in_on_orderbook
+    amm_in = split.amount_in_on_amm
     assert ob_in + amm_in == total_in, "Split doesn't add up!"
     print("   ✅ Split adds up correctly")
     
@@ -225,8 +225,8 @@ def test_full_pipeline(scenario: str, swap_amount_usdt: int):
     print("   ✅ Min output with 1% slippage correct")
     
     # Check 6: Hook data encoded
-    assert execution_plan['hook_data'].startswith('0x'), "Hook data not hex!"
-    assert len(execution_plan['hook_data']) > 20, "Hook data too short!"
+    assert execution_plan.hook_data.startswith('0x'), "Hook data not hex!"
+    assert len(execution_plan.hook_data) > 20, "Hook data too short!"
     print("   ✅ Hook data properly encoded")
     
     print()
@@ -270,11 +270,11 @@ if __name__ == "__main__":
     
     for scenario in ['small', 'medium', 'large']:
         plan = results[scenario]
-        split = plan['split']
+        split = plan.split
         
-        pct_ob = int(split['amount_in_on_orderbook']) * 100 // int(split['amount_in_total'])
-        amm_ref = int(plan['amm_reference_out']) / 10**18
-        sav_after = int(plan['savings_after_fee']) / 10**18
+        pct_ob = split.amount_in_on_orderbook * 100 // split.amount_in_total
+        amm_ref = plan.savings.amm_reference_out / 10**18
+        sav_after = plan.savings.savings_after_fee / 10**18
         improvement = (sav_after / amm_ref * 10000) if amm_ref > 0 else 0
         
         print(f"{scenario.upper():6} | OB: {pct_ob:3}% | Savings: {sav_after:.6f} ETH | Improvement: {improvement:6.2f} bps")
@@ -135,9 +135,9 @@ def test_module1_quoter_integration():
     print()
     
     # Parse results
-    expected_total_out = int(execution_plan['expected_total_out'])
-    savings_before_fee = int(execution_plan['savings_before_fee'])
-    savings_after_fee = int(execution_plan['savings_after_fee'])
+    expected_total_out = execution_plan.savings.expected_total_out
+    savings_before_fee = execution_plan.savings.savings_before_fee
+    savings_after_fee = execution_plan.savings.savings_after_fee
     
     print("📊 AMM BASELINE (Quoter V2 - Real):")
     print(f"   Amount Out: {amm_reference_out / 10**6:.2f} USDC")
@@ -152,7 +152,7 @@ def test_module1_quoter_integration():
     print("💰 SAVINGS:")
     print(f"   Before Fee: {savings_before_fee / 10**6:.2f} USDC ({savings_before_fee * 10000 // amm_reference_out} bps)")
     print(f"   After Fee:  {savings_after_fee / 10**6:.2f} USDC ({savings_after_fee * 10000 // amm_reference_out} bps)")
-    print(f"   Performance Fee (30%): {int(execution_plan['performance_fee_amount']) / 10**6:.2f} USDC")
+    print(f"   Performance Fee (30%): {execution_plan.savings.performance_fee_amount / 10**6:.2f} USDC")
     print()
     
     # Verify
@@ -0,0 +1,70 @@
+"""
+Test BatchMatcher - padded book arrays vs GreedyMatcher per book
+
+Chạy: python -m pytest tests/unit/test_batch_matcher.py -v
+"""
+
+from decimal import Decimal
+
+import numpy as np
+import pytest
+
+from services.matching import BatchMatcher, GreedyMatcher
+from services.orderbook import MonteCarloOrderbookGenerator
+
+
+PRICE = Decimal('2700')
+SIZES = [10 ** 16, 3 * 10 ** 17, 10 ** 18, 2 * 10 ** 18, 5 * 10 ** 18]
+
+
+def _batch(n_books, is_bid, seed=3):
+    return MonteCarloOrderbookGenerator(PRICE, 18, 6, seed=seed).generate_batch(n_books, 10 ** 18, is_bid=is_bid)
+
+
+def test_grid_matches_greedy_matcher():
+    for is_bid in (True, False):
+        batch = _batch(100, is_bid)
+        result = BatchMatcher(PRICE, 18, 6).match(batch, np.array([SIZES]), is_bid)
+        assert result['amount_in_on_orderbook'].shape == (100, len(SIZES))
+
+        matcher = GreedyMatcher(PRICE, 18, 6)
+        _, min_better_price, _, _ = matcher._prepare([], is_bid)
+        for book in range(100):
+            levels = MonteCarloOrderbookGenerator.to_levels(batch, book)
+            better = sum(1 for level in levels if matcher._is_better(level, is_bid, False, min_better_price, None))
+            assert result['levels_better_than_amm'][book, 0] == better
+            for s, size in enumerate(SIZES):
+                ref = matcher.match(levels, size, is_bid)
+                assert result['amount_in_on_orderbook'][book, s] == pytest.approx(ref['amount_in_on_orderbook'], rel=1e-12)
+                assert result['amount_out_from_orderbook'][book, s] == pytest.approx(ref['amount_out_from_orderbook'], abs=1)
+                assert result['levels_used'][book, s] == len(ref['levels_used'])
+
+
+def test_unsorted_books_and_max_matches():
+    batch = _batch(200, True)
+    # Reverse the level axis; the matcher re-sorts best first
+    shuffled = {key: batch[key][:, ::-1] for key in ('prices', 'amounts_in', 'amounts_out', 'mask')}
+    sizes = np.full(200, 5 * 10 ** 18)
+    matcher = BatchMatcher(PRICE, 18, 6)
+    expected = matcher.match(batch, sizes, True)
+    result = matcher.match(shuffled, sizes, True)
+    assert np.array_equal(result['expected_total_out'], expected['expected_total_out'])
+    assert np.all(result['amount_in_on_orderbook'] + result['amount_in_on_amm'] == sizes)
+    assert np.all(result['savings_before_fee'] >= 0)
+
+    capped = BatchMatcher(PRICE, 18, 6, max_matches=2).match(batch, sizes, True)
+    assert capped['levels_used'].max() <= 2
+    assert np.all(capped['amount_in_on_orderbook'] <= expected['amount_in_on_orderbook'])
+
+
+def test_savings_clamped_like_plan_builder():
+    # Within ob_min_improve_bps of the AMM but worse than it: used, yet loses vs 100% AMM
+    book = {
+        'prices': np.array([[2699.5]]),
+        'amounts_in': np.array([[1e18]]),
+        'amounts_out': np.array([[2699.5e6]]),
+    }
+    result = BatchMatcher(PRICE, 18, 6, ob_min_improve_bps=5).match(book, 10 ** 18, True)
+    assert result['amount_in_on_orderbook'][0] == 1e18
+    assert result['expected_total_out'][0] < result['amm_reference_out'][0]
+    assert result['savings_before_fee'][0] == 0
@@ -0,0 +1,125 @@
+"""
+Test ExecutionPlan model - typed plan (ints) and its JSON shape
+
+Chạy: python -m pytest tests/unit/test_execution_plan.py -v
+"""
+
+from decimal import Decimal
+
+import orjson
+
+from api.schemas import ExecutionPlanResponse
+from api.serialization import dumps_plan
+from services.execution.core import (
+    ExecutionLeg,
+    ExecutionPlan,
+    ExecutionPlanBuilder,
+    MatchingResult,
+    calculate_savings,
+    decode_hook_data,
+    format_savings_summary,
+)
+from services.matching import GreedyMatcher
+from services.orderbook import SyntheticOrderbookGenerator
+
+
+PRICE = Decimal('2700')
+WETH = "0x4200000000000000000000000000000000000006"
+USDC = "0x833589fcd6edb6e08f4c7c32d4f71b54bda02913"
+
+
+def _plan(swap_amount=10 ** 18, scenario='medium'):
+    levels = SyntheticOrderbookGenerator(PRICE, 18, 6).generate(scenario, swap_amount, is_bid=True)
+    match_result = GreedyMatcher(PRICE, 18, 6, ob_min_improve_bps=0).match(levels, swap_amount, is_bid=True)
+    builder = ExecutionPlanBuilder(PRICE, 18, 6, performance_fee_bps=3000, max_slippage_bps=100)
+    return builder.build_plan(match_result, WETH, USDC), match_result
+
+
+def test_plan_keeps_ints():
+    plan, match_result = _plan()
+    assert isinstance(plan, ExecutionPlan)
+    assert plan.split.amount_in_total == 10 ** 18
+    assert plan.split.amount_in_on_orderbook == match_result['amount_in_on_orderbook']
+    assert plan.hook_data_args['amountInOnOrderbook'] == match_result['amount_in_on_orderbook']
+    assert decode_hook_data(plan.hook_data)['amountInOnOrderbook'] == match_result['amount_in_on_orderbook']
+
+    savings = plan.savings
+    assert savings.expected_total_out == sum(leg.expected_amount_out for leg in plan.legs)
+    assert savings.savings_before_fee == savings.expected_total_out - savings.amm_reference_out
+    assert savings.performance_fee_amount == savings.savings_before_fee * 3000 // 10000
+    assert savings.min_total_out == savings.amm_reference_out * 9900 // 10000
+    assert savings.savings_before_fee > 0
+    assert plan.gas is None
+
+
+def test_to_dict_matches_response_schema():
+    plan, _ = _plan()
+    plan.metadata = {
+        "chain_id": 8453, "pool_address": "0x0", "fee": 3000, "receiver": "0x0", "scenario": "medium",
+        "tick_aligned": False, "decimals_in": 18, "decimals_out": 6, "block_number": 1, "amm_model": "spot",
+    }
+    body = plan.to_dict()
+    ExecutionPlanResponse.model_validate(body)
+
+    decoded = orjson.loads(dumps_plan(body))
+    assert decoded['split']['amount_in_total'] == str(10 ** 18)
+    assert decoded['hook_data_args']['amountInOnOrderbook'] == str(plan.split.amount_in_on_orderbook)
+    assert decoded['savings_after_fee'] == str(plan.savings.savings_after_fee)
+    orderbook_leg = decoded['legs'][0]
+    assert orderbook_leg['source'] == 'internal_orderbook'
+    assert len(orderbook_leg['meta']['levels_used']) == len(plan.legs[0].levels_used)
+    # The model is not modified by serialization
+    assert plan.hook_data_args['amountInOnOrderbook'] == plan.split.amount_in_on_orderbook
+
+
+def test_calculate_savings_returns_savings_data():
+    legs = [ExecutionLeg('kyber', "0x0", "0x", 0, 10 ** 17, 300_000_000)]
+    matching_result = MatchingResult(
+        legs=legs, remaining_in=9 * 10 ** 17, kyber_amount=10 ** 17,
+        amm_amount=9 * 10 ** 17, total_out_from_matching=300_000_000
+    )
+    savings = calculate_savings(
+        10 ** 18, 2_700_000_000, matching_result, amm_out_for_remaining=2_430_000_000, performance_fee_bps=3000
+    )
+    assert savings.expected_total_out == 2_730_000_000
+    assert savings.savings_before_fee == 30_000_000
+    assert savings.performance_fee_amount == 9_000_000
+    assert savings.savings_after_fee == 21_000_000
+    assert savings.min_total_out == 2_673_000_000
+    assert "21,000,000" in format_savings_summary(savings)
+
+
+def test_amm_leg_carries_swap_router_call():
+    from eth_abi import decode
+
+    from services.amm_uniswap_v3.swap_router import (
+        EXACT_INPUT_SINGLE_SELECTOR,
+        MULTICALL_SELECTOR,
+        SWAP_ROUTER02_ADDRESS,
+    )
+
+    plan, _ = _plan(scenario='small')  # book covers half the swap: AMM leg
+    pool, receiver = "0x6c561B446416E1A00E8E93E221854d6eA4171372", "0x" + "12" * 20
+    with_call = ExecutionPlanBuilder.with_amm_call(plan, SWAP_ROUTER02_ADDRESS, pool, 3000, receiver, 1_700_000_000)
+
+    amm_leg = plan.legs[-1]
+    assert amm_leg.source == 'amm' and amm_leg.calldata is None  # cached plan untouched
+    assert amm_leg.min_amount_out == amm_leg.expected_amount_out * 9900 // 10000
+    leg = with_call.legs[-1]
+    assert leg.to == SWAP_ROUTER02_ADDRESS and leg.deadline == 1_700_000_000
+    assert with_call.legs[0] is plan.legs[0] and with_call.savings is plan.savings
+
+    calldata = bytes.fromhex(leg.calldata[2:])
+    assert calldata[:4] == MULTICALL_SELECTOR
+    deadline, (swap,) = decode(["uint256", "bytes[]"], calldata[4:])
+    assert deadline == 1_700_000_000 and swap[:4] == EXACT_INPUT_SINGLE_SELECTOR
+    params = decode(["(address,address,uint24,address,uint256,uint256,uint160)"], swap[4:])[0]
+    assert params == (WETH, USDC, 3000, receiver, amm_leg.amount_in, amm_leg.min_amount_out, 0)
+
+    body = with_call.to_dict()
+    body['metadata'] = {
+        "chain_id": 8453, "pool_address": pool, "fee": 3000, "receiver": receiver, "scenario": "medium",
+        "tick_aligned": False, "decimals_in": 18, "decimals_out": 6, "block_number": 1, "amm_model": "spot",
+    }
+    ExecutionPlanResponse.model_validate(body)
+    assert body['legs'][-1]['calldata'] == leg.calldata and body['legs'][-1]['to'] == SWAP_ROUTER02_ADDRESS
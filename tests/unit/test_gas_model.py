@@ -0,0 +1,99 @@
+"""
+Test GasCostModel + gas-aware GreedyMatcher
+
+Chạy: python -m pytest tests/unit/test_gas_model.py -v
+"""
+
+from decimal import Decimal
+
+from services.matching import GasCostModel, GreedyMatcher
+from services.orderbook import OrderbookLevel, level_amount_out
+
+
+PRICE = Decimal('2700')  # USDC per ETH
+
+
+def _model(gas_price_wei, **kwargs):
+    return GasCostModel(gas_price_wei=gas_price_wei, out_per_native=PRICE, decimals_out=6, **kwargs)
+
+
+def test_cost_out():
+    model = _model(10 ** 9)  # 1 gwei
+    assert model.amm_gas(0) == 110_000
+    assert model.amm_gas(2) == 160_000
+    assert model.orderbook_gas(0) == 0
+    assert model.orderbook_gas(3) == 60_000 + 3 * 45_000
+    # 100k gas × 1 gwei = 1e-4 ETH = 0.27 USDC
+    assert model.cost_out(100_000) == 270_000
+    # Rounded up
+    assert _model(1).cost_out(1) == 1
+
+
+def _levels(bps_list, amount_in):
+    # Levels above the AMM price (BID side): better by `bps`
+    levels = []
+    for bps in bps_list:
+        price = PRICE * (1 + Decimal(bps) / 10000)
+        levels.append(OrderbookLevel(price, amount_in, level_amount_out(amount_in, price, 18, 6)))
+    return levels
+
+
+def _matcher(gas_model, max_matches=None):
+    return GreedyMatcher(
+        price_amm=PRICE, decimals_in=18, decimals_out=6, ob_min_improve_bps=0,
+        gas_model=gas_model, max_matches=max_matches
+    )
+
+
+def test_no_gas_model_unchanged():
+    levels = _levels([20, 10], 10 ** 17)
+    result = _matcher(None).match(levels, 10 ** 18, is_bid=True)
+    assert result['amount_in_on_orderbook'] == 2 * 10 ** 17
+    assert result['gas'] is None
+
+
+def test_small_swap_skips_orderbook_when_gas_eats_improvement():
+    # 0.01 ETH, 10 bps better = 0.027 USDC; hook gas (105k) costs ≈ 0.0003 USDC
+    # at 0.001 gwei, ≈ 0.28 USDC at 1 gwei. The AMM base gas is paid either way.
+    swap = 10 ** 16
+    levels = _levels([10], swap)
+
+    cheap = _matcher(_model(10 ** 6)).match(levels, swap, is_bid=True)
+    assert cheap['amount_in_on_orderbook'] == swap
+    assert cheap['gas']['orderbook_matches'] == 1
+
+    expensive = _matcher(_model(10 ** 9)).match(levels, swap, is_bid=True)
+    assert expensive['amount_in_on_orderbook'] == 0
+    assert expensive['amount_in_on_amm'] == swap
+    assert expensive['levels_used'] == []
+    assert expensive['gas']['orderbook_matches'] == 0
+    assert expensive['gas']['gas_cost_out'] == expensive['gas']['amm_only_gas_cost_out']
+
+
+def test_drops_marginal_levels_and_respects_max_matches():
+    # Level 2 improves by only 1 bps on 0.1 ETH = 0.027 USDC < its 45k gas at 1 gwei (0.12 USDC)
+    levels = _levels([50, 1], 10 ** 17)
+    result = _matcher(_model(10 ** 9)).match(levels, 10 ** 18, is_bid=True)
+    assert result['gas']['orderbook_matches'] == 1
+    assert result['amount_in_on_orderbook'] == 10 ** 17
+    assert result['amount_in_on_amm'] == 9 * 10 ** 17
+
+    levels = _levels([50, 40, 30], 10 ** 17)
+    result = _matcher(_model(1), max_matches=2).match(levels, 10 ** 18, is_bid=True)
+    assert result['gas']['orderbook_matches'] == 2
+    assert len(result['levels_used']) == 2
+
+
+def test_amm_swap_ticks_add_gas():
+    swap = 10 ** 18
+    levels = _levels([5], 5 * 10 ** 17)
+    # AMM crossing many ticks for the full amount, none for half
+    amm_swap = lambda amount_in: (int(Decimal(amount_in) * PRICE / 10 ** 12), 40 if amount_in > 6 * 10 ** 17 else 0)
+    matcher = GreedyMatcher(
+        price_amm=PRICE, decimals_in=18, decimals_out=6, ob_min_improve_bps=0,
+        gas_model=_model(10 ** 8), amm_swap=amm_swap
+    )
+    result = matcher.match(levels, swap, is_bid=True)
+    assert result['gas']['orderbook_matches'] == 1
+    assert result['gas']['amm_ticks_crossed'] == 0
+    assert result['gas']['amm_only_gas_cost_out'] == _model(10 ** 8).cost_out(110_000 + 40 * 25_000)
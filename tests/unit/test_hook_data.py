@@ -0,0 +1,106 @@
+"""
+Test hook_data codec - byte-identical to eth_abi, decode round-trip, range checks
+
+Chạy: python -m pytest tests/unit/test_hook_data.py -v
+"""
+
+import random
+
+import pytest
+from eth_abi import decode, encode
+
+from services.execution.core.hook_data import (
+    HOOK_DATA_FIELDS,
+    HookDataCodec,
+    HookField,
+    decode_hook_data,
+    encode_hook_data,
+)
+
+
+WETH = "0x4200000000000000000000000000000000000006"
+USDC = "0x833589fCD6eDb6E08f4c7C32D4f71b54bdA02913"
+
+
+def _args(amount=10 ** 18, max_matches=8, slippage=200, token_in=WETH, token_out=USDC):
+    return {
+        "tokenIn": token_in,
+        "tokenOut": token_out,
+        "amountInOnOrderbook": str(amount),
+        "maxMatches": max_matches,
+        "slippageLimit": slippage,
+    }
+
+
+def _eth_abi(args):
+    return encode(
+        ["address", "address", "uint256", "uint32", "uint32"],
+        [args["tokenIn"], args["tokenOut"], int(args["amountInOnOrderbook"]), args["maxMatches"], args["slippageLimit"]],
+    )
+
+
+def test_matches_eth_abi():
+    rng = random.Random(41)
+    for _ in range(200):
+        args = _args(
+            amount=rng.randrange(1 << 256),
+            max_matches=rng.randrange(1 << 32),
+            slippage=rng.randrange(1 << 32),
+            token_in="0x" + rng.randbytes(20).hex(),
+        )
+        hook_data = encode_hook_data(args)
+        assert hook_data == "0x" + _eth_abi(args).hex()
+        assert len(hook_data) == 2 + 2 * 160
+
+
+def test_decode_round_trip():
+    args = _args()
+    decoded = decode_hook_data(encode_hook_data(args))
+    assert decoded == {
+        "tokenIn": WETH.lower(),
+        "tokenOut": USDC.lower(),
+        "amountInOnOrderbook": 10 ** 18,
+        "maxMatches": 8,
+        "slippageLimit": 200,
+    }
+    expected = decode(["address", "address", "uint256", "uint32", "uint32"], _eth_abi(args))
+    assert tuple(decoded.values()) == expected
+
+    codec = HookDataCodec()
+    assert codec.decode_many([encode_hook_data(args)] * 3) == [decoded] * 3
+
+
+def test_range_and_layout_errors():
+    with pytest.raises(ValueError):
+        encode_hook_data(_args(max_matches=1 << 32))
+    with pytest.raises(ValueError):
+        encode_hook_data(_args(amount=-1))
+    with pytest.raises(ValueError):
+        encode_hook_data(_args(token_in="0x1234"))
+
+    good = bytes.fromhex(encode_hook_data(_args())[2:])
+    with pytest.raises(ValueError):
+        decode_hook_data(good[:-32])
+    bad_padding = bytearray(good)
+    bad_padding[0] = 1
+    with pytest.raises(ValueError):
+        decode_hook_data(bytes(bad_padding))
+    bad_uint32 = bytearray(good)
+    bad_uint32[96 + 27] = 1  # bit above uint32 in maxMatches
+    with pytest.raises(ValueError):
+        decode_hook_data(bytes(bad_uint32))
+
+
+def test_extended_schema():
+    codec = HookDataCodec(HOOK_DATA_FIELDS + (HookField("deadline", "uint64"), HookField("minOut", "int128")))
+    args = dict(_args(), deadline=1_700_000_000, minOut=-5)
+    data = codec.encode(args)
+    assert codec.size == 224
+    assert data == encode(codec.abi_types, [
+        args["tokenIn"], args["tokenOut"], int(args["amountInOnOrderbook"]),
+        args["maxMatches"], args["slippageLimit"], args["deadline"], args["minOut"],
+    ])
+    assert codec.decode(data)["minOut"] == -5
+
+    with pytest.raises(ValueError):
+        HookDataCodec((HookField("path", "bytes"),))
@@ -0,0 +1,169 @@
+"""
+Test L2Book / CEX depth ingestion - snapshot + diffs, sequence gaps, replay
+
+Chạy: python -m pytest tests/unit/test_l2_book.py -v
+"""
+
+import asyncio
+from decimal import Decimal
+
+import orjson
+import pytest
+
+from services.execution.ui import VirtualOrderBook
+from services.market_data import (
+    L2Book,
+    SequenceGapError,
+    ReplayServer,
+    ingest,
+    ingest_async,
+    parse_message,
+    read_recorded,
+    stream_replay,
+)
+from services.orderbook import SyntheticOrderbookGenerator
+
+
+def _snapshot(seq, bids, asks):
+    return {"type": "snapshot", "seq": seq, "bids": bids, "asks": asks}
+
+
+def _diff(first_seq, seq, bids=(), asks=()):
+    return {"type": "diff", "first_seq": first_seq, "seq": seq, "bids": list(bids), "asks": list(asks)}
+
+
+def _book():
+    book = L2Book("ETHUSDT")
+    book.apply(parse_message(_snapshot(
+        100,
+        [["2699.5", "3.0"], ["2699.0", "5.0"], ["2690.0", "8.0"]],
+        [["2700.5", "2.0"], ["2701.0", "4.0"], ["2710.0", "9.0"]],
+    )))
+    return book
+
+
+def test_snapshot_and_diffs():
+    book = _book()
+    assert book.best_bid() == 2699.5
+    assert book.best_ask() == 2700.5
+    assert book.mid_price() == 2700.0
+
+    book.apply(parse_message(_diff(101, 102, bids=[["2699.5", "0"], ["2699.8", "1.5"]], asks=[["2701.0", "6.5"]])))
+    assert book.seq == 102
+    assert book.best_bid() == 2699.8
+    assert [lvl["price"] for lvl in book.bid_levels()] == [2699.8, 2699.0, 2690.0]
+    assert book.asks[2701.0]["size"] == 6.5
+
+    # Stale diff (already covered) is ignored
+    assert book.apply(parse_message(_diff(95, 102, bids=[["2000", "1"]]))) is False
+    assert 2000.0 not in book.bids
+
+
+def test_view_is_shared_until_levels_change():
+    book = _book()
+    view = book.cex_snapshot()
+    level = book.asks[2700.5]
+
+    book.apply(parse_message(_diff(101, 101, asks=[["2700.5", "7.0"]])))
+    assert book.cex_snapshot() is view  # size update: same list, same level dicts
+    assert level["size"] == 7.0
+
+    book.apply(parse_message(_diff(102, 102, asks=[["2700.2", "1.0"]])))
+    assert book.cex_snapshot() is not view
+    assert book.best_ask() == 2700.2
+
+
+def test_gap_unsyncs_and_next_snapshot_replays_buffered_diffs():
+    book = _book()
+    with pytest.raises(SequenceGapError):
+        book.apply(parse_message(_diff(105, 106, bids=[["2699.9", "1.0"]])))
+    assert not book.synced and book.gaps == 1
+
+    # Buffered while unsynced
+    assert book.apply(parse_message(_diff(107, 107, bids=[["2699.95", "2.0"]]))) is False
+
+    # Snapshot at 105: diff 105-106 partially covered (applied), 107 follows
+    book.apply(parse_message(_snapshot(105, [["2699.5", "3.0"]], [["2700.5", "2.0"]])))
+    assert book.synced and book.seq == 107
+    assert book.best_bid() == 2699.95
+    assert book.bids[2699.9]["size"] == 1.0
+
+
+def test_ingest_resync_callback():
+    book = _book()
+    messages = [
+        parse_message(_diff(101, 101, bids=[["2699.6", "1"]])),
+        parse_message(_diff(110, 111, bids=[["2699.7", "1"]])),  # gap
+        parse_message(_diff(112, 112, bids=[["2699.8", "1"]])),
+    ]
+    resync = lambda: _snapshot(110, [["2699.0", "1"]], [["2700.5", "1"]])
+    assert ingest(book, messages, resync=resync) == 3
+    assert book.synced and book.seq == 112
+    assert book.best_bid() == 2699.8
+    assert 2699.7 in book.bids
+
+
+def test_parse_binance_messages():
+    snap = parse_message({"lastUpdateId": 10, "bids": [["1.0", "2.0"]], "asks": [["1.1", "3.0"]]})
+    assert snap["type"] == "snapshot" and snap["seq"] == 10
+    diff = parse_message({"stream": "ethusdt@depth", "data": {"e": "depthUpdate", "U": 11, "u": 13, "b": [], "a": [["1.1", "0"]]}})
+    assert diff == {"type": "diff", "first_seq": 11, "seq": 13, "bids": [], "asks": [["1.1", "0"]]}
+
+
+def _write_recording(path):
+    lines = [
+        {"U": 99, "u": 100, "b": [], "a": []},  # before the snapshot: stale
+        {"lastUpdateId": 100, "bids": [["2699.5", "3.0"]], "asks": [["2700.5", "2.0"]]},
+    ]
+    lines += [{"U": seq, "u": seq, "b": [[f"{2600 + seq % 50}.0", "1.0"]], "a": []} for seq in range(101, 1101)]
+    path.write_bytes(b"\n".join(orjson.dumps(line) for line in lines) + b"\n")
+
+
+def test_read_recorded(tmp_path):
+    path = tmp_path / "depth.jsonl"
+    _write_recording(path)
+    book = L2Book()
+    assert ingest(book, read_recorded(path)) == 1002
+    assert book.seq == 1100 and book.synced
+    assert len(book.bids) == 51
+
+
+def test_replay_server_roundtrip(tmp_path):
+    path = tmp_path / "depth.jsonl"
+    _write_recording(path)
+
+    async def run():
+        server = ReplayServer(path)
+        host, port = await server.start()
+        book = L2Book()
+        try:
+            count = await ingest_async(book, stream_replay(host, port))
+        finally:
+            await server.close()
+        return book, count
+
+    book, count = asyncio.run(run())
+    assert count == 1002
+    assert book.seq == 1100
+
+
+def test_shape_feeds_orderbook_builders():
+    book = _book()
+
+    vob = VirtualOrderBook(mid_price=2700.0)
+    orderbook = vob.build_orderbook(
+        swap_amount=1.0, scenario='large', capital_usd=100_000, cex_snapshot=book.cex_snapshot()
+    )
+    assert orderbook['best_bid']['price'] == 2699.5
+    assert orderbook['best_ask']['price'] == 2700.5
+
+    generator = SyntheticOrderbookGenerator(Decimal('2700'), 18, 6)
+    swap_amount = 10 ** 18
+    levels = generator.generate('large', swap_amount, is_bid=False, cex_levels=book.cex_snapshot())
+    # Shape of the CEX bids: 3 levels, best first, below mid, sized to 2.5x swap
+    assert len(levels) == 3
+    assert levels[0].price > levels[1].price > levels[2].price
+    assert levels[0].price < Decimal('2700')
+    total = sum(level.amount_in_available for level in levels)
+    assert abs(total - int(swap_amount * 2.5)) <= 3
+    assert levels[2].amount_in_available > levels[0].amount_in_available  # 8 @ 2690 > 3 @ 2699.5
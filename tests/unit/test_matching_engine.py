@@ -0,0 +1,105 @@
+"""
+Test MatchingEngine - price-time priority, partial fills, cancels, hook-style swaps
+
+Chạy: python -m pytest tests/unit/test_matching_engine.py -v
+"""
+
+from decimal import Decimal
+
+import pytest
+
+from services.matching import MatchingEngine
+
+
+def test_price_time_priority_and_partial_fills():
+    engine = MatchingEngine()
+    first = engine.submit_limit(False, 101, 30, owner="a")
+    second = engine.submit_limit(False, 101, 50, owner="b")
+    better = engine.submit_limit(False, 100, 10, owner="c")
+    engine.submit_limit(True, 99, 40, owner="d")  # does not cross
+
+    taker = engine.submit_limit(True, 101, 60, owner="t")
+    assert [(t.maker_order_id, t.price, t.amount) for t in engine.trades] == [
+        (better.order_id, 100, 10), (first.order_id, 101, 30), (second.order_id, 101, 20)
+    ]
+    assert taker.remaining == 0 and taker.order_id not in engine.orders
+    assert second.remaining == 30 and first.order_id not in engine.orders
+    assert engine.best_ask() == 101 and engine.best_bid() == 99
+    assert engine.depth(False) == [(101, 30)]
+
+    # Unfilled rest of a crossing order rests at its limit price
+    rest = engine.submit_limit(True, 102, 50)
+    assert rest.remaining == 20 and engine.best_bid() == 102 and engine.best_ask() is None
+
+
+def test_cancel():
+    engine = MatchingEngine()
+    first = engine.submit_limit(True, Decimal('2699'), 10)
+    second = engine.submit_limit(True, Decimal('2699'), 20)
+    assert engine.cancel(first.order_id) and not engine.cancel(first.order_id)
+    assert engine.depth(True) == [(Decimal('2699'), 20)]
+
+    fills = engine.swap(True, 15)  # sell 15 base into the bids
+    assert [(t.maker_order_id, t.amount) for t in fills] == [(second.order_id, 15)]
+    assert fills[0].quote_amount == 15 * 2699 and not fills[0].taker_buys_base
+    assert engine.cancel(second.order_id) and engine.best_bid() is None
+    assert not engine.cancel(12345)
+    with pytest.raises(ValueError):
+        engine.submit_limit(True, 1, 0)
+
+
+def test_swap_max_matches_and_slippage_limit():
+    engine = MatchingEngine()
+    for price in (1000, 1000, 1001, 1005, 1030):
+        engine.submit_limit(False, price, 10)
+
+    # is_bid=False: tokenIn is quote, spent on the asks
+    fills = engine.swap(False, 10**6, max_matches=3)
+    assert [t.price for t in fills] == [1000, 1000, 1001]
+    assert sum(t.quote_amount for t in fills) == 30010
+    assert engine.best_ask() == 1005
+
+    # 1005 * 1.002 = 1007.01: 1030 is beyond slippageLimit, so only 1005 fills
+    fills = engine.swap(False, 10**6, max_matches=8, slippage_limit_bps=20)
+    assert [(t.price, t.amount) for t in fills] == [(1005, 10)]
+    assert engine.depth(False) == [(1030, 10)]
+    assert engine.swap(True, 5) == []  # no bids
+
+
+def test_swap_exact_quote_input_with_decimals():
+    engine = MatchingEngine(decimals_base=18, decimals_quote=6)
+    engine.submit_limit(False, Decimal('2700'), 10**18)
+    engine.submit_limit(False, Decimal('2701.5'), 10**18)
+
+    # 4000 USDC in: 1 ETH at 2700, the remaining 1300 USDC at 2701.5
+    fills = engine.swap(False, 4000 * 10**6)
+    assert [t.price for t in fills] == [Decimal('2700'), Decimal('2701.5')]
+    assert fills[0].amount == 10**18 and fills[0].quote_amount == 2700 * 10**6
+    assert fills[1].amount == 1300 * 10**18 * 10**6 // (27015 * 10**5)
+    assert all(t.taker_buys_base for t in fills)
+    # Never more quote than amount_in, and the maker is paid at least its price
+    spent = sum(t.quote_amount for t in fills)
+    assert 4000 * 10**6 - 1 <= spent <= 4000 * 10**6
+    assert fills[1].quote_amount * 10**12 * 10 >= fills[1].amount * 27015
+
+    # Too little quote for one raw unit of base fills nothing
+    whole_units = MatchingEngine()
+    whole_units.submit_limit(False, 1000, 5)
+    assert whole_units.swap(False, 999) == [] and whole_units.depth(False) == [(1000, 5)]
+
+
+def test_heap_and_queues_stay_bounded_under_post_cancel_churn():
+    engine = MatchingEngine()
+    resting = engine.submit_limit(True, 50, 1)
+    for i in range(200_000):
+        order = engine.submit_limit(True, 100 + i % 500, 1)
+        engine.cancel(order.order_id)
+    assert engine.best_bid() == 50
+    assert len(engine.bids.levels) == 1 and len(engine.bids._heap) <= 2 * 1 + 16
+
+    # Cancels inside a level that stays alive are compacted out of its queue
+    for _ in range(10_000):
+        engine.cancel(engine.submit_limit(True, 50, 1).order_id)
+    assert len(engine.bids.levels[50].queue) <= 2 * 1 + 8
+    assert [t.maker_order_id for t in engine.swap(True, 5)] == [resting.order_id]
+
@@ -0,0 +1,53 @@
+"""
+Test MonteCarloOrderbookGenerator - seeded, vectorized book batches
+
+Chạy: python -m pytest tests/unit/test_monte_carlo_orderbook.py -v
+"""
+
+from decimal import Decimal
+
+import numpy as np
+
+from services.matching import GreedyMatcher
+from services.orderbook import Distribution, MonteCarloConfig, MonteCarloOrderbookGenerator
+
+
+PRICE = Decimal('2700')
+SWAP = 10 ** 18
+
+
+def test_same_seed_same_books():
+    first = MonteCarloOrderbookGenerator(PRICE, 18, 6, seed=42).generate_batch(500, SWAP, is_bid=True)
+    second = MonteCarloOrderbookGenerator(PRICE, 18, 6, seed=42).generate_batch(500, SWAP, is_bid=True)
+    other = MonteCarloOrderbookGenerator(PRICE, 18, 6, seed=43).generate_batch(500, SWAP, is_bid=True)
+    for key in first:
+        assert np.array_equal(first[key], second[key])
+    assert not np.array_equal(first['prices'], other['prices'])
+
+
+def test_batch_shape_and_orientation():
+    config = MonteCarloConfig(num_levels=Distribution("randint", 2, 6), max_levels=8)
+    mc = MonteCarloOrderbookGenerator(PRICE, 18, 6, config=config, seed=1)
+    for is_bid in (True, False):
+        batch = mc.generate_batch(1000, SWAP, is_bid=is_bid)
+        assert batch['prices'].shape == (1000, 8)
+        assert np.array_equal(batch['mask'].sum(axis=1), batch['num_levels'])
+        assert batch['num_levels'].min() >= 2 and batch['num_levels'].max() <= 6
+
+        valid = batch['prices'][batch['mask']]
+        assert np.all(valid > float(PRICE)) if is_bid else np.all(valid < float(PRICE))
+        assert np.all(batch['amounts_in'][~batch['mask']] == 0)
+        # Total depth ≈ depth_multiplier × swap (floored per level)
+        total = batch['amounts_in'].sum(axis=1)
+        assert np.allclose(total, batch['depth_multiplier'] * SWAP, rtol=1e-9)
+
+
+def test_books_feed_greedy_matcher():
+    mc = MonteCarloOrderbookGenerator(PRICE, 18, 6, seed=7)
+    batch = mc.generate_batch(50, SWAP, is_bid=True)
+    matcher = GreedyMatcher(PRICE, 18, 6)
+    for book in range(50):
+        levels = mc.to_levels(batch, book)
+        assert len(levels) == batch['num_levels'][book]
+        result = matcher.match(levels, SWAP, True)
+        assert result['amount_in_on_orderbook'] <= min(SWAP, sum(level.amount_in_available for level in levels))
@@ -0,0 +1,29 @@
+"""
+Test Multicall3 aggregate3 encoding / decoding
+
+Chạy: python -m pytest tests/unit/test_multicall.py -v
+"""
+
+from eth_abi import decode, encode
+
+from services.amm_uniswap_v3.multicall import Call, encode_aggregate3, decode_aggregate3
+
+POOL = "0xcE1d8c90A5F0ef28fe0F457e5Ad615215899319a"
+
+
+def test_encode_aggregate3_packs_calls():
+    calls = [Call(POOL, "slot0()", ("uint160", "int24")), Call(POOL, "ticks(int24)", ("uint128",), (-60,))]
+    data = encode_aggregate3(calls)
+
+    assert data[:4].hex() == "82ad56cb"
+    (packed,) = decode(["(address,bool,bytes)[]"], data[4:])
+    assert packed[0][2].hex() == "3850c7bd"
+    assert packed[1][1] is True
+    assert packed[1][2][4:] == encode(["int24"], [-60])
+
+
+def test_decode_aggregate3_marks_failed_calls_none():
+    calls = [Call(POOL, "liquidity()", ("uint128",)), Call(POOL, "fee()", ("uint24",))]
+    raw = encode(["(bool,bytes)[]"], [[(True, encode(["uint128"], [123])), (False, b"")]])
+
+    assert decode_aggregate3(calls, raw) == [(123,), None]
@@ -0,0 +1,70 @@
+"""
+Test PlanCache - LRU eviction, single-flight deduplication, error handling
+
+Chạy: python -m pytest tests/unit/test_plan_cache.py -v
+"""
+
+import asyncio
+
+import pytest
+
+from api.plan_cache import PlanCache
+
+
+def test_lru_eviction():
+    cache = PlanCache(max_entries=2)
+
+    async def run():
+        for key in ["a", "b", "a", "c"]:
+            await cache.get_or_compute(key, lambda k=key: _value(k))
+
+    asyncio.run(run())
+
+    # "b" was least recently used when "c" arrived
+    assert list(cache._entries) == ["a", "c"]
+    assert cache.hits == 1
+    assert cache.misses == 3
+
+
+def test_single_flight_deduplicates_concurrent_requests():
+    cache = PlanCache(max_entries=8)
+    calls = []
+
+    async def compute():
+        calls.append(1)
+        await asyncio.sleep(0.01)
+        return {"plan": 1}
+
+    async def run():
+        return await asyncio.gather(*[
+            cache.get_or_compute(("pair", 100, 1), compute) for _ in range(5)
+        ])
+
+    results = asyncio.run(run())
+
+    assert len(calls) == 1
+    assert all(r is results[0] for r in results)
+    assert cache.coalesced == 4
+
+
+def test_errors_are_not_cached():
+    cache = PlanCache(max_entries=8)
+    attempts = []
+
+    async def failing():
+        attempts.append(1)
+        raise RuntimeError("rpc down")
+
+    async def run():
+        for _ in range(2):
+            with pytest.raises(RuntimeError):
+                await cache.get_or_compute("key", failing)
+
+    asyncio.run(run())
+
+    assert len(attempts) == 2
+    assert cache.stats()["entries"] == 0
+
+
+async def _value(key):
+    return key
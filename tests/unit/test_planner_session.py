@@ -0,0 +1,90 @@
+"""
+Test PlannerSession - incremental re-planning vs GreedyMatcher / ExecutionPlanBuilder
+
+Chạy: python -m pytest tests/unit/test_planner_session.py -v
+"""
+
+from decimal import Decimal
+
+from services.execution.core import ExecutionPlanBuilder
+from services.matching import GasCostModel, GreedyMatcher, PlannerSession
+from services.orderbook import OrderbookLevel, SyntheticOrderbookGenerator, swap_tick_price
+
+
+PRICE = Decimal('2700')
+WETH = "0x4200000000000000000000000000000000000006"
+USDC = "0x833589fcd6edb6e08f4c7c32d4f71b54bda02913"
+
+
+def _amounts(depth):
+    # Below, on and above every boundary, plus the whole range
+    amounts = {1, depth, depth - 1, depth + 1, 3 * depth}
+    amounts.update(depth * i // 37 for i in range(1, 37))
+    return sorted(amounts)
+
+
+def _assert_same(session, matcher, levels, is_bid, amounts):
+    for amount in amounts:
+        assert session.match(amount) == matcher.match(levels, amount, is_bid), amount
+
+
+def test_match_equals_greedy_matcher():
+    generator = SyntheticOrderbookGenerator(PRICE, 18, 6)
+    levels = generator.generate('medium', 10 ** 18, is_bid=True)
+    # A level with nothing left and a level worse than the AMM
+    levels.append(OrderbookLevel(PRICE * Decimal('1.0005'), 0, 0))
+    levels.append(OrderbookLevel(PRICE * Decimal('0.99'), 10 ** 17, 267 * 10 ** 6))
+
+    matcher = GreedyMatcher(PRICE, 18, 6, ob_min_improve_bps=0)
+    session = PlannerSession(matcher, levels, is_bid=True)
+    assert 0 < session.orderbook_depth < sum(level.amount_in_available for level in levels)
+    _assert_same(session, matcher, levels, True, _amounts(session.orderbook_depth))
+    for boundary in session.cum_in[1:]:
+        _assert_same(session, matcher, levels, True, [boundary - 1, boundary, boundary + 1])
+
+    in_ob, out_ob = session.quote(session.orderbook_depth // 2)
+    expected = matcher.match(levels, session.orderbook_depth // 2, True)
+    assert (in_ob, out_ob) == (expected['amount_in_on_orderbook'], expected['amount_out_from_orderbook'])
+
+
+def test_tick_aligned_and_gas_aware():
+    amm_tick = -196980  # ~2800 USDC/ETH
+    price = swap_tick_price(amm_tick, 18, 6)
+    generator = SyntheticOrderbookGenerator(price, 18, 6, mid_tick=amm_tick)
+    levels = generator.generate('large', 10 ** 18, is_bid=True)
+    gas_model = GasCostModel(gas_price_wei=10 ** 9, out_per_native=price, decimals_out=6)
+    matcher = GreedyMatcher(price, 18, 6, ob_min_improve_bps=0, amm_tick=amm_tick, gas_model=gas_model, max_matches=4)
+    session = PlannerSession(matcher, levels, is_bid=True)
+    _assert_same(session, matcher, levels, True, _amounts(session.orderbook_depth))
+
+
+def test_plan_equals_builder():
+    generator = SyntheticOrderbookGenerator(PRICE, 18, 6)
+    levels = generator.generate('small', 10 ** 18, is_bid=True)
+    matcher = GreedyMatcher(PRICE, 18, 6, ob_min_improve_bps=5)
+    builder = ExecutionPlanBuilder(PRICE, 18, 6)
+    session = PlannerSession(
+        matcher, levels, is_bid=True, builder=builder, token_in_address=WETH, token_out_address=USDC
+    )
+    for amount in (10 ** 16, 5 * 10 ** 17, 2 * 10 ** 18):
+        expected = builder.build_plan(matcher.match(levels, amount, True), WETH, USDC)
+        assert session.plan(amount) == expected
+
+
+def test_plan_reuses_prebuilt_plan_levels():
+    amm_tick = -196980
+    price = swap_tick_price(amm_tick, 18, 6)
+    levels = SyntheticOrderbookGenerator(price, 18, 6, mid_tick=amm_tick).generate('large', 10 ** 18, is_bid=True)
+    gas_model = GasCostModel(gas_price_wei=10 ** 9, out_per_native=price, decimals_out=6)
+    builder = ExecutionPlanBuilder(price, 18, 6)
+    for gas in (None, gas_model):
+        matcher = GreedyMatcher(price, 18, 6, ob_min_improve_bps=0, amm_tick=amm_tick, gas_model=gas)
+        session = PlannerSession(
+            matcher, levels, is_bid=True, builder=builder, token_in_address=WETH, token_out_address=USDC
+        )
+        for amount in _amounts(session.orderbook_depth):
+            plan = session.plan(amount)
+            assert plan == builder.build_plan(matcher.match(levels, amount, True), WETH, USDC), amount
+            used = plan.legs[0].levels_used if plan.split.amount_in_on_orderbook else []
+            # Whole-level fills (all but the last) are the pre-built objects, not rebuilt per call
+            assert all(level is prebuilt for level, prebuilt in zip(used[:-1], session._plan_full_fills))
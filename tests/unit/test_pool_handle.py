@@ -0,0 +1,93 @@
+"""
+Test PoolHandle (address-resolved swap direction, reusable quotes)
+
+Chạy: RPC_URL=... python -m pytest tests/unit/test_pool_handle.py -v
+"""
+
+from decimal import Decimal
+
+import pytest
+
+from services.amm_uniswap_v3.pool_handle import PoolHandle
+from services.amm_uniswap_v3.tick_data import TickTable
+from services.amm_uniswap_v3.v3_math import Q96
+from services.state import PoolState
+
+POOL = "0x6c561B446416E1A00E8E93E221854d6eA4171372"
+USDC = "0x833589fCD6eDb6E08f4c7C32D4f71b54bdA02913"
+USDT = "0xfde4C96c8593536E31F229EA8f37b2ADa2699bb2"
+
+
+def _state(ticks=None) -> PoolState:
+    # Equal-decimal pair: direction cannot be guessed from decimals
+    return PoolState(
+        pool=POOL, token0=USDC, token1=USDT, decimals0=6, decimals1=6,
+        symbol0="USDC", symbol1="USDT", fee=100, tick_spacing=1,
+        sqrt_price_x96=Q96, tick=0, liquidity=10 ** 15, price=Decimal(1), ticks=ticks,
+    )
+
+
+def test_direction_resolved_from_addresses():
+    handle = PoolHandle.from_pool_state(_state())
+
+    assert handle.zero_for_one(USDC.lower()) is True
+    assert handle.zero_for_one(USDT) is False
+    assert handle.decimals_out(True) == 6
+    with pytest.raises(ValueError):
+        handle.zero_for_one("0x4200000000000000000000000000000000000006")
+
+
+def test_quote_uses_state_ticks_or_spot():
+    ticks = TickTable(1).apply_liquidity_delta(-887272, 887272, 10 ** 15)
+    handle = PoolHandle.from_pool_state(_state())
+
+    # No tick data: spot price, no fee / impact
+    assert handle.quote(True, 10 ** 6, state=_state()) == 10 ** 6
+
+    # Tick data: fee (1 bp) and price impact reduce the output
+    exact = handle.quote(True, 10 ** 6, state=_state(ticks))
+    assert 10 ** 6 * 9999 // 10000 - 2 <= exact < 10 ** 6 * 9999 // 10000
+    assert handle.quote(False, 10 ** 6, state=_state(ticks)) == exact
+
+
+def test_quote_beyond_liquidity_raises_with_partial_result():
+    from functools import partial
+
+    from services.amm_uniswap_v3.swap_simulator import InsufficientLiquidityError
+    from services.execution.core import ExecutionPlanBuilder
+    from services.matching import GasCostModel, GreedyMatcher
+    from services.orderbook import OrderbookLevel
+
+    # Liquidity only within ±10 ticks: ~10**12 raw absorbs at most ~5 * 10**11
+    state = _state(TickTable(1).apply_liquidity_delta(-10, 10, 10 ** 15))
+    handle = PoolHandle.from_pool_state(state)
+    with pytest.raises(InsufficientLiquidityError) as error:
+        handle.quote(True, 10 ** 13, state=state)
+    partial_fill = error.value.result
+    assert 0 < partial_fill.amount_in < 10 ** 13 and partial_fill.amount_out > 0
+    assert handle.quote(True, partial_fill.amount_in // 2, state=state) > 0
+
+    # Builder: the AMM leg cannot execute; the 100%-AMM reference falls back to the partial output
+    builder = ExecutionPlanBuilder(Decimal(1), 6, 6, amm_quote=partial(handle.quote, True, state=state))
+    assert builder._calculate_amm_reference(10 ** 13) == partial_fill.amount_out
+    match_result = {
+        'amount_in_on_orderbook': 10 ** 13 - 10 ** 9, 'amount_in_on_amm': 10 ** 9,
+        'amount_out_from_orderbook': 10 ** 13 - 10 ** 9, 'levels_used': [],
+    }
+    plan = builder.build_plan(match_result, USDC, USDT)
+    assert plan.savings.amm_reference_out == partial_fill.amount_out
+    with pytest.raises(InsufficientLiquidityError):
+        builder.build_plan({**match_result, 'amount_in_on_orderbook': 0, 'amount_in_on_amm': 10 ** 13,
+                            'amount_out_from_orderbook': 0}, USDC, USDT)
+
+    # Gas-aware matching skips splits whose AMM rest does not fit
+    gas_model = GasCostModel(gas_price_wei=1, out_per_native=Decimal(1), decimals_out=6)
+    matcher = GreedyMatcher(
+        Decimal(1), 6, 6, ob_min_improve_bps=0, gas_model=gas_model,
+        amm_swap=partial(handle.quote_with_ticks, True, state=state)
+    )
+    levels = [OrderbookLevel(Decimal(1), 10 ** 13 - 10 ** 9, 10 ** 13 - 10 ** 9)]
+    result = matcher.match(levels, 10 ** 13, is_bid=True)
+    assert result['amount_in_on_orderbook'] == 10 ** 13 - 10 ** 9 and result['gas']['orderbook_matches'] == 1
+    with pytest.raises(InsufficientLiquidityError):
+        matcher.match([], 10 ** 13, is_bid=True)
@@ -0,0 +1,57 @@
+"""
+Test price conversions (sqrtPriceX96 <-> tick <-> human price), scalar and vectorized
+
+Chạy: python -m pytest tests/unit/test_price_math.py -v
+"""
+
+from decimal import Decimal
+
+import numpy as np
+
+from services.amm_uniswap_v3.price_math import (
+    price_from_sqrtprice,
+    tick_to_price,
+    sqrtprice_to_price_fraction,
+    price_to_sqrtprice,
+    price_to_tick,
+    prices_from_sqrtprices,
+    ticks_to_prices,
+    prices_to_ticks,
+    sqrtprices_to_ticks,
+)
+from services.amm_uniswap_v3.v3_math import get_sqrt_ratio_at_tick
+
+# ETH (18) / USDC (6) around 2800 USDC per ETH
+TICK = -196980
+SQRT_PRICE = get_sqrt_ratio_at_tick(TICK)
+
+
+def test_scalar_conversions_agree():
+    price = price_from_sqrtprice(SQRT_PRICE, 18, 6)
+    exact = sqrtprice_to_price_fraction(SQRT_PRICE, 18, 6)
+
+    assert abs(price - Decimal(exact.numerator) / Decimal(exact.denominator)) < Decimal("1e-20")
+    assert tick_to_price(TICK, 18, 6) == price
+    assert 2790 < price < 2800
+
+
+def test_price_to_sqrtprice_and_tick_round_trip():
+    exact = sqrtprice_to_price_fraction(SQRT_PRICE, 18, 6)
+
+    assert price_to_sqrtprice(exact, 18, 6) == SQRT_PRICE
+    assert price_to_tick(exact, 18, 6) == TICK
+    tick = price_to_tick(Decimal("2800"), 18, 6)
+    assert tick_to_price(tick, 18, 6) <= 2800 < tick_to_price(tick + 1, 18, 6)
+    assert price_from_sqrtprice(price_to_sqrtprice("1", 6, 6), 6, 6).quantize(Decimal("1e-18")) == 1
+
+
+def test_vectorized_matches_scalar():
+    ticks = np.array([TICK - 600, TICK, TICK + 600])
+    sqrt_prices = [get_sqrt_ratio_at_tick(int(t)) for t in ticks]
+    expected = np.array([float(price_from_sqrtprice(s, 18, 6)) for s in sqrt_prices])
+
+    np.testing.assert_allclose(prices_from_sqrtprices(sqrt_prices, 18, 6), expected, rtol=1e-12)
+    np.testing.assert_allclose(ticks_to_prices(ticks, 18, 6), expected, rtol=1e-9)
+    # Nudge off the exact tick boundary before flooring
+    assert list(prices_to_ticks(expected * (1 + 1e-9), 18, 6)) == list(ticks)
+    assert list(sqrtprices_to_ticks(np.array(sqrt_prices, dtype=float) * (1 + 1e-9))) == list(ticks)
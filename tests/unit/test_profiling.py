@@ -0,0 +1,46 @@
+"""
+Test per-request sampling profiler (rate limit, folded output)
+
+Chạy: python -m pytest tests/unit/test_profiling.py -v
+"""
+
+import time
+
+from api.profiling import RequestProfiler, is_valid_request_id, resolve_request_id
+
+
+def _busy(duration_s):
+    end = time.perf_counter() + duration_s
+    total = 0
+    while time.perf_counter() < end:
+        total += 1
+    return total
+
+
+def test_profiled_call_writes_folded_stacks(tmp_path):
+    profiler = RequestProfiler(enabled=True, output_dir=str(tmp_path), min_interval_s=0)
+
+    assert profiler.run("req-1", _busy, 0.05) > 0
+
+    folded = (tmp_path / "req-1.folded").read_text()
+    assert "test_profiling.py:_busy" in folded
+    stack, count = folded.splitlines()[0].rsplit(" ", 1)
+    assert int(count) > 0
+
+
+def test_rate_limit_and_disabled_flag(tmp_path):
+    profiler = RequestProfiler(enabled=True, output_dir=str(tmp_path), min_interval_s=60)
+    assert profiler.try_acquire() is True
+    assert profiler.try_acquire() is False
+
+    disabled = RequestProfiler(enabled=False, output_dir=str(tmp_path))
+    assert disabled.try_acquire() is False
+
+
+def test_request_id_must_be_safe_file_name():
+    profile_id = resolve_request_id("abc-123_X")
+    assert profile_id.startswith("abc-123_X-") and is_valid_request_id(profile_id)
+    # Same caller id twice -> two distinct profiles
+    assert resolve_request_id("abc-123_X") != profile_id
+    assert is_valid_request_id(resolve_request_id("x" * 64))
+    assert "/" not in resolve_request_id("../etc/passwd")
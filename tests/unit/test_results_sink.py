@@ -0,0 +1,86 @@
+"""
+Test BacktestResultsSink - batched columnar output + grouped percentiles
+
+Chạy: python -m pytest tests/unit/test_results_sink.py -v
+"""
+
+from decimal import Decimal
+
+import numpy as np
+import pytest
+
+from services.backtest import BacktestResultsSink, iter_table, summarize
+from services.execution.core import ExecutionPlanBuilder
+from services.matching import GreedyMatcher
+from services.orderbook import SyntheticOrderbookGenerator
+
+
+PRICE = Decimal('2700')
+WETH = "0x4200000000000000000000000000000000000006"
+USDC = "0x833589fcd6edb6e08f4c7c32d4f71b54bda02913"
+
+
+def _plan(scenario, size):
+    levels = SyntheticOrderbookGenerator(PRICE, 18, 6).generate(scenario, size, is_bid=True)
+    match_result = GreedyMatcher(PRICE, 18, 6).match(levels, size, True)
+    return ExecutionPlanBuilder(PRICE, 18, 6).build_plan(match_result, WETH, USDC)
+
+
+def _read(out_dir, table):
+    batches = list(iter_table(out_dir, table))
+    return {name: np.concatenate([batch[name] for batch in batches]) for name in batches[0]}
+
+
+def test_plans_and_levels_roundtrip(tmp_path):
+    plans = [(scenario, size, _plan(scenario, size)) for scenario in ("small", "medium") for size in (10 ** 17, 10 ** 18)]
+    with BacktestResultsSink(tmp_path, batch_rows=3, format="npz") as sink:
+        for scenario, _, plan in plans:
+            sink.add_plan(scenario, plan, 18, 6, price_amm=PRICE)
+
+    assert len(list((tmp_path / "scenarios").glob("part-*.npz"))) == 2  # 3 + 1 rows
+    scenarios = _read(tmp_path, "scenarios")
+    assert scenarios["plan_id"].tolist() == [0, 1, 2, 3]
+    assert scenarios["scenario"].tolist() == ["small", "small", "medium", "medium"]
+    for row, (_, size, plan) in enumerate(plans):
+        assert scenarios["amount_in"][row] == size / 10 ** 18
+        assert scenarios["savings_after_fee"][row] == pytest.approx(plan.savings.savings_after_fee / 10 ** 6)
+        assert scenarios["levels_used"][row] == len(plan.legs[0].levels_used)
+
+    levels = _read(tmp_path, "levels")
+    assert len(levels["plan_id"]) == scenarios["levels_used"].sum()
+    assert np.all(levels["price_vs_amm_bps"] > 0)  # only better-than-AMM levels are used
+
+
+def test_summary_percentiles_match_numpy(tmp_path):
+    rng = np.random.default_rng(7)
+    rows = 5000
+    scenario = rng.choice(["small", "medium", "large"], rows)
+    amount_in = rng.choice([0.1, 1.0, 10.0], rows)
+    bps = rng.normal(20, 5, rows)
+    zeros = np.zeros(rows)
+
+    with BacktestResultsSink(tmp_path, batch_rows=1024, format="npz") as sink:
+        plan_ids = sink.add_scenario_rows({
+            "scenario": scenario, "amount_in": amount_in, "amount_in_on_orderbook": zeros,
+            "ob_split_pct": zeros, "expected_total_out": zeros, "amm_reference_out": zeros,
+            "savings_before_fee": zeros, "performance_fee_amount": zeros, "savings_after_fee": zeros,
+            "savings_after_fee_bps": bps, "levels_used": 0,
+        })
+    assert plan_ids[-1] == rows - 1
+
+    summary = summarize(tmp_path)
+    assert len(summary["count"]) == 9 and summary["count"].sum() == rows
+    for i in range(9):
+        mask = (scenario == summary["scenario"][i]) & (amount_in == summary["amount_in"][i])
+        assert summary["count"][i] == mask.sum()
+        assert summary["mean"][i] == pytest.approx(bps[mask].mean())
+        for q in (5, 50, 95):
+            assert summary[f"p{q}"][i] == pytest.approx(np.percentile(bps[mask], q))
+
+
+def test_parquet_format(tmp_path):
+    pytest.importorskip("pyarrow")
+    with BacktestResultsSink(tmp_path, format="parquet") as sink:
+        sink.add_plan("medium", _plan("medium", 10 ** 18), 18, 6, price_amm=PRICE)
+    assert (tmp_path / "scenarios.parquet").exists()
+    assert summarize(tmp_path)["count"].tolist() == [1]
@@ -0,0 +1,46 @@
+"""
+Test RPC call accounting (selector labels, per-scope tally, provider hook)
+
+Chạy: python -m pytest tests/unit/test_rpc_accounting.py -v
+"""
+
+import json
+
+from services.telemetry import rpc
+
+
+def test_eth_call_selector_resolves_to_function_name():
+    rpc.register_abi([
+        {"type": "function", "name": "slot0", "inputs": []},
+        {"type": "function", "name": "ticks", "inputs": [{"type": "int24"}]},
+    ])
+
+    assert rpc.call_label("eth_call", [{"to": "0x00", "data": "0x3850c7bd"}, "latest"]) == "eth_call:slot0()"
+    assert rpc.call_label("eth_call", [{"to": "0x00", "data": "0xdeadbeef00"}]) == "eth_call:0xdeadbeef"
+    assert rpc.call_label("eth_blockNumber", []) == "eth_blockNumber"
+
+
+def test_provider_records_calls_into_current_tally(monkeypatch):
+    provider = rpc.InstrumentedHTTPProvider("http://127.0.0.1:8545")
+    raw_response = json.dumps({"jsonrpc": "2.0", "id": 0, "result": "0x10"}).encode()
+    monkeypatch.setattr(provider, "_make_request", lambda method, data: raw_response, raising=False)
+
+    with rpc.rpc_accounting() as tally:
+        provider.make_request("eth_blockNumber", [])
+        provider.make_request("eth_blockNumber", [])
+
+    report = tally.to_dict()
+    assert report["total_calls"] == 2
+    assert report["calls"]["eth_blockNumber"]["count"] == 2
+    assert report["calls"]["eth_blockNumber"]["response_bytes"] == 2 * len(raw_response)
+    assert report["request_bytes"] > 0
+
+
+def test_nested_scopes_count_into_enclosing_tally():
+    with rpc.rpc_accounting() as request_tally:
+        rpc.record_call("eth_blockNumber", [], 0.001, 10, 20)
+        with rpc.rpc_accounting() as plan_tally:
+            rpc.record_call("eth_chainId", [], 0.001, 10, 20)
+
+    assert plan_tally.to_dict()["total_calls"] == 1
+    assert set(request_tally.to_dict()["calls"]) == {"eth_blockNumber", "eth_chainId"}
@@ -0,0 +1,67 @@
+"""
+Test savings_surface - bulk grid vs GreedyMatcher + ExecutionPlanBuilder per point
+
+Chạy: python -m pytest tests/unit/test_savings_surface.py -v
+"""
+
+from decimal import Decimal
+
+import numpy as np
+
+from services.execution.core import ExecutionPlanBuilder, savings_surface
+from services.matching import GreedyMatcher
+from services.orderbook import SyntheticOrderbookGenerator
+
+
+PRICE = Decimal('2700')
+WETH = "0x4200000000000000000000000000000000000006"
+USDC = "0x833589fcd6edb6e08f4c7c32d4f71b54bda02913"
+FEES = [0, 1000, 3000]
+SIZES = [10 ** 16, 3 * 10 ** 17, 10 ** 18, 1234567890123456789, 4 * 10 ** 18]
+
+
+def _levels():
+    return SyntheticOrderbookGenerator(PRICE, 18, 6).generate('medium', 10 ** 18, is_bid=True)
+
+
+def _reference_plan(levels, size, fee_bps, improve_bps, amm_quote=None):
+    match_result = GreedyMatcher(PRICE, 18, 6, ob_min_improve_bps=improve_bps).match(levels, size, True)
+    builder = ExecutionPlanBuilder(PRICE, 18, 6, performance_fee_bps=fee_bps, max_slippage_bps=100, amm_quote=amm_quote)
+    return builder.build_plan(match_result, WETH, USDC)
+
+
+def test_surface_matches_builder_per_point():
+    levels = _levels()
+    improve_grid = [0, 5, 15]
+    surface = savings_surface(
+        levels, True, PRICE, 18, 6, SIZES, FEES, ob_min_improve_bps=improve_grid, max_slippage_bps=100
+    )
+    assert surface['savings_after_fee'].shape == (3, len(SIZES), len(FEES))
+    assert surface['min_total_out'].shape == (len(SIZES),)
+
+    for k, improve_bps in enumerate(improve_grid):
+        for s, size in enumerate(SIZES):
+            for f, fee_bps in enumerate(FEES):
+                plan = _reference_plan(levels, size, fee_bps, improve_bps)
+                savings = plan.savings
+                assert abs(surface['amount_in_on_orderbook'][k, s] - plan.split.amount_in_on_orderbook) <= 256
+                assert abs(surface['expected_total_out'][k, s] - savings.expected_total_out) <= 1
+                assert abs(surface['savings_before_fee'][k, s] - savings.savings_before_fee) <= 1
+                assert abs(surface['savings_after_fee'][k, s, f] - savings.savings_after_fee) <= 1
+                assert surface['min_total_out'][s] == savings.min_total_out
+
+    # A stricter threshold never uses more of the book
+    assert np.all(np.diff(surface['amount_in_on_orderbook'], axis=0) <= 0)
+
+
+def test_scalar_improve_and_amm_curve():
+    levels = _levels()
+    # Concave curve: price impact grows with size
+    amm_quote = lambda amount_in: int(Decimal(amount_in) * PRICE / 10 ** 12) - amount_in ** 2 // 10 ** 33
+    surface = savings_surface(levels, True, PRICE, 18, 6, SIZES, FEES, ob_min_improve_bps=5, amm_quote=amm_quote)
+    assert surface['savings_after_fee'].shape == (len(SIZES), len(FEES))
+
+    for s, size in enumerate(SIZES):
+        plan = _reference_plan(levels, size, 3000, 5, amm_quote=amm_quote)
+        assert surface['amm_reference_out'][s] == plan.savings.amm_reference_out
+        assert abs(surface['savings_after_fee'][s, 2] - plan.savings.savings_after_fee) <= 1
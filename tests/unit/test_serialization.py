@@ -0,0 +1,33 @@
+"""
+Test fast JSON serialization for execution plans
+
+Chạy: python -m pytest tests/unit/test_serialization.py -v
+"""
+
+import json
+from decimal import Decimal
+
+from api.serialization import PlanJSONResponse, dumps_plan
+
+
+def test_decimal_values_are_encoded_as_strings():
+    plan = {
+        "legs": [{
+            "effective_price": Decimal("0.000392"),
+            "meta": {"levels_used": [{"price": Decimal("2549.10"), "amount_in_from_level": "10"}]},
+        }],
+        "metadata": {"fee": 3000},
+    }
+
+    decoded = json.loads(dumps_plan(plan))
+
+    assert decoded["legs"][0]["effective_price"] == "0.000392"
+    assert decoded["legs"][0]["meta"]["levels_used"][0]["price"] == "2549.10"
+    assert decoded["metadata"]["fee"] == 3000
+
+
+def test_response_renders_compact_json():
+    response = PlanJSONResponse({"split": {"amount_in_total": "1000000000000000000"}})
+
+    assert response.media_type == "application/json"
+    assert response.body == b'{"split":{"amount_in_total":"1000000000000000000"}}'
@@ -0,0 +1,73 @@
+"""
+Test SharedStateStore (atomic publish / cached load) and LeaderLock
+
+Chạy: python -m pytest tests/unit/test_shared_store.py -v
+"""
+
+from services.state import SharedStateStore, LeaderLock
+
+
+def test_publish_and_load_across_store_instances(tmp_path):
+    writer = SharedStateStore(str(tmp_path))
+    reader = SharedStateStore(str(tmp_path))
+
+    assert reader.load("pool_state") is None
+
+    writer.publish("pool_state", {"block_number": 100, "pools": {}})
+    first = reader.load("pool_state")
+    assert first["block_number"] == 100
+    # Unchanged file → same object, no re-read
+    assert reader.load("pool_state") is first
+
+    writer.publish("pool_state", {"block_number": 101, "pools": {}})
+    assert reader.load("pool_state")["block_number"] == 101
+
+
+def test_only_one_leader(tmp_path):
+    leader = LeaderLock(str(tmp_path))
+    follower = LeaderLock(str(tmp_path))
+
+    assert leader.try_acquire() is True
+    assert follower.try_acquire() is False
+
+    leader.release()
+    assert follower.try_acquire() is True
+    follower.release()
+
+
+def test_refresher_is_leader_has_no_side_effects(tmp_path):
+    from services.state.refresher import PoolStateRefresher
+
+    refresher = PoolStateRefresher([], leader_lock=LeaderLock(str(tmp_path)), load_ticks=False)
+    other = LeaderLock(str(tmp_path))
+
+    assert refresher.is_leader is False
+    assert refresher.is_leader is False  # reading it does not take the lock
+    assert refresher.try_become_leader() is True and refresher.is_leader is True
+    assert other.try_acquire() is False
+    refresher.leader_lock.release()
+
+
+def test_refuses_state_other_users_could_write(tmp_path):
+    import os
+
+    import pytest
+
+    from services.state import default_state_dir
+
+    assert default_state_dir().endswith(f"unihybrid-{os.getuid()}")
+
+    directory = tmp_path / "state"
+    store = SharedStateStore(str(directory))
+    assert os.stat(directory).st_mode & 0o777 == 0o700
+
+    store.publish("pool_state", {"block_number": 1})
+    os.chmod(directory / "pool_state.pkl", 0o666)
+    with pytest.raises(PermissionError):
+        SharedStateStore(str(directory)).load("pool_state")
+
+    os.chmod(directory, 0o777)
+    with pytest.raises(PermissionError):
+        SharedStateStore(str(directory))
+    with pytest.raises(PermissionError):
+        LeaderLock(str(directory))
@@ -0,0 +1,36 @@
+"""
+Test span/timer instrumentation and Prometheus rendering
+
+Chạy: python -m pytest tests/unit/test_spans.py -v
+"""
+
+from services.telemetry import spans
+
+
+def test_span_records_histogram_and_request_timings():
+    spans.set_enabled(True)
+    spans.registry.reset()
+
+    with spans.request_timings() as timings:
+        with spans.span("match"):
+            pass
+
+    assert [stage for stage, _ in timings] == ["match"]
+    text = spans.registry.render_prometheus()
+    assert 'unihybrid_stage_duration_seconds_count{stage="match"} 1' in text
+    assert 'unihybrid_stage_duration_seconds_bucket{stage="match",le="+Inf"} 1' in text
+    assert spans.format_server_timing([("match", 0.0125)]) == "match;dur=12.50"
+
+
+def test_disabled_span_is_noop():
+    spans.set_enabled(False)
+    spans.registry.reset()
+    try:
+        with spans.request_timings() as timings:
+            with spans.span("match"):
+                pass
+    finally:
+        spans.set_enabled(True)
+
+    assert timings == []
+    assert "match" not in spans.registry.render_prometheus()
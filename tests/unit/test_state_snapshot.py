@@ -0,0 +1,63 @@
+"""
+Test the immutable pool state snapshot (lock-free reads, shared-store round trip)
+
+Chạy: python -m pytest tests/unit/test_state_snapshot.py -v
+"""
+
+import dataclasses
+from decimal import Decimal
+
+import pytest
+
+from services.state import PoolState, StateSnapshot, SharedStateStore, get_snapshot, publish_snapshot, clear_snapshot
+
+POOL = "0xcE1d8c90A5F0ef28fe0F457e5Ad615215899319a"
+
+
+def _snapshot(block_number: int) -> StateSnapshot:
+    state = PoolState(
+        pool=POOL,
+        token0="0x4200000000000000000000000000000000000006",
+        token1="0x833589fCD6eDb6E08f4c7C32D4f71b54bdA02913",
+        decimals0=18,
+        decimals1=6,
+        symbol0="ETH",
+        symbol1="USDC",
+        fee=3000,
+        tick_spacing=60,
+        sqrt_price_x96=2 ** 96,
+        tick=0,
+        liquidity=10 ** 18,
+        price=Decimal("3000"),
+    )
+    return StateSnapshot.build(block_number, 0.0, 10 ** 7, {POOL: state})
+
+
+def test_snapshot_is_immutable():
+    snapshot = _snapshot(100)
+
+    assert snapshot.pool(POOL.upper().replace("0X", "0x")) is snapshot.pools[POOL.lower()]
+    with pytest.raises(TypeError):
+        snapshot.pools["0xdead"] = None
+    with pytest.raises(dataclasses.FrozenInstanceError):
+        snapshot.block_number = 101
+
+
+def test_publish_swaps_current_snapshot():
+    clear_snapshot()
+    assert get_snapshot() is None
+
+    snapshot = _snapshot(100)
+    publish_snapshot(snapshot)
+    assert get_snapshot() is snapshot
+    assert snapshot.pool(POOL).as_pool_data()["price_eth_per_usdt"] == Decimal("3000")
+    clear_snapshot()
+
+
+def test_snapshot_round_trips_through_shared_store(tmp_path):
+    store = SharedStateStore(str(tmp_path))
+    store.publish("pool_state", _snapshot(100))
+
+    loaded = SharedStateStore(str(tmp_path)).load("pool_state")
+    assert loaded == _snapshot(100)
+    assert loaded.pool(POOL).liquidity == 10 ** 18
@@ -0,0 +1,90 @@
+"""
+Test SwapRouter02 calldata - selectors, eth_abi parity, multicall bundling
+
+Chạy: python -m pytest tests/unit/test_swap_router.py -v
+"""
+
+import pytest
+from eth_abi import decode, encode
+
+from services.amm_uniswap_v3.swap_router import (
+    EXACT_INPUT_SELECTOR,
+    EXACT_INPUT_SINGLE_SELECTOR,
+    MULTICALL_SELECTOR,
+    SWAP_ROUTER02_ADDRESS,
+    encode_exact_input,
+    encode_exact_input_single,
+    encode_multicall,
+    encode_path,
+)
+from services.execution.core import build_amm_leg, bundle_amm_legs
+
+
+WETH = "0x4200000000000000000000000000000000000006"
+USDC = "0x833589fCD6eDb6E08f4c7C32D4f71b54bdA02913"
+POOL = "0xd0b53D9277642d899DF5C87A3966A349A798F224"
+RECIPIENT = "0x1111111111111111111111111111111111111111"
+
+
+def test_selectors():
+    # Published SwapRouter02 (IV3SwapRouter / IMulticallExtended) selectors
+    assert EXACT_INPUT_SINGLE_SELECTOR.hex() == "04e45aaf"
+    assert EXACT_INPUT_SELECTOR.hex() == "b858183f"
+    assert MULTICALL_SELECTOR.hex() == "5ae401dc"
+
+
+def test_exact_input_single_matches_eth_abi():
+    data = encode_exact_input_single(WETH, USDC, 500, RECIPIENT, 10 ** 18, 2_500_000_000, 123)
+    expected = encode(
+        ["(address,address,uint24,address,uint256,uint256,uint160)"],
+        [(WETH, USDC, 500, RECIPIENT, 10 ** 18, 2_500_000_000, 123)],
+    )
+    assert data == EXACT_INPUT_SINGLE_SELECTOR + expected
+
+    with pytest.raises(ValueError):
+        encode_exact_input_single(WETH, USDC, 1 << 24, RECIPIENT, 1, 0)
+
+
+def test_exact_input_matches_eth_abi():
+    path = encode_path([WETH, USDC, WETH], [500, 3000])
+    assert len(path) == 20 + 3 + 20 + 3 + 20
+    assert path[20:23] == (500).to_bytes(3, "big")
+
+    data = encode_exact_input(path, RECIPIENT, 10 ** 18, 1)
+    expected = encode(["(bytes,address,uint256,uint256)"], [(path, RECIPIENT, 10 ** 18, 1)])
+    assert data == EXACT_INPUT_SELECTOR + expected
+
+    with pytest.raises(ValueError):
+        encode_path([WETH, USDC], [500, 3000])
+
+
+def test_multicall_matches_eth_abi():
+    calls = [
+        encode_exact_input_single(WETH, USDC, 500, RECIPIENT, 10 ** 18, 1),
+        encode_exact_input(encode_path([WETH, USDC], [3000]), RECIPIENT, 5, 0),
+        b"\x01\x02\x03",
+    ]
+    data = encode_multicall(1_700_000_000, calls)
+    assert data == MULTICALL_SELECTOR + encode(["uint256", "bytes[]"], [1_700_000_000, calls])
+    assert encode_multicall(1, []) == MULTICALL_SELECTOR + encode(["uint256", "bytes[]"], [1, []])
+
+
+def test_build_and_bundle_amm_legs():
+    leg_a = build_amm_leg(POOL, SWAP_ROUTER02_ADDRESS, 10 ** 18, 2_000, RECIPIENT, 1_700_000_000, WETH, USDC, fee=500)
+    leg_b = build_amm_leg(POOL, SWAP_ROUTER02_ADDRESS, 2 * 10 ** 18, 4_000, RECIPIENT, 1_700_000_000, WETH, USDC, fee=3000)
+
+    deadline, (swap,) = decode(["uint256", "bytes[]"], bytes.fromhex(leg_a.calldata[2 + 8:]))
+    assert deadline == 1_700_000_000
+    assert swap == encode_exact_input_single(WETH, USDC, 500, RECIPIENT, 10 ** 18, 2_000)
+
+    bundled = bundle_amm_legs([leg_a, leg_b], deadline=1_700_000_100)
+    assert bundled.to == SWAP_ROUTER02_ADDRESS
+    assert bundled.sell_amount == 3 * 10 ** 18
+    assert bundled.min_buy_amount == 6000
+    deadline, swaps = decode(["uint256", "bytes[]"], bytes.fromhex(bundled.calldata[2 + 8:]))
+    assert deadline == 1_700_000_100
+    assert [s[-32 * 7:][64:96] for s in swaps] == [(500).to_bytes(32, "big"), (3000).to_bytes(32, "big")]
+
+    other_pair = build_amm_leg(POOL, SWAP_ROUTER02_ADDRESS, 1, 0, RECIPIENT, 1, USDC, WETH, fee=500)
+    with pytest.raises(ValueError):
+        bundle_amm_legs([leg_a, other_pair], deadline=1)
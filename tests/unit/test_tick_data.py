@@ -0,0 +1,63 @@
+"""
+Test TickTable (sorted initialized ticks, copy-on-write updates) and Mint/Burn log decoding
+
+Chạy: python -m pytest tests/unit/test_tick_data.py -v
+"""
+
+from eth_abi import encode
+
+from services.amm_uniswap_v3.tick_data import (
+    TickTable,
+    MINT_TOPIC,
+    BURN_TOPIC,
+    bitmap_word_range,
+    ticks_from_bitmap_word,
+    apply_liquidity_logs,
+)
+
+
+def _log(topic: bytes, tick_lower: int, tick_upper: int, data: bytes) -> dict:
+    owner = encode(["address"], ["0x" + "11" * 20])
+    return {
+        "topics": [topic, owner, encode(["int24"], [tick_lower]), encode(["int24"], [tick_upper])],
+        "data": data,
+    }
+
+
+def test_bitmap_word_decoding():
+    # bits 0 and 255 of word -1, spacing 60
+    assert ticks_from_bitmap_word(-1, 1 | (1 << 255), 60) == [-256 * 60, -60]
+    assert ticks_from_bitmap_word(0, 0b101, 10) == [0, 20]
+
+    words = bitmap_word_range(60)
+    assert words.start == -58 and words.stop == 58
+
+
+def test_next_initialized_tick():
+    table = TickTable.from_ticks(60, [(120, 5, -5), (-60, 5, 5)])
+
+    assert list(table.ticks) == [-60, 120]
+    assert table.next_initialized_tick(0, lte=True) == -60
+    assert table.next_initialized_tick(-60, lte=True) == -60
+    assert table.next_initialized_tick(-60, lte=False) == 120
+    assert table.next_initialized_tick(120, lte=False) is None
+    assert table.next_initialized_tick(-61, lte=True) is None
+
+
+def test_mint_and_burn_logs_update_copy():
+    empty = TickTable(60)
+    mint = _log(MINT_TOPIC, -120, 60, encode(["address", "uint128", "uint256", "uint256"], ["0x" + "22" * 20, 1000, 1, 1]))
+    burn = _log(BURN_TOPIC, -120, 60, encode(["uint128", "uint256", "uint256"], [400, 1, 1]))
+
+    minted = apply_liquidity_logs(empty, [mint])
+    assert len(empty) == 0
+    assert list(minted) == [(-120, 1000, 1000), (60, 1000, -1000)]
+
+    burned = apply_liquidity_logs(minted, [burn])
+    assert burned.liquidity_net_at(-120) == 600
+    assert burned.liquidity_net_at(60) == -600
+
+    # Removing all liquidity uninitializes both ticks
+    assert len(burned.apply_liquidity_delta(-120, 60, -600)) == 0
+    # Reorged-out logs are ignored
+    assert apply_liquidity_logs(empty, [{**mint, "removed": True}]) == empty
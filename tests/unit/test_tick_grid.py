@@ -0,0 +1,74 @@
+"""
+Test tick-aligned orderbook generation and tick-domain matching
+
+Chạy: python -m pytest tests/unit/test_tick_grid.py -v
+"""
+
+from services.matching import GreedyMatcher
+from services.orderbook import (
+    SyntheticOrderbookGenerator,
+    swap_tick_price,
+    swap_tick_amount_out,
+    swap_tick_from_sqrt_price,
+    ticks_within_bps,
+)
+from services.amm_uniswap_v3.v3_math import get_sqrt_ratio_at_tick
+
+# ETH (18) -> USDC (6), pool tick ~ 2800 USDC/ETH
+POOL_TICK = -196980
+SWAP_AMOUNT = 10 ** 18
+
+
+def test_swap_direction_ticks():
+    # Price strictly inside [POOL_TICK, POOL_TICK + 1)
+    sqrt_price = (get_sqrt_ratio_at_tick(POOL_TICK) + get_sqrt_ratio_at_tick(POOL_TICK + 1)) // 2
+
+    assert swap_tick_from_sqrt_price(sqrt_price, zero_for_one=True) == POOL_TICK
+    assert swap_tick_from_sqrt_price(sqrt_price, zero_for_one=False) == -POOL_TICK - 1
+    assert ticks_within_bps(5, above=True) == 4
+    assert ticks_within_bps(5, above=False) == -5
+    assert ticks_within_bps(0, above=True) == 0
+
+
+def test_tick_aligned_levels_sit_on_grid():
+    mid_price = swap_tick_price(POOL_TICK, 18, 6)
+    levels = SyntheticOrderbookGenerator(mid_price, 18, 6, mid_tick=POOL_TICK).generate("medium", SWAP_AMOUNT)
+    # 8 bps step -> 8 ticks
+    assert [level.tick for level in levels] == [POOL_TICK - 8 * i for i in range(1, 6)]
+
+    coarse = SyntheticOrderbookGenerator(mid_price, 18, 6, mid_tick=POOL_TICK + 3, tick_spacing=10)
+    levels = coarse.generate("medium", SWAP_AMOUNT, is_bid=True)
+    assert [level.tick for level in levels] == [-196970, -196960, -196950, -196940, -196930]
+    for level in levels:
+        assert level.price == swap_tick_price(level.tick, 18, 6)
+        assert level.amount_out_available == swap_tick_amount_out(level.amount_in_available, level.tick)
+
+    # Default mode is unchanged
+    assert all(level.tick is None for level in SyntheticOrderbookGenerator(mid_price, 18, 6).generate("medium", SWAP_AMOUNT))
+
+
+def test_tick_spacing_levels_are_distinct():
+    mid_price = swap_tick_price(-197000, 18, 6)
+    for tick_spacing in (10, 60):
+        generator = SyntheticOrderbookGenerator(mid_price, 18, 6, mid_tick=-197000, tick_spacing=tick_spacing)
+        for scenario in ("medium", "large"):
+            for is_bid in (False, True):
+                ticks = [level.tick for level in generator.generate(scenario, SWAP_AMOUNT, is_bid)]
+                assert all(tick % tick_spacing == 0 for tick in ticks)
+                # Distinct ticks, each level strictly further from mid than the previous one
+                steps = [b - a for a, b in zip(ticks, ticks[1:])]
+                assert all(step >= tick_spacing for step in steps) if is_bid else all(step <= -tick_spacing for step in steps)
+
+
+def test_tick_matching_agrees_with_price_matching():
+    mid_price = swap_tick_price(POOL_TICK, 18, 6)
+    for is_bid in (False, True):
+        levels = SyntheticOrderbookGenerator(mid_price, 18, 6, mid_tick=POOL_TICK).generate("large", SWAP_AMOUNT, is_bid)
+        by_tick = GreedyMatcher(mid_price, 18, 6, ob_min_improve_bps=12, amm_tick=POOL_TICK).match(levels, SWAP_AMOUNT, is_bid)
+        by_price = GreedyMatcher(mid_price, 18, 6, ob_min_improve_bps=12).match(levels, SWAP_AMOUNT, is_bid)
+
+        assert by_tick["min_better_tick"] is not None
+        assert by_tick["levels_better_than_amm"] == by_price["levels_better_than_amm"]
+        assert by_tick["amount_in_on_orderbook"] == by_price["amount_in_on_orderbook"]
+        # Partial fills priced from the exact tick price
+        assert abs(by_tick["amount_out_from_orderbook"] - by_price["amount_out_from_orderbook"]) <= len(levels)
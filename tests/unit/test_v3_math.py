@@ -0,0 +1,78 @@
+"""
+Test integer-exact V3 math (TickMath, SwapMath) and the offline swap simulator
+
+Chạy: python -m pytest tests/unit/test_v3_math.py -v
+"""
+
+from services.amm_uniswap_v3.tick_data import TickTable
+from services.amm_uniswap_v3.swap_simulator import simulate_exact_input
+from services.amm_uniswap_v3.v3_math import (
+    MIN_TICK,
+    MAX_TICK,
+    MIN_SQRT_RATIO,
+    MAX_SQRT_RATIO,
+    Q96,
+    compute_swap_step,
+    get_sqrt_ratio_at_tick,
+    get_tick_at_sqrt_ratio,
+)
+
+FULL_RANGE = (-887220, 887220)  # usable full range for tick spacing 60
+
+
+def test_sqrt_ratio_at_tick_bounds():
+    assert get_sqrt_ratio_at_tick(0) == 2 ** 96
+    assert get_sqrt_ratio_at_tick(MIN_TICK) == MIN_SQRT_RATIO
+    assert get_sqrt_ratio_at_tick(MAX_TICK) == MAX_SQRT_RATIO
+
+
+def test_tick_at_sqrt_ratio_is_inverse():
+    assert get_tick_at_sqrt_ratio(MIN_SQRT_RATIO) == MIN_TICK
+    assert get_tick_at_sqrt_ratio(MAX_SQRT_RATIO - 1) == MAX_TICK - 1
+    for tick in (-197000, -1, 0, 1, 50000):
+        sqrt_price = get_sqrt_ratio_at_tick(tick)
+        assert get_tick_at_sqrt_ratio(sqrt_price) == tick
+        assert get_tick_at_sqrt_ratio(sqrt_price - 1) == tick - 1
+
+
+def test_swap_step_matches_v3_core_vectors():
+    # SwapMath.spec: "exact amount in that is fully spent in one for zero"
+    target = get_sqrt_ratio_at_tick(23027)  # ~ price 10, not reached
+    sqrt_next, amount_in, amount_out, fee_amount = compute_swap_step(Q96, target, 2 * 10 ** 18, 10 ** 18, 600)
+    assert (amount_in, amount_out, fee_amount) == (999400000000000000, 666399946655997866, 600000000000000)
+    assert sqrt_next < target
+
+
+def test_swap_step_within_one_range_matches_closed_form():
+    liquidity = 10 ** 18
+    amount = 10 ** 15
+    sqrt_next, amount_in, amount_out, fee_amount = compute_swap_step(Q96, MIN_SQRT_RATIO, liquidity, amount, 3000)
+
+    less_fee = amount * 997_000 // 1_000_000
+    expected_sqrt = -(-(liquidity << 96) * Q96 // ((liquidity << 96) + less_fee * Q96))
+    assert sqrt_next == expected_sqrt
+    assert amount_in + fee_amount == amount
+    assert amount_out == liquidity * (Q96 - sqrt_next) // Q96
+
+
+def test_simulated_swap_crosses_ticks_and_adds_price_impact():
+    # Full-range position plus a concentrated one on [-600, 600]
+    table = TickTable.from_ticks(60, [])
+    table = table.apply_liquidity_delta(*FULL_RANGE, 10 ** 18)
+    table = table.apply_liquidity_delta(-600, 600, 9 * 10 ** 18)
+    state = (Q96, 0, 10 ** 19, table, 3000)
+
+    small = simulate_exact_input(*state, zero_for_one=True, amount_in=10 ** 12)
+    assert small.ticks_crossed == 0
+    assert small.amount_out < 10 ** 12 * 997 // 1000
+
+    large = simulate_exact_input(*state, zero_for_one=True, amount_in=10 ** 18)
+    assert large.ticks_crossed == 1
+    assert large.liquidity_after == 10 ** 18
+    assert large.tick_after < -600
+    # Price impact: average execution price well below spot
+    assert large.amount_out < 10 ** 18 * 9 // 10
+
+    # Same state, other direction
+    up = simulate_exact_input(*state, zero_for_one=False, amount_in=10 ** 18)
+    assert up.ticks_crossed == 1 and up.tick_after >= 600
@@ -6,6 +6,9 @@ Chạy: python -m pytest tests/unit/test_virtual_orderbook.py -v
 
 import json
 from decimal import Decimal
+
+import pytest
+
 from services.execution.ui.virtual_orderbook import (
     VirtualOrderBook,
     generate_sample_cex_snapshot
@@ -232,6 +235,125 @@ def test_decimal_precision():
     print(f"✅ Spread (bps): {orderbook['spread_bps']}")
 
 
+def _reference_large_levels(mid_price, capital_usd, cex_snapshot):
+    """Per-dict Decimal implementation (trước khi vectorize), dùng để so sánh."""
+    mid = Decimal(str(mid_price))
+    price_min = mid * Decimal('0.98')
+    price_max = mid * Decimal('1.02')
+    sides = {'bid': [], 'ask': []}
+    total = Decimal('0')
+    for level in cex_snapshot:
+        price = Decimal(str(level['price']))
+        size = Decimal(str(level['size']))
+        if price_min <= price <= price_max:
+            sides[level['side']].append((price, size))
+            total += price * size
+    scale = Decimal(str(capital_usd)) / total
+    bids = sorted(sides['bid'], reverse=True)
+    asks = sorted(sides['ask'])
+    return (
+        [(float(p), float(p * s * scale / p)) for p, s in bids],
+        [(float(p), float(p * s * scale / p)) for p, s in asks],
+    )
+
+
+def test_large_vectorized_matches_reference():
+    """build_large_levels (NumPy) khớp bản Decimal per-dict, cả input list và dạng cột"""
+    import numpy as np
+    from services.execution.ui import cex_snapshot_to_arrays
+
+    mid_price = 2700.0
+    rng = np.random.default_rng(7)
+    cex_snapshot = [
+        {'side': side, 'price': float(price), 'size': float(size)}
+        for side, sign in (('bid', -1), ('ask', 1))
+        for price, size in zip(
+            mid_price * (1 + sign * rng.uniform(0, 0.04, 2000)),
+            rng.uniform(0.01, 20, 2000)
+        )
+    ]
+    ref_bids, ref_asks = _reference_large_levels(mid_price, 250_000, cex_snapshot)
+
+    vob = VirtualOrderBook(mid_price=mid_price)
+    orderbook = vob.build_orderbook(swap_amount=1.0, scenario='large', capital_usd=250_000, cex_snapshot=cex_snapshot)
+    bids = [(lvl['price'], lvl['amount_in_available']) for lvl in orderbook['bid_levels']]
+    asks = [(lvl['price'], lvl['amount_in_available']) for lvl in orderbook['ask_levels']]
+    assert [p for p, _ in bids] == [p for p, _ in ref_bids]
+    assert [p for p, _ in asks] == [p for p, _ in ref_asks]
+    assert np.allclose([a for _, a in bids], [a for _, a in ref_bids], rtol=1e-12)
+    assert np.allclose([a for _, a in asks], [a for _, a in ref_asks], rtol=1e-12)
+
+    arrays = vob.build_large_levels(250_000, cex_snapshot_to_arrays(cex_snapshot))
+    assert arrays['bid_prices'].tolist() == [p for p, _ in ref_bids]
+    assert np.all(np.diff(arrays['ask_prices']) >= 0)
+
+
+def test_levels_match_directly_in_greedy_matcher():
+    """VirtualOrderBook levels là OrderbookLevel: GreedyMatcher dùng trực tiếp, không convert"""
+    from services.matching import GreedyMatcher
+    from services.orderbook import OrderbookLevel
+
+    vob = VirtualOrderBook(mid_price=2700.0, token_in_decimals=18, token_out_decimals=6)
+    vob.build_orderbook(swap_amount=1.0, scenario='medium', spread_step_bps=10, base_size=2.0, decay=0.5)
+
+    bids = vob.orderbook_levels('bid')
+    assert bids is vob.bid_levels
+    assert all(isinstance(level, OrderbookLevel) for level in bids)
+    assert isinstance(bids[0].price, Decimal)
+    # 2.0 ETH × 0.5^i, scale về 2.5 ETH tổng: level 0 = 2.5 × 4/7 ETH (raw int)
+    assert bids[0].amount_in_available == int(Decimal('2.0') * Decimal('2.5') / Decimal('3.5') * 10 ** 18)
+
+    matcher = GreedyMatcher(price_amm=Decimal('2690'), decimals_in=18, decimals_out=6, ob_min_improve_bps=0)
+    result = matcher.match(bids, swap_amount=10 ** 18, is_bid=True)
+    # Level tốt nhất (2697.30 > 2690) đủ cho cả swap
+    assert result['amount_in_on_orderbook'] == 10 ** 18
+    assert result['amount_out_from_orderbook'] == int(bids[0].price * 10 ** 6)
+
+    snapshot = vob.snapshot()
+    assert snapshot['best_bid']['price'] == float(bids[0].price)
+    assert json.loads(vob.to_json())['bid_levels'][0]['side'] == 'bid'
+
+
+def test_large_levels_lazy_and_snapshot_from_arrays():
+    """Scenario large: snapshot() đọc từ mảng, OrderbookLevel chỉ tạo khi cần, build nhanh hơn tạo levels"""
+    import time
+    import numpy as np
+    from services.execution.ui import cex_snapshot_to_arrays
+
+    mid_price = 2700.0
+    rng = np.random.default_rng(11)
+    columns = cex_snapshot_to_arrays([
+        {'side': side, 'price': float(price), 'size': float(size)}
+        for side, sign in (('bid', -1), ('ask', 1))
+        for price, size in zip(mid_price * (1 + sign * rng.uniform(0, 0.02, 5000)), rng.uniform(0.01, 20, 5000))
+    ])
+    vob = VirtualOrderBook(mid_price=mid_price, token_in_decimals=18, token_out_decimals=6)
+
+    build_ms = []
+    for _ in range(5):
+        start = time.perf_counter()
+        orderbook = vob.build_orderbook(swap_amount=1.0, scenario='large', capital_usd=250_000, cex_snapshot=columns)
+        build_ms.append(time.perf_counter() - start)
+    assert vob._levels == {'bid': None, 'ask': None}  # chưa tạo OrderbookLevel
+
+    start = time.perf_counter()
+    bids = vob.orderbook_levels('bid')
+    asks = vob.orderbook_levels('ask')
+    levels_ms = time.perf_counter() - start
+    # Build cũ tạo 10k OrderbookLevel ngay trong build_orderbook; build mới phải rẻ hơn hẳn việc đó
+    assert min(build_ms) < 0.6 * levels_ms
+
+    assert len(bids) == len(orderbook['bid_levels']) and len(asks) == len(orderbook['ask_levels'])
+    assert vob.bid_levels is bids and vob.orderbook_levels('bid') is bids
+    for level, row in ((bids[0], orderbook['best_bid']), (asks[-1], orderbook['ask_levels'][-1])):
+        assert float(level.price) == row['price']
+        assert level.amount_in_available / 10 ** 18 == row['amount_in_available']
+        assert abs(level.amount_out_available - level.amount_in_available * level.price / 10 ** 12) <= 1024
+    assert orderbook == vob.snapshot()
+    assert orderbook['spread_bps'] == vob.get_spread()
+    assert orderbook['total_bid_liquidity'] == pytest.approx(float(vob.get_total_bid_liquidity()), rel=1e-12)
+
+
 if __name__ == '__main__':
     print("\n🚀 VIRTUAL ORDERBOOK TEST SUITE\n")
     
@@ -241,6 +363,9 @@ if __name__ == '__main__':
         test_scenario_large()
         test_scenario_comparison()
         test_decimal_precision()
+        test_large_vectorized_matches_reference()
+        test_levels_match_directly_in_greedy_matcher()
+        test_large_levels_lazy_and_snapshot_from_arrays()
         
         print("\n" + "="*80)
         print("✅ ALL TESTS PASSED!")